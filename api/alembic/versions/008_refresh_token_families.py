@@ -0,0 +1,47 @@
+"""Add refresh token families and partial indexes
+
+Revision ID: 008_refresh_token_families
+Revises: 007_add_procedure_type
+Create Date: 2026-02-10 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "008_refresh_token_families"
+down_revision: Union[str, None] = "007_add_procedure_type"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Existing tokens each start their own family
+    op.add_column("refresh_tokens", sa.Column("family_id", sa.String(length=36), nullable=True))
+    op.execute("UPDATE refresh_tokens SET family_id = gen_random_uuid()::text")
+    op.alter_column("refresh_tokens", "family_id", nullable=False)
+
+    op.create_index(
+        "ix_refresh_tokens_active_user_id", "refresh_tokens", ["user_id"],
+        postgresql_where=sa.text("NOT revoked"),
+    )
+    op.create_index(
+        "ix_refresh_tokens_active_family_id", "refresh_tokens", ["family_id"],
+        postgresql_where=sa.text("NOT revoked"),
+    )
+    op.create_index("ix_refresh_tokens_expires_at", "refresh_tokens", ["expires_at"])
+    op.create_index(
+        "ix_refresh_tokens_revoked_at", "refresh_tokens", ["revoked_at"],
+        postgresql_where=sa.text("revoked"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_refresh_tokens_revoked_at", table_name="refresh_tokens")
+    op.drop_index("ix_refresh_tokens_expires_at", table_name="refresh_tokens")
+    op.drop_index("ix_refresh_tokens_active_family_id", table_name="refresh_tokens")
+    op.drop_index("ix_refresh_tokens_active_user_id", table_name="refresh_tokens")
+    op.drop_column("refresh_tokens", "family_id")
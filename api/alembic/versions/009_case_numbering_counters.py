@@ -0,0 +1,45 @@
+"""Add per-case creditor/debt number counters
+
+Revision ID: 009_case_numbering_counters
+Revises: 008_refresh_token_families
+Create Date: 2026-03-01 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "009_case_numbering_counters"
+down_revision: Union[str, None] = "008_refresh_token_families"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("cases", sa.Column("creditor_counter", sa.Integer(), server_default="0", nullable=False))
+    op.add_column("cases", sa.Column("debt_counter", sa.Integer(), server_default="0", nullable=False))
+
+    # Number existing rows 1..n per case (creditors had no numbers, debts could repeat them)
+    for table in ("creditors", "debts"):
+        op.execute(f"""
+            UPDATE {table} AS t SET number = ranked.position
+            FROM (
+                SELECT id, row_number() OVER (PARTITION BY case_id ORDER BY number NULLS LAST, id) AS position
+                FROM {table}
+            ) AS ranked
+            WHERE t.id = ranked.id AND t.number IS DISTINCT FROM ranked.position
+        """)
+        op.create_index(f"ix_{table}_case_id_number", table, ["case_id", "number"])
+
+    op.execute("UPDATE cases SET creditor_counter = (SELECT count(*) FROM creditors WHERE creditors.case_id = cases.id)")
+    op.execute("UPDATE cases SET debt_counter = (SELECT count(*) FROM debts WHERE debts.case_id = cases.id)")
+
+
+def downgrade() -> None:
+    op.drop_index("ix_debts_case_id_number", table_name="debts")
+    op.drop_index("ix_creditors_case_id_number", table_name="creditors")
+    op.drop_column("cases", "debt_counter")
+    op.drop_column("cases", "creditor_counter")
@@ -0,0 +1,100 @@
+"""Add full-text and trigram search over cases
+
+Revision ID: 010_case_search
+Revises: 009_case_numbering_counters
+Create Date: 2026-03-10 00:00:00.000000
+
+cases.creditor_names is kept current by statement-level triggers on
+creditors; search_vector (Russian stemming, weighted) and search_text
+(lowercased, for pg_trgm) are generated from it and the case's own
+public fields. services/case_search.py queries them.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "010_case_search"
+down_revision: Union[str, None] = "009_case_numbering_counters"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+CREDITOR_NAMES = """
+    (SELECT string_agg(creditors.name, ' ' ORDER BY creditors.number, creditors.id)
+     FROM creditors WHERE creditors.case_id = cases.id)
+"""
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+
+    op.add_column("cases", sa.Column("creditor_names", sa.Text(), nullable=True))
+    op.execute(f"UPDATE cases SET creditor_names = {CREDITOR_NAMES}")
+
+    op.execute("""
+        ALTER TABLE cases ADD COLUMN search_vector tsvector GENERATED ALWAYS AS (
+            setweight(to_tsvector('simple', coalesce(case_number, '')), 'A') ||
+            setweight(to_tsvector('russian', coalesce(full_name, '')), 'A') ||
+            setweight(to_tsvector('russian', coalesce(creditor_names, '')), 'B') ||
+            setweight(to_tsvector('russian', coalesce(court_name, '')), 'C')
+        ) STORED
+    """)
+    op.execute("""
+        ALTER TABLE cases ADD COLUMN search_text text GENERATED ALWAYS AS (
+            lower(
+                coalesce(case_number, '') || ' ' || coalesce(full_name, '') || ' ' ||
+                coalesce(creditor_names, '') || ' ' || coalesce(court_name, '')
+            )
+        ) STORED
+    """)
+    op.execute("CREATE INDEX ix_cases_search_vector ON cases USING gin (search_vector)")
+    op.execute("CREATE INDEX ix_cases_search_text_trgm ON cases USING gin (search_text gin_trgm_ops)")
+
+    # One UPDATE per statement on creditors, however many rows it touched
+    op.execute(f"""
+        CREATE FUNCTION cases_sync_creditor_names() RETURNS trigger LANGUAGE plpgsql AS $$
+        BEGIN
+            IF TG_OP = 'INSERT' THEN
+                UPDATE cases SET creditor_names = {CREDITOR_NAMES}
+                WHERE cases.id IN (SELECT case_id FROM new_rows);
+            ELSIF TG_OP = 'DELETE' THEN
+                UPDATE cases SET creditor_names = {CREDITOR_NAMES}
+                WHERE cases.id IN (SELECT case_id FROM old_rows);
+            ELSE
+                UPDATE cases SET creditor_names = {CREDITOR_NAMES}
+                WHERE cases.id IN (SELECT case_id FROM new_rows UNION SELECT case_id FROM old_rows);
+            END IF;
+            RETURN NULL;
+        END
+        $$
+    """)
+    op.execute("""
+        CREATE TRIGGER creditors_names_insert AFTER INSERT ON creditors
+        REFERENCING NEW TABLE AS new_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION cases_sync_creditor_names()
+    """)
+    op.execute("""
+        CREATE TRIGGER creditors_names_update AFTER UPDATE ON creditors
+        REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION cases_sync_creditor_names()
+    """)
+    op.execute("""
+        CREATE TRIGGER creditors_names_delete AFTER DELETE ON creditors
+        REFERENCING OLD TABLE AS old_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION cases_sync_creditor_names()
+    """)
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER IF EXISTS creditors_names_delete ON creditors")
+    op.execute("DROP TRIGGER IF EXISTS creditors_names_update ON creditors")
+    op.execute("DROP TRIGGER IF EXISTS creditors_names_insert ON creditors")
+    op.execute("DROP FUNCTION IF EXISTS cases_sync_creditor_names()")
+    op.drop_index("ix_cases_search_text_trgm", table_name="cases")
+    op.drop_index("ix_cases_search_vector", table_name="cases")
+    op.drop_column("cases", "search_text")
+    op.drop_column("cases", "search_vector")
+    op.drop_column("cases", "creditor_names")
@@ -0,0 +1,59 @@
+"""Add the shared creditor directory
+
+Revision ID: 011_creditor_directory
+Revises: 010_case_search
+Create Date: 2026-03-20 00:00:00.000000
+
+Existing case creditors are linked to directory entries by
+scripts/build_creditor_directory.py (their INN and address are encrypted,
+so this cannot be done in SQL). Run it after this migration, and with
+--unlink before downgrading, or linked creditors lose their INN and address.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "011_creditor_directory"
+down_revision: Union[str, None] = "010_case_search"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "creditor_directory",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("name", sa.String(length=255), nullable=False),
+        sa.Column("ogrn", sa.String(length=15), nullable=True),
+        sa.Column("inn", sa.String(length=12), nullable=True),
+        sa.Column("address", sa.Text(), nullable=True),
+        sa.Column("creditor_type", sa.String(length=50), nullable=True),
+        sa.Column("usage_count", sa.Integer(), server_default="0", nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("ogrn"),
+        sa.UniqueConstraint("inn"),
+    )
+    # Serves both the prefix LIKE and the word similarity (<%) of autocomplete
+    op.execute(
+        "CREATE INDEX ix_creditor_directory_name_trgm ON creditor_directory USING gin (lower(name) gin_trgm_ops)"
+    )
+
+    op.add_column("creditors", sa.Column("directory_id", sa.Integer(), nullable=True))
+    op.create_foreign_key(
+        "fk_creditors_directory_id", "creditors", "creditor_directory", ["directory_id"], ["id"],
+        ondelete="SET NULL",
+    )
+    op.create_index("ix_creditors_directory_id", "creditors", ["directory_id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_creditors_directory_id", table_name="creditors")
+    op.drop_constraint("fk_creditors_directory_id", "creditors", type_="foreignkey")
+    op.drop_column("creditors", "directory_id")
+    op.drop_index("ix_creditor_directory_name_trgm", table_name="creditor_directory")
+    op.drop_table("creditor_directory")
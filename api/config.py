@@ -1,6 +1,8 @@
 """
 Application configuration.
 """
+from pathlib import Path
+
 from pydantic_settings import BaseSettings
 
 
@@ -9,6 +11,26 @@ class Settings(BaseSettings):
     
     # Database
     DATABASE_URL: str = "postgresql+asyncpg://postgres:postgres@db:5432/bankrot"
+    # Connection pool per API process (keep workers x (size + overflow) below max_connections)
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT_SECONDS: float = 10.0  # wait for a free connection before failing
+    DB_POOL_RECYCLE_SECONDS: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    # asyncpg only
+    DB_PREPARED_STATEMENT_CACHE_SIZE: int = 100
+    DB_STATEMENT_TIMEOUT_MS: int = 30000  # server-side statement_timeout, 0 disables
+    # Streaming replicas for read-only endpoints (JSON list of URLs); empty = primary only
+    DATABASE_REPLICA_URLS: list[str] = []
+    # After a write, the caller reads from the primary for this long (read-your-writes)
+    DB_REPLICA_STICKINESS_SECONDS: float = 10.0
+    # Case search (PostgreSQL pg_trgm): minimum word similarity for typo-tolerant matches
+    SEARCH_SIMILARITY_THRESHOLD: float = 0.4
+    # Credit-report import (POST /api/debts/{case_id}/import)
+    DEBT_IMPORT_MAX_BYTES: int = 10 * 1024 * 1024
+    DEBT_IMPORT_MAX_LINES: int = 5000
+    # Bank-statement import (POST /api/transactions/{case_id}/import), streamed
+    TRANSACTION_IMPORT_MAX_BYTES: int = 100 * 1024 * 1024
     
     # API
     API_HOST: str = "0.0.0.0"
@@ -19,16 +41,78 @@ class Settings(BaseSettings):
     SECRET_KEY: str  # REQUIRED: JWT signing key - set in .env (use: python -c "import secrets; print(secrets.token_urlsafe(32))")
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     REFRESH_TOKEN_EXPIRE_DAYS: int = 30
+    # Refresh token compaction: revoked tokens are kept this long for reuse detection
+    REFRESH_TOKEN_REVOKED_RETENTION_DAYS: int = 7
+    REFRESH_TOKEN_PURGE_BATCH_SIZE: int = 1000
+    REFRESH_TOKEN_COMPACTION_INTERVAL_MINUTES: int = 60  # 0 disables the background job
+    # bcrypt thread pool: workers and how many more hashes may wait before 503
+    PASSWORD_HASH_WORKERS: int = 4
+    PASSWORD_HASH_QUEUE_LIMIT: int = 32
+    # Cached user principal (id, role, is_active) for JWT requests
+    PRINCIPAL_CACHE_TTL_SECONDS: int = 300
+    PRINCIPAL_LOCAL_CACHE_TTL_SECONDS: float = 10.0
     
     # OpenAI (for AI features)
     OPENAI_API_KEY: str = ""
+
+    # AI assistant provider: timeweb | yandexgpt
+    AI_PROVIDER: str = "timeweb"
+    TIMEWEB_API_KEY: str = ""
+    TIMEWEB_API_URL: str = "https://api.timeweb.cloud/v1"
+    YANDEXGPT_API_KEY: str = ""
+    YANDEXGPT_FOLDER_ID: str = ""
+    # Fail over to the other provider (if configured) on error or timeout
+    AI_FALLBACK_ENABLED: bool = True
+    AI_PROVIDER_TIMEOUT_SECONDS: float = 30.0
+    AI_FIRST_TOKEN_TIMEOUT_SECONDS: float = 10.0
+    # Hedging: also ask the next provider after the current one's p95 latency
+    AI_HEDGE_ENABLED: bool = False
+    AI_HEDGE_PERCENTILE: float = 95
+    AI_HEDGE_MIN_DELAY_SECONDS: float = 2.0
+    # Answer cache for normalized questions; similarity lookup is off at 0
+    AI_CACHE_TTL_SECONDS: int = 86400
+    AI_CACHE_MAX_ENTRIES: int = 1000
+    AI_CACHE_SIMILARITY_THRESHOLD: float = 0.0
+    # Case-aware questions: summary size limit and number of cached case summaries
+    AI_CASE_CONTEXT_MAX_TOKENS: int = 600
+    AI_CASE_CONTEXT_CACHE_SIZE: int = 1000
+    # Retrieval over 127-FZ and docs/ (scripts/build_knowledge_index.py); disabled if the file is missing
+    KNOWLEDGE_INDEX_PATH: str = str(Path(__file__).parent / "knowledge" / "index.bin")
+    AI_RETRIEVAL_TOP_K: int = 3
+    AI_RETRIEVAL_MAX_TOKENS: int = 700
     
     # Redis (for caching, rate limiting)
     REDIS_URL: str = "redis://redis:6379/0"
+
+    # Rate limiting (sliding window in Redis), "<count>/<second|minute|hour|day>"
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_DEFAULT: str = "100/minute"
+    RATE_LIMIT_DOCUMENTS: str = "20/minute"  # document generation
+    RATE_LIMIT_AI: str = "10/minute"  # /api/ai/ask
+    # Peers whose X-Real-IP header is trusted (nginx)
+    RATE_LIMIT_TRUSTED_PROXIES: list[str] = ["127.0.0.1", "::1"]
     
+    # Performance metrics: Prometheus text at /metrics (not proxied by nginx)
+    METRICS_ENABLED: bool = True
+    # Server-Timing header with the per-request SQL/decryption breakdown (debugging only)
+    PERF_DEBUG_HEADER: bool = False
+
     # Security
     CORS_ORIGINS: list[str] = ["http://localhost:3000", "http://localhost:8501"]
     
+    # Document storage: "local" (CASE_DOCUMENTS_DIR) or "s3" (S3-compatible, e.g. MinIO)
+    STORAGE_BACKEND: str = "local"
+    CASE_DOCUMENTS_DIR: str = str(Path(__file__).parent / "case_documents")
+    S3_ENDPOINT_URL: str = ""
+    S3_BUCKET: str = "case-documents"
+    S3_ACCESS_KEY: str = ""
+    S3_SECRET_KEY: str = ""
+    S3_REGION: str = "us-east-1"
+    S3_PRESIGNED_URL_EXPIRE_SECONDS: int = 900
+    # Local LRU cache in front of S3 (0 disables it)
+    STORAGE_CACHE_DIR: str = "/tmp/case_documents_cache"
+    STORAGE_CACHE_MAX_MB: int = 512
+
     # Encryption key for sensitive data (32 bytes base64)
     # Generate with: python -c "import secrets; print(secrets.token_urlsafe(32))"
     ENCRYPTION_KEY: str = ""
@@ -1,5 +1,31 @@
+"""
+Database engine and sessions.
+
+The connection pool is sized from settings (DB_POOL_*). With asyncpg, the
+prepared statement cache size and a server-side statement_timeout are set per
+connection, so a runaway query releases its connection instead of holding it.
+
+InstrumentedPool records how long each checkout waited for a free connection;
+pool_stats() reports that together with the pool's current utilization
+(/health and /metrics). services.metrics.instrument_engine() also feeds each
+wait into a histogram through wait_observer.
+
+Read replicas (DATABASE_REPLICA_URLS) serve endpoints that depend on
+get_read_db instead of get_db. A caller whose request wrote to the primary
+(a flush or an INSERT/UPDATE/DELETE) reads from the primary for the next
+DB_REPLICA_STICKINESS_SECONDS, so they see their own writes despite
+replication lag.
+"""
+import hashlib
+import itertools
+import time
+
+from fastapi import Depends, Request
+from sqlalchemy import event, exc
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
-from sqlalchemy.orm import DeclarativeBase
+from sqlalchemy.orm import DeclarativeBase, Session
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from config import settings
 
 
@@ -7,10 +33,90 @@ class Base(DeclarativeBase):
     pass
 
 
+class InstrumentedPool(AsyncAdaptedQueuePool):
+    """Async queue pool that counts checkouts, checkout wait time and timeouts."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.wait_observer = None  # callable(seconds)
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_seconds_total = 0.0
+        self.max_wait_seconds = 0.0
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except exc.TimeoutError:
+            self.timeouts += 1
+            raise
+        waited = time.perf_counter() - started
+        self.checkouts += 1
+        self.wait_seconds_total += waited
+        self.max_wait_seconds = max(self.max_wait_seconds, waited)
+        if self.wait_observer is not None:
+            self.wait_observer(waited)
+        return connection
+
+    def recreate(self):
+        pool = super().recreate()
+        pool.wait_observer = self.wait_observer
+        return pool
+
+
+def engine_options(database_url: str, **overrides) -> dict:
+    """create_async_engine() keyword arguments for the URL (overrides: pool_size=..., etc.)"""
+    url = make_url(database_url)
+    if url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:"):
+        return {}  # one in-memory database per connection: keep SQLAlchemy's default pool
+
+    options = {
+        "poolclass": InstrumentedPool,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT_SECONDS,
+        "pool_recycle": settings.DB_POOL_RECYCLE_SECONDS,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+    if url.get_driver_name() == "asyncpg":
+        options["connect_args"] = {
+            "prepared_statement_cache_size": settings.DB_PREPARED_STATEMENT_CACHE_SIZE,
+            "server_settings": {
+                "statement_timeout": str(settings.DB_STATEMENT_TIMEOUT_MS),
+                "application_name": "bankrot-api",
+            },
+        }
+    options.update(overrides)
+    return options
+
+
+def pool_stats(engine) -> dict:
+    """Current pool utilization and checkout wait counters"""
+    pool = engine.sync_engine.pool
+    if not isinstance(pool, InstrumentedPool):
+        return {"pool": type(pool).__name__}
+    capacity = pool.size() + max(pool._max_overflow, 0)
+    return {
+        "pool": type(pool).__name__,
+        "size": pool.size(),
+        "max_overflow": pool._max_overflow,
+        "checked_out": pool.checkedout(),
+        "checked_in": pool.checkedin(),
+        "overflow": max(pool.overflow(), 0),
+        "utilization": round(pool.checkedout() / capacity, 3) if capacity else 0.0,
+        "checkouts_total": pool.checkouts,
+        "timeouts_total": pool.timeouts,
+        "wait_seconds_total": round(pool.wait_seconds_total, 3),
+        "max_wait_seconds": round(pool.max_wait_seconds, 3),
+    }
+
+
 engine = create_async_engine(
     settings.DATABASE_URL,
     echo=False,
     future=True,
+    **engine_options(settings.DATABASE_URL),
 )
 
 async_session_maker = async_sessionmaker(
@@ -20,7 +126,111 @@ async_session_maker = async_sessionmaker(
 )
 
 
-async def get_db() -> AsyncSession:
-    """Dependency for getting async database session"""
+class ReadRouter:
+    """Picks a replica (round robin) for reads; callers who just wrote stay on the primary."""
+
+    MAX_STICKY_CALLERS = 10_000
+
+    def __init__(self, session_makers: list, stickiness_seconds: float):
+        self.session_makers = session_makers
+        self.stickiness_seconds = stickiness_seconds
+        self._cycle = itertools.cycle(session_makers) if session_makers else None
+        self._sticky_until: dict[str, float] = {}
+        self.replica_reads = 0
+        self.primary_reads = 0
+
+    def mark_written(self, caller: str) -> None:
+        now = time.monotonic()
+        if len(self._sticky_until) >= self.MAX_STICKY_CALLERS:
+            self._sticky_until = {k: v for k, v in self._sticky_until.items() if v > now}
+        self._sticky_until[caller] = now + self.stickiness_seconds
+
+    def is_sticky(self, caller: str) -> bool:
+        until = self._sticky_until.get(caller)
+        if until is None:
+            return False
+        if until <= time.monotonic():
+            del self._sticky_until[caller]
+            return False
+        return True
+
+    def replica_for(self, caller: str):
+        """Session maker of the replica to read from, None for the primary"""
+        if self._cycle is None or self.is_sticky(caller):
+            self.primary_reads += 1
+            return None
+        self.replica_reads += 1
+        return next(self._cycle)
+
+    def stats(self) -> dict:
+        return {
+            "replicas": len(self.session_makers),
+            "replica_reads": self.replica_reads,
+            "primary_reads": self.primary_reads,
+            "sticky_callers": len(self._sticky_until),
+        }
+
+
+def caller_key(request: Request) -> str:
+    """Who read-your-writes stickiness applies to: the credentials (and bot user) of the request"""
+    credentials = "|".join((
+        request.headers.get("Authorization", ""),
+        request.headers.get("X-API-Token", ""),
+        request.headers.get("X-Telegram-User-Id", ""),
+    ))
+    if credentials == "||":
+        credentials = request.client.host if request.client else ""
+    return hashlib.sha256(credentials.encode()).hexdigest()
+
+
+replica_engines = [
+    create_async_engine(url, echo=False, **engine_options(url))
+    for url in settings.DATABASE_REPLICA_URLS
+]
+
+read_router = ReadRouter(
+    [async_sessionmaker(e, class_=AsyncSession, expire_on_commit=False) for e in replica_engines],
+    stickiness_seconds=settings.DB_REPLICA_STICKINESS_SECONDS,
+)
+
+WRITER_KEY = "read_your_writes_caller"
+
+
+@event.listens_for(Session, "after_flush")
+def _mark_flush_written(session, flush_context):
+    caller = session.info.get(WRITER_KEY)
+    if caller:
+        read_router.mark_written(caller)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _mark_statement_written(orm_execute_state):
+    caller = orm_execute_state.session.info.get(WRITER_KEY)
+    if caller and not orm_execute_state.is_select:
+        read_router.mark_written(caller)
+
+
+async def dispose_engines() -> None:
+    await engine.dispose()
+    for replica in replica_engines:
+        await replica.dispose()
+
+
+async def get_db(request: Request) -> AsyncSession:
+    """Dependency for getting async database session (primary)"""
     async with async_session_maker() as session:
+        session.info[WRITER_KEY] = caller_key(request)
+        yield session
+
+
+async def get_read_db(request: Request, db: AsyncSession = Depends(get_db)) -> AsyncSession:
+    """
+    Session for read-only endpoints: a replica if configured and the caller
+    has not written recently, otherwise the request's primary session.
+    """
+    replica = read_router.replica_for(caller_key(request))
+    if replica is None:
+        yield db
+        return
+    async with replica() as session:
         yield session
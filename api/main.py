@@ -1,23 +1,58 @@
-from fastapi import FastAPI, Request
+from contextlib import asynccontextmanager
+
+from fastapi import Depends, FastAPI, Request
+from fastapi.responses import JSONResponse, PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
-from slowapi import Limiter, _rate_limit_exceeded_handler
-from slowapi.util import get_remote_address
-from slowapi.errors import RateLimitExceeded
 from config import settings
-from routers import cases, creditors, debts, documents, ai, children, income, properties, transactions, auth
+from database import dispose_engines, engine, pool_stats, read_router, replica_engines
+from services.ai_cache import ai_answer_cache
+from services.ai_case_context import case_context_cache
+from services.ai_service import aclose_ai_provider, get_ai_provider
+from services.knowledge_index import close_knowledge_index, load_knowledge_index
+from services.metrics import PerformanceMiddleware, instrument_engine, metrics
+from services.password_hasher import password_hasher, PasswordHasherBusy
+from services.principal_cache import principal_cache
+from services.rate_limiter import enforce_rate_limit, rate_limiter
+from services.storage import storage
+from services.token_compaction import start_compaction
+from routers import cases, creditors, creditor_directory, debts, documents, ai, children, income, properties, transactions, auth
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    load_knowledge_index()
+    compaction = start_compaction()
+    yield
+    if compaction is not None:
+        compaction.cancel()
+    # Release shared clients and worker threads
+    await principal_cache.aclose()
+    await rate_limiter.aclose()
+    await aclose_ai_provider()
+    close_knowledge_index()
+    await storage.aclose()
+    await dispose_engines()
+    password_hasher.shutdown()
 
-# Initialize rate limiter
-limiter = Limiter(key_func=get_remote_address, default_limits=["100/minute"])
 
 app = FastAPI(
     title="Банкрот ПРО API",
     description="API для системы управления делами по банкротству физических лиц (127-ФЗ)",
     version="1.0.0",
+    lifespan=lifespan,
+    # Redis-backed per-user rate limits (per-route budgets via @rate_limit)
+    dependencies=[Depends(enforce_rate_limit)],
 )
 
-# Add rate limiter to app state
-app.state.limiter = limiter
-app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
+
+@app.exception_handler(PasswordHasherBusy)
+async def password_hasher_busy_handler(request: Request, exc: PasswordHasherBusy):
+    """Login/registration burst exceeded the hashing queue: ask clients to retry"""
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Сервис авторизации перегружен, повторите попытку"},
+        headers={"Retry-After": "1"},
+    )
 
 # CORS middleware
 app.add_middleware(
@@ -28,10 +63,17 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Per-route latency, SQL and decryption metrics (outermost, so it times everything)
+if settings.METRICS_ENABLED:
+    for instrumented in (engine, *replica_engines):
+        instrument_engine(instrumented)
+    app.add_middleware(PerformanceMiddleware)
+
 # Include routers
 app.include_router(auth.router)  # Authentication - NEW!
 app.include_router(cases.router)
 app.include_router(creditors.router)
+app.include_router(creditor_directory.router)
 app.include_router(debts.router)
 app.include_router(documents.router)
 app.include_router(ai.router)
@@ -54,6 +96,39 @@ async def root():
     }
 
 
+@app.get("/metrics", include_in_schema=False)
+async def prometheus_metrics():
+    hasher = password_hasher.stats()
+    gauges = {
+        "password_hash_in_flight": hasher["in_flight"],
+        "password_hash_queue_depth": hasher["queue_depth"],
+    }
+    counters = {
+        "password_hash_completed_total": hasher["completed_total"],
+        "password_hash_rejected_total": hasher["rejected_total"],
+        "password_hash_wait_seconds_total": hasher["wait_seconds_total"],
+        "password_hash_seconds_total": hasher["hash_seconds_total"],
+    }
+    pool = pool_stats(engine)
+    if "size" in pool:
+        gauges.update({
+            "db_pool_size": pool["size"],
+            "db_pool_checked_out": pool["checked_out"],
+            "db_pool_overflow": pool["overflow"],
+            "db_pool_utilization": pool["utilization"],
+        })
+        counters["db_pool_checkout_timeouts_total"] = pool["timeouts_total"]
+    return PlainTextResponse(metrics.render(gauges, counters), media_type="text/plain; version=0.0.4")
+
+
 @app.get("/health")
 async def health():
-    return {"status": "ok"}
+    return {
+        "status": "ok",
+        "password_hashing": password_hasher.stats(),
+        "db_pool": pool_stats(engine),
+        "db_replicas": read_router.stats(),
+        "ai_cache": ai_answer_cache.stats(),
+        "ai_case_context_cache": case_context_cache.stats(),
+        "ai_providers": get_ai_provider().stats(),
+    }
@@ -2,6 +2,7 @@
 Database models for BankrotPro.
 """
 from .case import Case, Creditor, Debt, Child, Income, Property, Transaction
+from .creditor_directory import CreditorDirectoryEntry
 from .user import User, RefreshToken
 
 __all__ = [
@@ -12,6 +13,7 @@ __all__ = [
     "Income",
     "Property",
     "Transaction",
+    "CreditorDirectoryEntry",
     "User",
     "RefreshToken",
 ]
\ No newline at end of file
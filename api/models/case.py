@@ -1,7 +1,8 @@
 from datetime import datetime
 from decimal import Decimal
-from sqlalchemy import String, Text, Numeric, BigInteger, Date, ForeignKey, Boolean
-from sqlalchemy.orm import Mapped, mapped_column, relationship
+from sqlalchemy import String, Text, Numeric, BigInteger, Date, ForeignKey, Boolean, Index, event, update
+from sqlalchemy.orm import Mapped, mapped_column, relationship, Session
+from sqlalchemy.orm.attributes import set_committed_value
 from database import Base
 from utils.encryption import EncryptedString, EncryptedText
 
@@ -77,26 +78,44 @@ class Case(Base):
     
     notes: Mapped[str | None] = mapped_column(EncryptedText())  # ENCRYPTED
 
-    # Relationships
-    creditors: Mapped[list["Creditor"]] = relationship(back_populates="case", cascade="all, delete-orphan")
-    debts: Mapped[list["Debt"]] = relationship(back_populates="case", cascade="all, delete-orphan")
+    # Last number handed out to a creditor / debt of this case (see CaseService.next_number)
+    creditor_counter: Mapped[int] = mapped_column(default=0, server_default="0")
+    debt_counter: Mapped[int] = mapped_column(default=0, server_default="0")
+
+    # Relationships (creditors and debts in registry order)
+    creditors: Mapped[list["Creditor"]] = relationship(
+        back_populates="case", cascade="all, delete-orphan", order_by="[Creditor.number, Creditor.id]"
+    )
+    debts: Mapped[list["Debt"]] = relationship(
+        back_populates="case", cascade="all, delete-orphan", order_by="[Debt.number, Debt.id]"
+    )
     children: Mapped[list["Child"]] = relationship(back_populates="case", cascade="all, delete-orphan")
     income_records: Mapped[list["Income"]] = relationship(back_populates="case", cascade="all, delete-orphan")
     properties: Mapped[list["Property"]] = relationship(back_populates="case", cascade="all, delete-orphan")
     transactions: Mapped[list["Transaction"]] = relationship(back_populates="case", cascade="all, delete-orphan")
     owner: Mapped["User"] = relationship(back_populates="cases")
 
+
+# Child collections of a case, in the order they are eager-loaded
+CASE_RELATIONSHIPS = ("creditors", "debts", "children", "income_records", "properties", "transactions")
+
+
 class Creditor(Base):
     __tablename__ = "creditors"
+    __table_args__ = (Index("ix_creditors_case_id_number", "case_id", "number"),)
 
     id: Mapped[int] = mapped_column(primary_key=True)
     case_id: Mapped[int] = mapped_column(ForeignKey("cases.id", ondelete="CASCADE"))
 
-    number: Mapped[int | None] = mapped_column()  # Sequential number in list
+    number: Mapped[int | None] = mapped_column()  # Position in the case's list, gapless (CaseService.renumber)
     name: Mapped[str] = mapped_column(String(255))
     ogrn: Mapped[str | None] = mapped_column(String(20))
-    inn: Mapped[str | None] = mapped_column(EncryptedString(100))  # ENCRYPTED for individual creditors
-    address: Mapped[str | None] = mapped_column(EncryptedText())  # ENCRYPTED
+    # Legal entities reference the shared directory; their INN and address are read from it
+    directory_id: Mapped[int | None] = mapped_column(
+        ForeignKey("creditor_directory.id", ondelete="SET NULL"), index=True
+    )
+    own_inn: Mapped[str | None] = mapped_column("inn", EncryptedString(100))  # ENCRYPTED for individual creditors
+    own_address: Mapped[str | None] = mapped_column("address", EncryptedText())  # ENCRYPTED
 
     creditor_type: Mapped[str | None] = mapped_column(String(50))  # bank, mfo, individual
     debt_amount: Mapped[Decimal | None] = mapped_column(Numeric(15, 2))
@@ -105,17 +124,40 @@ class Creditor(Base):
     contract_date: Mapped[datetime | None] = mapped_column(Date)
 
     case: Mapped["Case"] = relationship(back_populates="creditors")
+    directory_entry: Mapped["CreditorDirectoryEntry | None"] = relationship(lazy="joined")
+
+    # A value entered for this case wins over the directory's
+    @property
+    def inn(self) -> str | None:
+        if self.own_inn is None and self.directory_entry is not None:
+            return self.directory_entry.inn
+        return self.own_inn
+
+    @inn.setter
+    def inn(self, value: str | None) -> None:
+        self.own_inn = value
+
+    @property
+    def address(self) -> str | None:
+        if self.own_address is None and self.directory_entry is not None:
+            return self.directory_entry.address
+        return self.own_address
+
+    @address.setter
+    def address(self, value: str | None) -> None:
+        self.own_address = value
 
 
 class Debt(Base):
     """Detailed debt breakdown per creditor"""
     __tablename__ = "debts"
+    __table_args__ = (Index("ix_debts_case_id_number", "case_id", "number"),)
 
     id: Mapped[int] = mapped_column(primary_key=True)
     case_id: Mapped[int] = mapped_column(ForeignKey("cases.id", ondelete="CASCADE"))
     creditor_id: Mapped[int | None] = mapped_column(ForeignKey("creditors.id", ondelete="SET NULL"))
     
-    number: Mapped[int | None] = mapped_column()  # Sequential number
+    number: Mapped[int | None] = mapped_column()  # Position in the case's list, gapless (CaseService.renumber)
     creditor_name: Mapped[str] = mapped_column(String(255))
     amount_rubles: Mapped[int] = mapped_column()
     amount_kopecks: Mapped[int] = mapped_column()
@@ -204,3 +246,46 @@ class Transaction(Base):
     amount: Mapped[Decimal | None] = mapped_column(Numeric(15, 2))
     
     case: Mapped["Case"] = relationship(back_populates="transactions")
+
+
+# === Case.updated_at tracks changes to the whole aggregate ===
+# Caches keyed by (case id, updated_at) rely on child rows bumping their case.
+
+CASE_CHILD_MODELS = (Creditor, Debt, Child, Income, Property, Transaction)
+
+
+def _child_case_id(obj) -> int | None:
+    if obj.case_id is not None:
+        return obj.case_id
+    case = obj.__dict__.get("case")  # attached via relationship, not yet flushed
+    return case.id if case is not None else None
+
+
+@event.listens_for(Session, "before_flush")
+def _collect_touched_cases(session, flush_context, instances):
+    touched = set()
+    for obj in (*session.new, *session.deleted):
+        if isinstance(obj, CASE_CHILD_MODELS):
+            touched.add(_child_case_id(obj))
+    for obj in session.dirty:
+        if isinstance(obj, CASE_CHILD_MODELS) and session.is_modified(obj):
+            touched.add(_child_case_id(obj))
+    touched.discard(None)
+    if touched:
+        session.info.setdefault("touched_case_ids", set()).update(touched)
+
+
+@event.listens_for(Session, "after_flush_postexec")
+def _touch_cases(session, flush_context):
+    case_ids = session.info.pop("touched_case_ids", None)
+    if not case_ids:
+        return
+    now = datetime.utcnow()
+    session.connection().execute(
+        update(Case.__table__).where(Case.__table__.c.id.in_(case_ids)).values(updated_at=now)
+    )
+    for case_id in case_ids:
+        case = session.identity_map.get(session.identity_key(Case, case_id))
+        if case is not None:
+            # Keep loaded instances consistent without marking them dirty
+            set_committed_value(case, "updated_at", now)
@@ -0,0 +1,25 @@
+from datetime import datetime
+from sqlalchemy import String, Text
+from sqlalchemy.orm import Mapped, mapped_column
+from database import Base
+
+
+class CreditorDirectoryEntry(Base):
+    """
+    Shared creditor directory: one row per legal entity (bank, MFO, ...),
+    keyed by OGRN and INN. Their registry data is public, so it is stored
+    unencrypted. Case creditors reference entries through directory_id.
+    """
+    __tablename__ = "creditor_directory"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    name: Mapped[str] = mapped_column(String(255))
+    ogrn: Mapped[str | None] = mapped_column(String(15), unique=True)
+    inn: Mapped[str | None] = mapped_column(String(12), unique=True)
+    address: Mapped[str | None] = mapped_column(Text)
+    creditor_type: Mapped[str | None] = mapped_column(String(50))  # bank, mfo, collector, ...
+
+    # How many case creditors were added from this entry (autocomplete ranking)
+    usage_count: Mapped[int] = mapped_column(default=0, server_default="0")
+    created_at: Mapped[datetime] = mapped_column(default=datetime.utcnow)
+    updated_at: Mapped[datetime] = mapped_column(default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -4,7 +4,7 @@ Supports both web login and Telegram bot linking.
 """
 from datetime import datetime
 from uuid import uuid4
-from sqlalchemy import String, Boolean, DateTime, BigInteger, Text
+from sqlalchemy import String, Boolean, DateTime, BigInteger, Text, Index, text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from database import Base
 from utils.encryption import EncryptedString
@@ -56,12 +56,24 @@ class RefreshToken(Base):
     """
     Refresh tokens for JWT authentication.
     Allows token rotation and revocation.
+
+    Every rotation creates a new row in the same family (one login session);
+    presenting an already rotated token revokes the whole family.
     """
     __tablename__ = "refresh_tokens"
+    __table_args__ = (
+        # Hot paths only touch live tokens: revoke by user / by family
+        Index("ix_refresh_tokens_active_user_id", "user_id", postgresql_where=text("NOT revoked")),
+        Index("ix_refresh_tokens_active_family_id", "family_id", postgresql_where=text("NOT revoked")),
+        # Compaction: expired tokens and revoked tokens past retention
+        Index("ix_refresh_tokens_expires_at", "expires_at"),
+        Index("ix_refresh_tokens_revoked_at", "revoked_at", postgresql_where=text("revoked")),
+    )
     
     id: Mapped[int] = mapped_column(primary_key=True)
     user_id: Mapped[int] = mapped_column(index=True)
     token_hash: Mapped[str] = mapped_column(String(255), unique=True, index=True)
+    family_id: Mapped[str] = mapped_column(String(36), default=lambda: str(uuid4()))
     
     # Device/session info
     device_info: Mapped[str | None] = mapped_column(Text)
@@ -1,8 +1,9 @@
-from routers import cases, creditors, debts, documents, ai, children, income, properties, transactions, auth
+from routers import cases, creditors, creditor_directory, debts, documents, ai, children, income, properties, transactions, auth
 
 __all__ = [
     "cases",
     "creditors",
+    "creditor_directory",
     "debts",
     "documents",
     "ai",
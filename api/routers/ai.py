@@ -1,13 +1,52 @@
+import json
+
 from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
+from sqlalchemy.ext.asyncio import AsyncSession
+from config import settings
+from database import get_read_db
+from services.ai_cache import ai_answer_cache
+from services.ai_case_context import build_case_question, get_case_context
+from services.knowledge_index import format_passages, get_knowledge_index
 from services.ai_service import get_ai_provider
 from security import get_user_or_api_token
+from services.rate_limiter import rate_limit
 
 router = APIRouter(prefix="/api/ai", tags=["ai"], dependencies=[Depends(get_user_or_api_token)])
 
 
 class AIQuestion(BaseModel):
     question: str
+    case_id: int | None = None  # answer with the (redacted) data of this case
+
+
+def retrieve_excerpts(question: str) -> str:
+    """Top passages of 127-FZ and docs/ for the question, empty without an index"""
+    index = get_knowledge_index()
+    if index is None:
+        return ""
+    passages = index.search(question, k=settings.AI_RETRIEVAL_TOP_K)
+    return format_passages(passages, settings.AI_RETRIEVAL_MAX_TOKENS)
+
+
+async def build_prompt(data: AIQuestion, db: AsyncSession, current_user) -> tuple[str, str]:
+    """
+    (cache key, message for the provider). The key is the question itself, or
+    the question with the case summary in case-aware mode; retrieved excerpts
+    follow from the question and are not part of the key.
+    """
+    if not data.question.strip():
+        raise HTTPException(400, "Вопрос не может быть пустым")
+    key = data.question
+    if data.case_id is not None:
+        summary = await get_case_context(db, data.case_id, current_user)
+        key = build_case_question(summary, data.question)
+
+    excerpts = retrieve_excerpts(data.question)
+    if not excerpts:
+        return key, key
+    return key, f"Выдержки из 127-ФЗ и справочных материалов:\n{excerpts}\n\n{key}"
 
 
 class AIAnswer(BaseModel):
@@ -15,15 +54,69 @@ class AIAnswer(BaseModel):
 
 
 @router.post("/ask", response_model=AIAnswer)
-async def ask_ai(request: Request, data: AIQuestion):
-    """Ask AI assistant about bankruptcy law (127-FZ)"""
-
-    if not data.question.strip():
-        raise HTTPException(400, "Вопрос не может быть пустым")
+@rate_limit("ai")
+async def ask_ai(
+    request: Request,
+    data: AIQuestion,
+    db: AsyncSession = Depends(get_read_db),
+    current_user=Depends(get_user_or_api_token),
+):
+    """Ask AI assistant about bankruptcy law (127-FZ), optionally about one case"""
+    key, prompt = await build_prompt(data, db, current_user)
 
     try:
-        provider = get_ai_provider()
-        answer = await provider.ask(data.question)
+        answer = await ai_answer_cache.get_or_ask(
+            key,
+            lambda _: get_ai_provider().ask(prompt),
+            similar=data.case_id is None,
+        )
         return AIAnswer(answer=answer)
     except Exception as e:
         raise HTTPException(503, "AI сервис временно недоступен")
+
+
+def sse_event(data: dict, event: str | None = None) -> str:
+    """One Server-Sent Events message"""
+    prefix = f"event: {event}\n" if event else ""
+    return f"{prefix}data: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+@router.post("/ask/stream")
+@rate_limit("ai")
+async def ask_ai_stream(
+    request: Request,
+    data: AIQuestion,
+    db: AsyncSession = Depends(get_read_db),
+    current_user=Depends(get_user_or_api_token),
+):
+    """
+    Ask AI assistant, streaming the answer as Server-Sent Events:
+    `data: {"delta": "..."}` per chunk, then `event: done` (or `event: error`).
+    """
+    key, prompt = await build_prompt(data, db, current_user)
+    cached = ai_answer_cache.get(key, similar=data.case_id is None)
+
+    async def events():
+        if cached is not None:
+            yield sse_event({"delta": cached})
+            yield sse_event({"cached": True}, event="done")
+            return
+
+        chunks = []
+        try:
+            async for delta in get_ai_provider().stream(prompt):
+                chunks.append(delta)
+                yield sse_event({"delta": delta})
+        except Exception:
+            yield sse_event({"detail": "AI сервис временно недоступен"}, event="error")
+            return
+
+        ai_answer_cache.put(key, "".join(chunks))
+        yield sse_event({"cached": False}, event="done")
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        # nginx must not buffer the stream
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -179,19 +179,14 @@ async def change_password(
     Change password for current user.
     """
     # Verify current password
-    if not auth_service.verify_password(data.current_password, current_user.password_hash):
+    if not await auth_service.verify_password(data.current_password, current_user.password_hash):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Неверный текущий пароль"
         )
     
-    # Update password
-    current_user.password_hash = auth_service.hash_password(data.new_password)
-    
-    # Revoke all tokens (force re-login)
-    await auth_service.revoke_all_tokens(db, current_user.id)
-    
-    await db.commit()
+    # Update password and revoke all tokens (force re-login)
+    await auth_service.change_password(db, current_user, data.new_password)
     
     return MessageResponse(
         message="Пароль успешно изменён. Войдите заново.",
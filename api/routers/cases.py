@@ -1,15 +1,18 @@
-from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 from pydantic import BaseModel, field_validator
 from datetime import date
-from database import get_db
+from decimal import Decimal
+from typing import Literal
+from database import get_db, get_read_db
 from models.case import Case
-from models.user import User
-from schemas.case import CaseCreate, CaseUpdate, CaseResponse, CasePublic
-from services.case_service import CaseService
-from security import get_current_user
+from services.principal_cache import Principal
+from schemas.case import CaseCreate, CaseUpdate, CaseResponse, CasePublic, CaseSearchResult
+from services.case_service import INCREMENT_FIELDS, TOGGLE_FLAGS, CaseService
+from services.case_search import search_cases
+from security import get_current_principal
 from utils.authorization import verify_case_access, filter_user_cases
 
 
@@ -66,12 +69,32 @@ class ClientDataUpdate(BaseModel):
 
 router = APIRouter(prefix="/api/cases", tags=["cases"])
 
+
+async def change_case(case_id: int, change, db: AsyncSession, current_user: Principal) -> Case:
+    """
+    Run a single-statement CaseService change (ownership is checked in its WHERE clause).
+    When nothing matched, the access check tells 404 from 403.
+    """
+    case = await change(CaseService(db))
+    if case is None:
+        await verify_case_access(case_id, current_user, db, relationships=())
+        raise HTTPException(status_code=404, detail="Дело не найдено")
+    return case
+
+
+async def patch_case(case_id: int, values: dict, db: AsyncSession, current_user: Principal) -> Case:
+    """Update only the given fields"""
+    return await change_case(
+        case_id, lambda service: service.update_fields(case_id, values, current_user), db, current_user
+    )
+
+
 @router.post("", response_model=CaseResponse, status_code=201)
 async def create_case(
     request: Request,
     data: CaseCreate,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ):
     """Create new bankruptcy case"""
     # Rate limiting is handled by decorator in main.py or should be applied here as decorator
@@ -84,8 +107,8 @@ async def list_cases(
     status: str | None = None,
     limit: int = 50,
     offset: int = 0,
-    db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_principal),
 ):
     """List all cases with optional filters"""
     limit = max(1, min(limit, 200))
@@ -113,11 +136,36 @@ async def list_cases(
         for case in cases
     ]
 
+@router.get("/search", response_model=list[CaseSearchResult])
+async def search(
+    q: str = Query(min_length=2, max_length=200),
+    status: str | None = None,
+    limit: int = 20,
+    db: AsyncSession = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_principal),
+):
+    """Search cases by debtor name, case number, creditor or court name (typo-tolerant, ranked)"""
+    results = await search_cases(db, q, current_user, status=status, limit=max(1, min(limit, 100)))
+    return [
+        CaseSearchResult(
+            id=case.id,
+            case_number=case.case_number,
+            full_name=case.full_name,
+            status=case.status,
+            total_debt=case.total_debt,
+            created_at=case.created_at,
+            creditors_count=creditors_count,
+            court_name=case.court_name,
+            rank=rank,
+        )
+        for case, creditors_count, rank in results
+    ]
+
 @router.get("/{case_id}", response_model=CaseResponse)
 async def get_case(
     case_id: int,
-    db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_principal),
 ):
     """Get case by ID (full data for web)"""
     return await verify_case_access(case_id, current_user, db)
@@ -125,8 +173,8 @@ async def get_case(
 @router.get("/{case_id}/public", response_model=CasePublic)
 async def get_case_public(
     case_id: int,
-    db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_principal),
 ):
     """Get case public data (for bot - without passport, INN)"""
     case = await verify_case_access(case_id, current_user, db)
@@ -145,21 +193,16 @@ async def update_case(
     case_id: int,
     data: CaseUpdate,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
 ):
     """Update case"""
-    await verify_case_access(case_id, current_user, db)
-    service = CaseService(db)
-    case = await service.update(case_id, data)
-    if not case:
-        raise HTTPException(404, "Дело не найдено")
-    return case
+    return await patch_case(case_id, data.model_dump(exclude_unset=True), db, current_user)
 
 @router.delete("/{case_id}", status_code=204)
 async def delete_case(
     case_id: int,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
 ):
     """Delete case"""
     await verify_case_access(case_id, current_user, db)
@@ -172,22 +215,12 @@ async def update_client_data(
     case_id: int,
     data: ClientDataUpdate,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
 ):
     """Update client personal data (passport, address, INN, SNILS, etc.)"""
-    await verify_case_access(case_id, current_user, db)
-    service = CaseService(db)
-    case = await service.get_by_id(case_id)
-
-    if not case:
-        raise HTTPException(status_code=404, detail="Дело не найдено")
-
-    # Update only non-None values
-    update_data = data.model_dump(exclude_unset=True)
-    case_update = CaseUpdate(**update_data)
-
-    updated_case = await service.update(case_id, case_update)
-    return updated_case
+    # Validate through CaseUpdate, update only the fields sent
+    case_update = CaseUpdate(**data.model_dump(exclude_unset=True))
+    return await patch_case(case_id, case_update.model_dump(exclude_unset=True), db, current_user)
 
 
 # ==================== GROUP 1: FAMILY DATA ====================
@@ -207,24 +240,10 @@ async def update_family_data(
     case_id: int,
     data: FamilyDataUpdate,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
 ):
     """Update family data (marital status, spouse info)"""
-    await verify_case_access(case_id, current_user, db)
-    service = CaseService(db)
-    case = await service.get_by_id(case_id)
-    if not case:
-        raise HTTPException(status_code=404, detail="Дело не найдено")
-
-    # Update fields
-    update_data = data.model_dump(exclude_unset=True)
-    for field, value in update_data.items():
-        setattr(case, field, value)
-
-    await db.commit()
-    await db.refresh(case)
-
-    return case
+    return await patch_case(case_id, data.model_dump(exclude_unset=True), db, current_user)
 
 
 # ==================== GROUP 1: EMPLOYMENT DATA ====================
@@ -241,23 +260,10 @@ async def update_employment_data(
     case_id: int,
     data: EmploymentDataUpdate,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
 ):
     """Update employment status"""
-    await verify_case_access(case_id, current_user, db)
-    service = CaseService(db)
-    case = await service.get_by_id(case_id)
-    if not case:
-        raise HTTPException(status_code=404, detail="Дело не найдено")
-
-    update_data = data.model_dump(exclude_unset=True)
-    for field, value in update_data.items():
-        setattr(case, field, value)
-
-    await db.commit()
-    await db.refresh(case)
-
-    return case
+    return await patch_case(case_id, data.model_dump(exclude_unset=True), db, current_user)
 
 
 # ==================== GROUP 2: PROPERTY DATA ====================
@@ -266,21 +272,47 @@ async def update_employment_data(
 async def toggle_real_estate(
     case_id: int,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
 ):
     """Toggle has_real_estate flag"""
-    await verify_case_access(case_id, current_user, db)
-    service = CaseService(db)
-    case = await service.get_by_id(case_id)
-    if not case:
-        raise HTTPException(status_code=404, detail="Дело не найдено")
+    return await change_case(
+        case_id, lambda service: service.toggle_flag(case_id, "has_real_estate", current_user), db, current_user
+    )
 
-    case.has_real_estate = not case.has_real_estate
 
-    await db.commit()
-    await db.refresh(case)
+@router.patch("/{case_id}/toggle/{flag}", response_model=CaseResponse)
+async def toggle_flag(
+    case_id: int,
+    flag: Literal[TOGGLE_FLAGS],
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_principal),
+):
+    """Toggle a boolean flag in one statement (concurrent toggles never cancel out)"""
+    return await change_case(
+        case_id, lambda service: service.toggle_flag(case_id, flag, current_user), db, current_user
+    )
+
+
+class FieldIncrement(BaseModel):
+    """Schema for atomically adding to a numeric field"""
+    field: Literal[INCREMENT_FIELDS]
+    amount: Decimal
 
-    return case
+
+@router.patch("/{case_id}/increment", response_model=CaseResponse)
+async def increment_field(
+    case_id: int,
+    data: FieldIncrement,
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_principal),
+):
+    """Add amount (may be negative) to total_debt or monthly_income in one statement"""
+    return await change_case(
+        case_id,
+        lambda service: service.increment_field(case_id, data.field, data.amount, current_user),
+        db,
+        current_user,
+    )
 
 
 # ==================== GROUP 3: COURT DATA ====================
@@ -299,23 +331,10 @@ async def update_court_data(
     case_id: int,
     data: CourtDataUpdate,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
 ):
     """Update court and SRO information"""
-    await verify_case_access(case_id, current_user, db)
-    service = CaseService(db)
-    case = await service.get_by_id(case_id)
-    if not case:
-        raise HTTPException(status_code=404, detail="Дело не найдено")
-
-    update_data = data.model_dump(exclude_unset=True)
-    for field, value in update_data.items():
-        setattr(case, field, value)
-
-    await db.commit()
-    await db.refresh(case)
-
-    return case
+    return await patch_case(case_id, data.model_dump(exclude_unset=True), db, current_user)
 
 
 
@@ -1,11 +1,11 @@
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
-from database import get_db
+from database import get_db, get_read_db
 from models.case import Child
-from models.user import User
+from services.principal_cache import Principal
 from schemas.case import ChildCreate, ChildResponse
-from security import get_current_user
+from security import get_current_principal
 from utils.authorization import verify_case_access
 
 router = APIRouter(
@@ -19,7 +19,7 @@ async def create_child(
     case_id: int,
     child: ChildCreate,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
 ):
     """Add child to case"""
     await verify_case_access(case_id, current_user, db)
@@ -36,8 +36,8 @@ async def create_child(
 @router.get("/{case_id}", response_model=list[ChildResponse])
 async def get_children(
     case_id: int,
-    db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_principal),
 ):
     """Get all children for case"""
     await verify_case_access(case_id, current_user, db)
@@ -50,8 +50,8 @@ async def get_children(
 @router.get("/single/{child_id}", response_model=ChildResponse)
 async def get_child(
     child_id: int,
-    db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_principal),
 ):
     """Get a single child by ID"""
     result = await db.execute(select(Child).where(Child.id == child_id))
@@ -68,7 +68,7 @@ async def get_child(
 async def delete_child(
     child_id: int,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
 ):
     """Delete child"""
     result = await db.execute(select(Child).where(Child.id == child_id))
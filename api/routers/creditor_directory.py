@@ -0,0 +1,69 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from database import get_db, get_read_db
+from schemas.case import (
+    CreditorDirectoryEntryCreate, CreditorDirectoryEntryResponse, CreditorDirectoryEntryUpdate,
+)
+from services.creditor_directory import CreditorDirectory
+from security import get_user_or_api_token, require_role
+from services.principal_cache import Principal
+
+router = APIRouter(prefix="/api/creditor-directory", tags=["creditors"])
+
+
+@router.get("", response_model=list[CreditorDirectoryEntryResponse])
+async def autocomplete(
+    q: str = Query(min_length=2, max_length=200),
+    limit: int = 10,
+    db: AsyncSession = Depends(get_read_db),
+    current_user=Depends(get_user_or_api_token),
+):
+    """Directory creditors by name (prefix or misspelled) or by leading OGRN/INN digits"""
+    return await CreditorDirectory(db).autocomplete(q, limit=max(1, min(limit, 50)))
+
+
+@router.get("/{entry_id}", response_model=CreditorDirectoryEntryResponse)
+async def get_entry(
+    entry_id: int,
+    db: AsyncSession = Depends(get_read_db),
+    current_user=Depends(get_user_or_api_token),
+):
+    """Get a directory creditor by ID"""
+    entry = await CreditorDirectory(db).get(entry_id)
+    if not entry:
+        raise HTTPException(404, "Кредитор не найден в справочнике")
+    return entry
+
+
+@router.post("", response_model=CreditorDirectoryEntryResponse, status_code=201)
+async def create_entry(
+    data: CreditorDirectoryEntryCreate,
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(require_role("admin")),
+):
+    """Add a creditor to the shared directory (admins only)"""
+    entry = await CreditorDirectory(db).create(data.model_dump())
+    if entry is None:
+        raise HTTPException(409, "Кредитор с таким ОГРН или ИНН уже есть в справочнике")
+    await db.commit()
+    await db.refresh(entry)
+    return entry
+
+
+@router.patch("/{entry_id}", response_model=CreditorDirectoryEntryResponse)
+async def update_entry(
+    entry_id: int,
+    data: CreditorDirectoryEntryUpdate,
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(require_role("admin")),
+):
+    """Correct a directory creditor (admins only); linked case creditors see the change"""
+    directory = CreditorDirectory(db)
+    entry = await directory.get(entry_id)
+    if not entry:
+        raise HTTPException(404, "Кредитор не найден в справочнике")
+    if not await directory.update(entry, data.model_dump(exclude_unset=True)):
+        raise HTTPException(409, "Кредитор с таким ОГРН или ИНН уже есть в справочнике")
+    await db.commit()
+    await db.refresh(entry)
+    return entry
@@ -1,10 +1,11 @@
 from fastapi import APIRouter, Depends, HTTPException, Request
 from sqlalchemy.ext.asyncio import AsyncSession
-from database import get_db
+from database import get_db, get_read_db
 from schemas.case import CreditorCreate, CreditorUpdate, CreditorResponse
 from services.case_service import CaseService
-from security import get_current_user
-from models.user import User
+from services.creditor_directory import CreditorDirectory
+from security import get_current_principal
+from services.principal_cache import Principal
 from utils.authorization import verify_case_access
 
 router = APIRouter(prefix="/api/creditors", tags=["creditors"])
@@ -14,8 +15,8 @@ router = APIRouter(prefix="/api/creditors", tags=["creditors"])
 async def get_creditors(
     request: Request,
     case_id: int,
-    db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_principal),
 ):
     """Get all creditors for a case"""
     await verify_case_access(case_id, current_user, db)
@@ -30,8 +31,8 @@ async def get_creditors(
 async def get_creditor(
     request: Request,
     creditor_id: int,
-    db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_principal),
 ):
     """Get a single creditor by ID"""
     service = CaseService(db)
@@ -47,10 +48,12 @@ async def add_creditor(
     case_id: int,
     data: CreditorCreate,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
 ):
     """Add creditor to case"""
-    await verify_case_access(case_id, current_user, db)
+    await verify_case_access(case_id, current_user, db, relationships=())
+    if data.directory_id is not None and not await CreditorDirectory(db).get(data.directory_id):
+        raise HTTPException(404, "Кредитор не найден в справочнике")
     service = CaseService(db)
     creditor = await service.add_creditor(case_id, data.model_dump())
     if not creditor:
@@ -64,7 +67,7 @@ async def update_creditor(
     creditor_id: int,
     data: CreditorUpdate,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
 ):
     """Update a creditor"""
     service = CaseService(db)
@@ -83,14 +86,14 @@ async def delete_creditor(
     request: Request,
     creditor_id: int,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
 ):
     """Delete a creditor"""
     service = CaseService(db)
     existing_creditor = await service.get_creditor_by_id(creditor_id)
     if not existing_creditor:
         raise HTTPException(404, "Creditor not found")
-    await verify_case_access(existing_creditor.case_id, current_user, db)
+    await verify_case_access(existing_creditor.case_id, current_user, db, relationships=())
     deleted = await service.delete_creditor(creditor_id)
     if not deleted:
         raise HTTPException(404, "Кредитор не найден")
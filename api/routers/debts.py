@@ -1,10 +1,13 @@
-from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi import APIRouter, Depends, File, Form, HTTPException, Request, UploadFile
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.ext.asyncio import AsyncSession
-from database import get_db
-from schemas.case import DebtCreate, DebtUpdate, DebtResponse
+from config import settings
+from database import get_db, get_read_db
+from schemas.case import DebtCreate, DebtImportResult, DebtSource, DebtUpdate, DebtResponse
 from services.case_service import CaseService
-from security import get_current_user
-from models.user import User
+from services.debt_import import DebtImporter, parse_report
+from security import get_current_principal
+from services.principal_cache import Principal
 from utils.authorization import verify_case_access
 
 router = APIRouter(prefix="/api/debts", tags=["debts"])
@@ -14,8 +17,8 @@ router = APIRouter(prefix="/api/debts", tags=["debts"])
 async def get_debts(
     request: Request,
     case_id: int,
-    db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_principal),
 ):
     """Get all debts for a case"""
     await verify_case_access(case_id, current_user, db)
@@ -30,8 +33,8 @@ async def get_debts(
 async def get_debt(
     request: Request,
     debt_id: int,
-    db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_principal),
 ):
     """Get a single debt by ID"""
     service = CaseService(db)
@@ -47,10 +50,10 @@ async def add_debt(
     case_id: int,
     data: DebtCreate,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
 ):
     """Add debt to case"""
-    await verify_case_access(case_id, current_user, db)
+    await verify_case_access(case_id, current_user, db, relationships=())
     service = CaseService(db)
     debt = await service.add_debt(case_id, data.model_dump())
     if not debt:
@@ -58,13 +61,54 @@ async def add_debt(
     return debt
 
 
+@router.post("/{case_id}/import", response_model=DebtImportResult)
+async def import_debts(
+    request: Request,
+    case_id: int,
+    file: UploadFile = File(...),
+    source: DebtSource = Form("ОКБ"),
+    dry_run: bool = Form(True),
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_principal),
+):
+    """
+    Import debts from a credit-bureau report (CSV, XML or JSON).
+    With dry_run (default) only the diff against the case's debts is
+    returned; otherwise the new lines are added.
+    """
+    await verify_case_access(case_id, current_user, db, relationships=())
+    if file.size is not None and file.size > settings.DEBT_IMPORT_MAX_BYTES:
+        raise HTTPException(413, "Файл отчёта слишком большой")
+    report_format, lines, errors = await run_in_threadpool(parse_report, file.file, file.filename)
+    importer = DebtImporter(db)
+    await importer.match(case_id, lines, source)
+    created = 0 if dry_run else await importer.insert(case_id, lines, source)
+    return DebtImportResult(
+        format=report_format,
+        dry_run=dry_run,
+        lines=[
+            {
+                "line": line.line,
+                "creditor_name": line.creditor_name,
+                "creditor_id": line.creditor_id,
+                "amount_rubles": line.rubles_kopecks[0],
+                "amount_kopecks": line.rubles_kopecks[1],
+                "status": line.status,
+            }
+            for line in lines
+        ],
+        errors=[{"line": number, "message": message} for number, message in errors],
+        created=created,
+    )
+
+
 @router.put("/{debt_id}", response_model=DebtResponse)
 async def update_debt(
     request: Request,
     debt_id: int,
     data: DebtUpdate,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
 ):
     """Update a debt"""
     service = CaseService(db)
@@ -83,14 +127,14 @@ async def delete_debt(
     request: Request,
     debt_id: int,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
 ):
     """Delete a debt"""
     service = CaseService(db)
     existing_debt = await service.get_debt_by_id(debt_id)
     if not existing_debt:
         raise HTTPException(404, "Debt not found")
-    await verify_case_access(existing_debt.case_id, current_user, db)
+    await verify_case_access(existing_debt.case_id, current_user, db, relationships=())
     deleted = await service.delete_debt(debt_id)
     if not deleted:
         raise HTTPException(404, "Задолженность не найдена")
@@ -1,79 +1,75 @@
-from datetime import datetime
+from typing import Iterable
 
 from fastapi import APIRouter, Depends, HTTPException
-from fastapi.responses import StreamingResponse
+from fastapi.responses import Response, StreamingResponse
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
 
-from database import get_db
+from database import get_db, get_read_db
 from models import Case
-from schemas.documents import DocumentTypeResponse, DocumentGenerateRequest, DocumentFileResponse
-from services.document_service import generate_bankruptcy_petition, generate_bankruptcy_application
+from models.case import CASE_RELATIONSHIPS
+from config import settings
+from schemas.documents import (
+    DocumentTypeResponse,
+    DocumentGenerateRequest,
+    DocumentFileResponse,
+    DocumentUrlResponse,
+)
+from services.document_registry import EmptyDocumentError, document_registry
 from services.document_storage import (
     build_document_filename,
+    get_document_media_type,
     save_document,
     list_case_documents,
-    resolve_case_document_path,
+    open_case_document,
+    get_case_document_url,
 )
 from security import get_user_or_api_token
-from utils.authorization import verify_case_access
+from services.rate_limiter import rate_limit
+from utils.authorization import verify_case_access, case_load_options
 
 router = APIRouter(
     prefix="/api/documents",
     tags=["documents"],
 )
 
-# Available document types with their generators
-# Note: Only include templates that actually exist in templates/ directory
-DOCUMENT_TYPES = {
-    "bankruptcy_petition": {
-        "label": "Заявление о банкротстве (полное)",
-        "description": "Полное заявление о признании гражданина банкротом со всеми данными",
-        "generator": generate_bankruptcy_petition,
-    },
-    # TODO: Add bankruptcy_application when template is created
-    # "bankruptcy_application": {
-    #     "label": "Заявление о банкротстве (базовое)",
-    #     "description": "Базовое заявление о банкротстве",
-    #     "generator": generate_bankruptcy_application,
-    # },
-}
-
-
-async def load_case_for_document(case_id: int, db: AsyncSession) -> Case | None:
+
+async def load_case_for_document(
+    case_id: int,
+    db: AsyncSession,
+    relationships: Iterable[str] = CASE_RELATIONSHIPS,
+) -> Case | None:
+    """Load a case with only the relationships a document template declares."""
     result = await db.execute(
         select(Case)
-        .options(
-            selectinload(Case.creditors),
-            selectinload(Case.debts),
-            selectinload(Case.children),
-            selectinload(Case.income_records),
-            selectinload(Case.properties),
-            selectinload(Case.transactions)
-        )
+        .options(*case_load_options(relationships))
         .where(Case.id == case_id)
     )
     return result.scalar_one_or_none()
 
 
-async def get_case_with_access(case_id: int, db: AsyncSession, current_user):
+async def get_case_with_access(
+    case_id: int,
+    db: AsyncSession,
+    current_user,
+    relationships: Iterable[str] = (),
+):
     if current_user:
-        return await verify_case_access(case_id, current_user, db)
+        return await verify_case_access(case_id, current_user, db, relationships=relationships)
 
-    result = await db.execute(select(Case).where(Case.id == case_id))
-    case = result.scalar_one_or_none()
+    case = await load_case_for_document(case_id, db, relationships)
     if not case:
         raise HTTPException(status_code=404, detail="Дело не найдено")
     return case
 
 
-def build_document_response(file_path, file_name: str):
-    return StreamingResponse(
-        open(file_path, "rb"),
-        media_type="application/vnd.openxmlformats-officedocument.wordprocessingml.document",
-        headers={"Content-Disposition": f"attachment; filename={file_name}"},
-    )
+def build_document_response(content, file_name: str):
+    """Download response from rendered bytes or a stream of stored chunks"""
+    media_type = get_document_media_type(file_name)
+    headers = {"Content-Disposition": f"attachment; filename={file_name}"}
+    if isinstance(content, bytes):
+        return Response(content, media_type=media_type, headers=headers)
+    return StreamingResponse(content, media_type=media_type, headers=headers)
 
 
 @router.get("/types", response_model=list[DocumentTypeResponse])
@@ -83,28 +79,29 @@ async def list_document_types(
     """List available document types."""
     return [
         DocumentTypeResponse(
-            document_type=doc_type,
-            label=meta["label"],
-            description=meta["description"],
+            document_type=doc_type.key,
+            label=doc_type.label,
+            description=doc_type.description,
+            output_formats=list(doc_type.output_formats),
         )
-        for doc_type, meta in DOCUMENT_TYPES.items()
+        for doc_type in document_registry.available()
     ]
 
 
 @router.get("/cases/{case_id}/files", response_model=list[DocumentFileResponse])
 async def list_case_files(
     case_id: int,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user=Depends(get_user_or_api_token),
 ):
     case = await get_case_with_access(case_id, db, current_user)
-    documents = list_case_documents(case)
+    documents = await list_case_documents(case)
     results = []
     for doc in documents:
         document_type = None
-        for doc_type in DOCUMENT_TYPES:
-            if doc["file_name"].startswith(f"{doc_type}_"):
-                document_type = doc_type
+        for doc_type in document_registry.available():
+            if doc["file_name"].startswith(f"{doc_type.key}_"):
+                document_type = doc_type.key
                 break
         results.append(
             DocumentFileResponse(
@@ -118,70 +115,90 @@ async def list_case_files(
 
 
 @router.post("/cases/{case_id}/generate", response_model=DocumentFileResponse)
+@rate_limit("documents")
 async def generate_case_document(
     case_id: int,
     payload: DocumentGenerateRequest,
     db: AsyncSession = Depends(get_db),
     current_user=Depends(get_user_or_api_token),
 ):
-    if payload.document_type not in DOCUMENT_TYPES:
+    doc_type = document_registry.get(payload.document_type)
+    if doc_type is None:
         raise HTTPException(status_code=400, detail="Unsupported document type")
+    if payload.output_format not in doc_type.output_formats:
+        raise HTTPException(status_code=400, detail="Unsupported output format")
 
-    case = await get_case_with_access(case_id, db, current_user)
-    case_with_relations = await load_case_for_document(case_id, db)
-    if not case_with_relations:
-        raise HTTPException(status_code=404, detail="Дело не найдено")
-
-    generator = DOCUMENT_TYPES[payload.document_type]["generator"]
-    doc_buffer = generator(case_with_relations)
-    file_name = build_document_filename(payload.document_type, case.case_number)
-    file_path = save_document(case, file_name, doc_buffer)
-    stat = file_path.stat()
-    return DocumentFileResponse(
-        file_name=file_name,
-        size_bytes=stat.st_size,
-        modified_at=datetime.fromtimestamp(stat.st_mtime),
-        document_type=payload.document_type,
+    case = await get_case_with_access(case_id, db, current_user, doc_type.relationships)
+    try:
+        doc_buffer = doc_type.render(case, payload.output_format)
+    except EmptyDocumentError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    file_name = build_document_filename(
+        payload.document_type, case.case_number, extension=payload.output_format
     )
+    stored = await save_document(case, file_name, doc_buffer)
+    return DocumentFileResponse(**stored, document_type=payload.document_type)
 
 
 @router.get("/cases/{case_id}/files/{file_name}")
 async def download_case_document(
     case_id: int,
     file_name: str,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user=Depends(get_user_or_api_token),
 ):
     case = await get_case_with_access(case_id, db, current_user)
     try:
-        file_path = resolve_case_document_path(case, file_name)
+        chunks = await open_case_document(case, file_name)
     except ValueError:
         raise HTTPException(status_code=400, detail="Invalid document path")
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="Document not found")
+
+    return build_document_response(chunks, file_name)
 
-    if not file_path.exists():
+
+@router.get("/cases/{case_id}/files/{file_name}/url", response_model=DocumentUrlResponse)
+async def get_case_document_download_url(
+    case_id: int,
+    file_name: str,
+    db: AsyncSession = Depends(get_read_db),
+    current_user=Depends(get_user_or_api_token),
+):
+    """Presigned URL for downloading a document directly from object storage."""
+    case = await get_case_with_access(case_id, db, current_user)
+    expires_in = settings.S3_PRESIGNED_URL_EXPIRE_SECONDS
+    try:
+        url = await get_case_document_url(case, file_name, expires_in)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid document path")
+    except FileNotFoundError:
         raise HTTPException(status_code=404, detail="Document not found")
 
-    return build_document_response(file_path, file_name)
+    if url is None:
+        raise HTTPException(status_code=400, detail="Прямые ссылки недоступны для локального хранилища")
+    return DocumentUrlResponse(url=url, expires_in=expires_in)
 
 
 @router.get("/{case_id}/bankruptcy-application")
+@rate_limit("documents")
 async def get_bankruptcy_application(
     case_id: int,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user=Depends(get_user_or_api_token),
 ):
     """Generate bankruptcy application document (basic template)."""
-    case = await get_case_with_access(case_id, db, current_user)
-    case_with_relations = await load_case_for_document(case_id, db)
+    doc_type = document_registry.get("bankruptcy_application")
+    if doc_type is None:
+        raise HTTPException(status_code=500, detail="Шаблон документа не найден: bankruptcy_application")
 
-    if not case_with_relations:
-        raise HTTPException(status_code=404, detail="Дело не найдено")
+    case = await get_case_with_access(case_id, db, current_user, doc_type.relationships)
 
     try:
-        doc_buffer = generate_bankruptcy_application(case_with_relations)
+        doc_buffer = doc_type.render(case)
         file_name = build_document_filename("bankruptcy_application", case.case_number)
-        file_path = save_document(case, file_name, doc_buffer)
-        return build_document_response(file_path, file_name)
+        await save_document(case, file_name, doc_buffer)
+        return build_document_response(doc_buffer.getvalue(), file_name)
     except FileNotFoundError as e:
         raise HTTPException(status_code=500, detail=f"Шаблон документа не найден: {e}")
     except Exception as e:
@@ -189,23 +206,24 @@ async def get_bankruptcy_application(
 
 
 @router.get("/cases/{case_id}/document/petition")
+@rate_limit("documents")
 async def get_bankruptcy_petition(
     case_id: int,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user=Depends(get_user_or_api_token),
 ):
     """Generate full bankruptcy petition document."""
-    case = await get_case_with_access(case_id, db, current_user)
-    case_with_relations = await load_case_for_document(case_id, db)
+    doc_type = document_registry.get("bankruptcy_petition")
+    if doc_type is None:
+        raise HTTPException(status_code=500, detail="Шаблон документа не найден: bankruptcy_petition")
 
-    if not case_with_relations:
-        raise HTTPException(status_code=404, detail="Дело не найдено")
+    case = await get_case_with_access(case_id, db, current_user, doc_type.relationships)
 
     try:
-        doc_buffer = generate_bankruptcy_petition(case_with_relations)
+        doc_buffer = doc_type.render(case)
         file_name = build_document_filename("bankruptcy_petition", case.case_number)
-        file_path = save_document(case, file_name, doc_buffer)
-        return build_document_response(file_path, file_name)
+        await save_document(case, file_name, doc_buffer)
+        return build_document_response(doc_buffer.getvalue(), file_name)
     except FileNotFoundError as e:
         raise HTTPException(status_code=500, detail=f"Шаблон документа не найден: {e}")
     except Exception as e:
@@ -1,7 +1,7 @@
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
-from database import get_db
+from database import get_db, get_read_db
 from models.case import Income, Case
 from schemas.case import IncomeCreate, IncomeResponse
 from security import get_user_or_api_token
@@ -34,7 +34,7 @@ async def create_income(
 
 
 @router.get("/{case_id}", response_model=list[IncomeResponse])
-async def get_income(case_id: int, db: AsyncSession = Depends(get_db)):
+async def get_income(case_id: int, db: AsyncSession = Depends(get_read_db)):
     """Get all income records for case"""
     result = await db.execute(
         select(Income)
@@ -45,7 +45,7 @@ async def get_income(case_id: int, db: AsyncSession = Depends(get_db)):
 
 
 @router.get("/single/{income_id}", response_model=IncomeResponse)
-async def get_single_income(income_id: int, db: AsyncSession = Depends(get_db)):
+async def get_single_income(income_id: int, db: AsyncSession = Depends(get_read_db)):
     """Get a single income record by ID"""
     result = await db.execute(select(Income).where(Income.id == income_id))
     income = result.scalar_one_or_none()
@@ -1,11 +1,11 @@
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
-from database import get_db
+from database import get_db, get_read_db
 from models.case import Property
-from models.user import User
+from services.principal_cache import Principal
 from schemas.case import PropertyCreate, PropertyResponse
-from security import get_current_user
+from security import get_current_principal
 from utils.authorization import verify_case_access
 
 router = APIRouter(
@@ -19,7 +19,7 @@ async def create_property(
     case_id: int,
     property_data: PropertyCreate,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
 ):
     """Add property to case"""
     await verify_case_access(case_id, current_user, db)
@@ -35,8 +35,8 @@ async def create_property(
 @router.get("/{case_id}", response_model=list[PropertyResponse])
 async def get_properties(
     case_id: int,
-    db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_principal),
 ):
     """Get all properties for case"""
     await verify_case_access(case_id, current_user, db)
@@ -49,8 +49,8 @@ async def get_properties(
 @router.get("/single/{property_id}", response_model=PropertyResponse)
 async def get_property(
     property_id: int,
-    db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_principal),
 ):
     """Get a single property by ID"""
     result = await db.execute(select(Property).where(Property.id == property_id))
@@ -67,7 +67,7 @@ async def get_property(
 async def delete_property(
     property_id: int,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
 ):
     """Delete property"""
     result = await db.execute(select(Property).where(Property.id == property_id))
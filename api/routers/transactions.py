@@ -1,10 +1,14 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, File, Form, HTTPException, UploadFile
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
+from config import settings
 from database import get_db
 from models.case import Transaction, Case
-from schemas.case import TransactionCreate, TransactionResponse
+from schemas.case import TransactionCreate, TransactionImportResult, TransactionResponse
 from security import get_user_or_api_token
+from services.import_parsing import ImportFormatError
+from services.statement_import import StatementImporter
+from utils.authorization import verify_case_access
 
 router = APIRouter(
     prefix="/api/transactions",
@@ -33,6 +37,34 @@ async def create_transaction(
     return new_transaction
 
 
+@router.post("/{case_id}/import", response_model=TransactionImportResult)
+async def import_statement(
+    case_id: int,
+    file: UploadFile = File(...),
+    dry_run: bool = Form(False),
+    db: AsyncSession = Depends(get_db),
+    current_user=Depends(get_user_or_api_token)
+):
+    """
+    Import a bank statement (CSV or 1C exchange format): reportable lines
+    are classified into transaction types and added, the rest are skipped
+    """
+    if current_user:
+        await verify_case_access(case_id, current_user, db, relationships=())
+    else:
+        # API token (bot)
+        result = await db.execute(select(Case.id).where(Case.id == case_id))
+        if result.scalar_one_or_none() is None:
+            raise HTTPException(status_code=404, detail="Case not found")
+    if file.size is not None and file.size > settings.TRANSACTION_IMPORT_MAX_BYTES:
+        raise HTTPException(status_code=413, detail="Statement file is too large")
+
+    try:
+        return await StatementImporter(db).run(case_id, file.file, file.filename, dry_run=dry_run)
+    except (ImportFormatError, UnicodeDecodeError) as e:
+        raise HTTPException(status_code=400, detail=f"Cannot read statement: {e}")
+
+
 @router.get("/{case_id}", response_model=list[TransactionResponse])
 async def get_transactions(
     case_id: int,
@@ -1,6 +1,7 @@
 from datetime import date, datetime
 from decimal import Decimal
-from pydantic import BaseModel, ConfigDict, field_validator
+from typing import Literal
+from pydantic import BaseModel, ConfigDict, field_validator, model_validator
 
 PROCEDURE_TYPES = {"Property Realization", "Debt Restructuring"}
 
@@ -33,7 +34,15 @@ class CreditorBase(BaseModel):
 
 
 class CreditorCreate(CreditorBase):
-    pass
+    # With directory_id, name, OGRN, INN and address default to the directory entry
+    name: str | None = None
+    directory_id: int | None = None
+
+    @model_validator(mode="after")
+    def require_name_or_directory(self):
+        if not self.name and self.directory_id is None:
+            raise ValueError("name or directory_id is required")
+        return self
 
 
 class CreditorUpdate(BaseModel):
@@ -66,10 +75,53 @@ class CreditorResponse(CreditorBase):
     id: int
     case_id: int
     number: int | None = None
+    directory_id: int | None = None
+    model_config = ConfigDict(from_attributes=True)
+
+
+class CreditorDirectoryEntryUpdate(BaseModel):
+    name: str | None = None
+    ogrn: str | None = None
+    inn: str | None = None
+    address: str | None = None
+    creditor_type: str | None = None
+
+    @field_validator("ogrn")
+    @classmethod
+    def validate_ogrn(cls, v: str | None):
+        if v and (not v.isdigit() or len(v) != 13):
+            raise ValueError("OGRN must be 13 digits")
+        return v
+
+    @field_validator("inn")
+    @classmethod
+    def validate_inn(cls, v: str | None):
+        if v and (not v.isdigit() or len(v) not in [10, 12]):
+            raise ValueError("INN must be 10 or 12 digits")
+        return v
+
+
+class CreditorDirectoryEntryCreate(CreditorDirectoryEntryUpdate):
+    name: str
+    ogrn: str
+
+
+class CreditorDirectoryEntryResponse(BaseModel):
+    id: int
+    name: str
+    ogrn: str | None = None
+    inn: str | None = None
+    address: str | None = None
+    creditor_type: str | None = None
+    usage_count: int = 0
     model_config = ConfigDict(from_attributes=True)
 
 
 # === Debts ===
+# Credit bureaus whose reports can be imported (Debt.source)
+DebtSource = Literal["ОКБ", "НБКИ", "СКОРИНГ БЮРО"]
+
+
 class DebtBase(BaseModel):
     creditor_name: str
     amount_rubles: int
@@ -97,6 +149,28 @@ class DebtResponse(DebtBase):
     model_config = ConfigDict(from_attributes=True)
 
 
+class DebtImportLine(BaseModel):
+    line: int
+    creditor_name: str
+    creditor_id: int | None = None
+    amount_rubles: int
+    amount_kopecks: int
+    status: str  # "new" or "duplicate"
+
+
+class ImportLineError(BaseModel):
+    line: int  # 0: the file as a whole
+    message: str
+
+
+class DebtImportResult(BaseModel):
+    format: str
+    dry_run: bool
+    lines: list[DebtImportLine]
+    errors: list[ImportLineError]
+    created: int = 0
+
+
 # === Case: creation ===
 class CaseCreate(BaseModel):
     full_name: str
@@ -229,6 +303,11 @@ class CasePublic(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
 
+class CaseSearchResult(CasePublic):
+    court_name: str | None = None
+    rank: float
+
+
 # === Case: full response (for web) ===
 class CaseResponse(BaseModel):
     id: int
@@ -350,3 +429,12 @@ class TransactionResponse(TransactionCreate):
     case_id: int
 
     model_config = ConfigDict(from_attributes=True)
+
+
+class TransactionImportResult(BaseModel):
+    dry_run: bool
+    imported: int
+    by_type: dict[str, int]  # transaction_type -> lines
+    skipped: int  # lines that match no transaction type
+    duplicates: int  # reportable lines already in the case (or earlier in the file)
+    errors: list[ImportLineError]  # the first ones only
@@ -6,10 +6,12 @@ class DocumentTypeResponse(BaseModel):
     document_type: str
     label: str
     description: str | None = None
+    output_formats: list[str] = ["docx"]
 
 
 class DocumentGenerateRequest(BaseModel):
     document_type: str
+    output_format: str = "docx"
 
 
 class DocumentFileResponse(BaseModel):
@@ -17,3 +19,8 @@ class DocumentFileResponse(BaseModel):
     size_bytes: int
     modified_at: datetime
     document_type: str | None = None
+
+
+class DocumentUrlResponse(BaseModel):
+    url: str
+    expires_in: int
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Benchmark case search on PostgreSQL (migration 010 applied).
+
+Seeds --cases synthetic cases (case numbers BENCH-*, three creditors each)
+with one INSERT ... SELECT generate_series, then times search_cases() for a
+set of queries: exact and stemmed words, a case number, a creditor, typos.
+Run it twice to reuse the seeded cases; --cleanup removes them.
+
+Usage:
+    # PostgreSQL running locally (docker-compose up postgres), alembic upgrade head
+    cd api && python scripts/benchmark_case_search.py
+    cd api && python scripts/benchmark_case_search.py --cases 100000 --iterations 50
+    cd api && python scripts/benchmark_case_search.py --cleanup
+"""
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+# Add api directory to path for imports (parent of scripts/)
+api_dir = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(api_dir))
+
+from sqlalchemy import text
+
+from database import async_session_maker, engine
+from services.case_search import search_cases
+from services.principal_cache import Principal
+
+QUERIES = [
+    "Иванов",
+    "Иваноф Петр",  # typo
+    "Сбербанка",  # stemmed creditor name
+    "Тинькоф",  # typo in a creditor name
+    "Арбитражный суд Москвы",
+    "BENCH-000042",
+]
+
+SEED = text("""
+    WITH surnames AS (SELECT ARRAY['Иванов','Петров','Сидоров','Кузнецов','Смирнов','Попов','Соколов',
+                                   'Лебедев','Козлов','Новиков','Морозов','Волков','Алексеев','Егоров'] AS a),
+         names AS (SELECT ARRAY['Пётр','Иван','Олег','Сергей','Андрей','Дмитрий','Михаил'] AS a),
+         courts AS (SELECT ARRAY['Арбитражный суд города Москвы','Арбитражный суд Московской области',
+                                 'Арбитражный суд города Санкт-Петербурга'] AS a),
+         inserted AS (
+             INSERT INTO cases (case_number, full_name, status, court_name, created_at, updated_at,
+                                creditor_counter, debt_counter)
+             SELECT 'BENCH-' || lpad(i::text, 6, '0'),
+                    surnames.a[1 + i % 14] || ' ' || names.a[1 + i % 7] || ' ' || names.a[1 + i % 5] || 'ович',
+                    'new', courts.a[1 + i % 3], now(), now(), 3, 0
+             FROM generate_series(:first, :last) AS i, surnames, names, courts
+             RETURNING id
+         )
+    INSERT INTO creditors (case_id, number, name)
+    SELECT inserted.id, n, (ARRAY['ПАО Сбербанк','АО Тинькофф Банк','АО Альфа-Банк','Банк ВТБ (ПАО)',
+                                   'ООО МФК Займер','ООО МКК Быстроденьги'])[1 + (inserted.id + n) % 6]
+    FROM inserted, generate_series(1, 3) AS n
+""")
+
+
+def percentile(values: list[float], pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))]
+
+
+async def seed(cases: int) -> None:
+    async with async_session_maker() as db:
+        existing = (await db.execute(text("SELECT count(*) FROM cases WHERE case_number LIKE 'BENCH-%'"))).scalar()
+        if existing < cases:
+            started = time.perf_counter()
+            await db.execute(SEED, {"first": existing + 1, "last": cases})
+            await db.commit()
+            await db.execute(text("ANALYZE cases"))
+            print(f"  Seeded {cases - existing} cases in {time.perf_counter() - started:.1f} s")
+
+
+async def cleanup() -> None:
+    async with async_session_maker() as db:
+        result = await db.execute(text("DELETE FROM cases WHERE case_number LIKE 'BENCH-%'"))
+        await db.commit()
+        print(f"  Removed {result.rowcount} cases")
+
+
+async def run(args) -> None:
+    if args.cleanup:
+        await cleanup()
+        await engine.dispose()
+        return
+
+    await seed(args.cases)
+    admin = Principal(0, "admin", True)
+    print(f"\n{'='*72}")
+    print(f"  search_cases over {args.cases} cases, {args.iterations} runs per query")
+    print(f"{'='*72}")
+    print(f"  {'query':<28} {'hits':>5} {'p50 ms':>8} {'p99 ms':>8}  top result")
+    for query in QUERIES:
+        timings = []
+        for _ in range(args.iterations):
+            async with async_session_maker() as db:
+                started = time.perf_counter()
+                results = await search_cases(db, query, admin, limit=args.limit)
+                timings.append((time.perf_counter() - started) * 1000)
+        top = results[0][0].full_name if results else "—"
+        print(f"  {query:<28} {len(results):>5} {percentile(timings, 50):>8.1f} {percentile(timings, 99):>8.1f}  {top}")
+    print(f"{'='*72}\n")
+    await engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cases", type=int, default=100_000)
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--cleanup", action="store_true", help="delete the seeded BENCH-* cases")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Benchmark building the bankruptcy petition context.
+
+Builds an in-memory case with many debts (no database needed) and measures
+how long build_petition_context takes with cold and warm formatting caches.
+
+Usage:
+    cd api && python scripts/benchmark_document_context.py
+    cd api && python scripts/benchmark_document_context.py --debts 500 --iterations 200
+"""
+import argparse
+import random
+import sys
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+from pathlib import Path
+
+# Add api directory to path for imports (parent of scripts/)
+api_dir = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(api_dir))
+
+from models.case import Case, Creditor, Debt, Income, Property, Transaction
+from services import document_context
+from services.document_context import build_petition_context
+
+CREDITOR_NAMES = [
+    "ПАО Сбербанк",
+    "АО 'Тинькофф Банк'",
+    "АО 'Альфа-Банк'",
+    "ООО МКК 'Быстроденьги'",
+    "ООО МФК 'Займер'",
+    "Банк ВТБ (ПАО)",
+]
+TRANSACTION_TYPES = ["real_estate", "securities", "llc_shares", "vehicles"]
+
+
+def build_case(debts: int, seed: int = 42) -> Case:
+    """Build a transient case with the given number of debts."""
+    rng = random.Random(seed)
+    case = Case(
+        case_number="BP-2026-9999",
+        full_name="Иванов Иван Иванович",
+        birth_date=date(1985, 6, 20),
+        passport_issued_date=date(2015, 3, 15),
+        gender="M",
+        marital_status="married",
+        total_debt=Decimal("0"),
+    )
+    case.creditors = [
+        Creditor(
+            number=idx,
+            name=name,
+            ogrn="1027700132195",
+            debt_amount=Decimal(rng.randint(10_000, 900_000)),
+        )
+        for idx, name in enumerate(CREDITOR_NAMES, 1)
+    ]
+    case.debts = [
+        Debt(
+            number=idx,
+            creditor_name=rng.choice(CREDITOR_NAMES),
+            amount_rubles=rng.randint(1_000, 500_000),
+            amount_kopecks=rng.randint(0, 99),
+            source=rng.choice(["ОКБ", "НБКИ", "СКОРИНГ БЮРО"]),
+        )
+        for idx in range(1, debts + 1)
+    ]
+    case.total_debt = Decimal(sum(d.amount_rubles for d in case.debts))
+    case.children = []
+    case.income_records = [
+        Income(year=str(2021 + i), amount_rubles=rng.randint(500_000, 1_500_000), amount_kopecks=0)
+        for i in range(3)
+    ]
+    case.properties = [
+        Property(property_type="real_estate", description="Квартира", is_pledged=False),
+        Property(
+            property_type="vehicle",
+            description="Автомобиль",
+            vehicle_make="Toyota",
+            vehicle_model="Camry",
+            vehicle_year=2019,
+            is_pledged=False,
+        ),
+    ]
+    case.transactions = [
+        Transaction(
+            transaction_type=rng.choice(TRANSACTION_TYPES),
+            description=f"Сделка №{i}",
+            transaction_date=date(2023, 1, 1) + timedelta(days=i),
+            amount=Decimal(rng.randint(1_000, 100_000)),
+        )
+        for i in range(20)
+    ]
+    return case
+
+
+def clear_caches() -> None:
+    for name in dir(document_context):
+        func = getattr(document_context, name)
+        if hasattr(func, "cache_clear"):
+            func.cache_clear()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--debts", type=int, default=500)
+    parser.add_argument("--iterations", type=int, default=100)
+    args = parser.parse_args()
+
+    case = build_case(args.debts)
+
+    clear_caches()
+    started = time.perf_counter()
+    context = build_petition_context(case)
+    cold_ms = (time.perf_counter() - started) * 1000
+
+    started = time.perf_counter()
+    for _ in range(args.iterations):
+        build_petition_context(case)
+    warm_ms = (time.perf_counter() - started) * 1000 / args.iterations
+
+    print(f"\n{'='*60}")
+    print(f"  build_petition_context: {args.debts} debts")
+    print(f"{'='*60}")
+    print(f"  Cold caches:  {cold_ms:8.2f} ms")
+    print(f"  Warm caches:  {warm_ms:8.2f} ms (mean of {args.iterations})")
+    print(f"  Debts in context: {len(context['debts'])}")
+    print(f"  Total debt: {context['total_debt_in_words']}")
+    print(f"{'='*60}\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+Benchmark document generation for every registered template.
+
+Builds small, median and extreme synthetic cases with the generators from
+create_test_case.py (no database needed) and measures, per document type and
+output format:
+- context build time
+- render time
+- save time (through a LocalStorage in a temporary directory)
+- peak Python memory of one build + render (tracemalloc)
+
+Timings are the median of --iterations runs. Results are written as JSON so
+runs from different commits can be compared with --compare.
+
+Usage:
+    cd api && python scripts/benchmark_documents.py
+    cd api && python scripts/benchmark_documents.py --sizes small median --iterations 3
+    cd api && python scripts/benchmark_documents.py --output before.json
+    cd api && python scripts/benchmark_documents.py --compare before.json --threshold 0.2
+"""
+import argparse
+import asyncio
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+
+# Add api directory to path for imports (parent of scripts/)
+api_dir = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(api_dir))
+
+from scripts.create_test_case import CASE_SIZES, build_test_case
+from services.document_registry import document_registry
+from services.storage import LocalStorage
+
+BENCHMARK_SIZES = ("small", "median", "extreme")
+TIMED_METRICS = ("context_ms", "render_ms", "save_ms")
+
+
+def git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=api_dir, capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _elapsed_ms(started: float) -> float:
+    return (time.perf_counter() - started) * 1000
+
+
+def measure_peak_memory(doc_type, case, output_format: str) -> int:
+    """Peak traced allocation (bytes) of one context build + render"""
+    tracemalloc.start()
+    try:
+        doc_type.render_context(doc_type.build_context(case), output_format)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+async def benchmark_document(doc_type, case, output_format: str, storage, iterations: int) -> dict:
+    timings = {metric: [] for metric in TIMED_METRICS}
+    size_bytes = 0
+    for iteration in range(iterations):
+        started = time.perf_counter()
+        context = doc_type.build_context(case)
+        timings["context_ms"].append(_elapsed_ms(started))
+
+        started = time.perf_counter()
+        buffer = doc_type.render_context(context, output_format)
+        timings["render_ms"].append(_elapsed_ms(started))
+
+        started = time.perf_counter()
+        size_bytes = await storage.save(f"{case.case_number}/{doc_type.key}_{iteration}.{output_format}", buffer)
+        timings["save_ms"].append(_elapsed_ms(started))
+
+    result = {metric: round(statistics.median(values), 3) for metric, values in timings.items()}
+    result["total_ms"] = round(sum(result[m] for m in TIMED_METRICS), 3)
+    result["peak_memory_kb"] = measure_peak_memory(doc_type, case, output_format) // 1024
+    result["size_bytes"] = size_bytes
+    return result
+
+
+async def run(sizes: list[str], iterations: int) -> dict:
+    results = []
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        storage = LocalStorage(Path(tmp_dir))
+        for size in sizes:
+            case = build_test_case(f"BENCH-{size.upper()}", **CASE_SIZES[size])
+            for doc_type in document_registry.available():
+                # Warm-up: template load and Jinja compilation are one-off costs
+                doc_type.render(case, doc_type.output_formats[0])
+                for output_format in doc_type.output_formats:
+                    measured = await benchmark_document(doc_type, case, output_format, storage, iterations)
+                    results.append({
+                        "case": size,
+                        "document_type": doc_type.key,
+                        "output_format": output_format,
+                        **CASE_SIZES[size],
+                        **measured,
+                    })
+    return {
+        "commit": git_commit(),
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "iterations": iterations,
+        "results": results,
+    }
+
+
+def _result_key(result: dict) -> tuple:
+    return result["case"], result["document_type"], result["output_format"]
+
+
+def compare(baseline: dict, current: dict, threshold: float) -> list[str]:
+    """Regressions where total time or peak memory grew by more than threshold"""
+    previous = {_result_key(r): r for r in baseline["results"]}
+    regressions = []
+    for result in current["results"]:
+        before = previous.get(_result_key(result))
+        if before is None:
+            continue
+        for metric in ("total_ms", "peak_memory_kb"):
+            if before[metric] and result[metric] > before[metric] * (1 + threshold):
+                regressions.append(
+                    f"{'/'.join(_result_key(result))} {metric}: "
+                    f"{before[metric]} -> {result[metric]} "
+                    f"(+{(result[metric] / before[metric] - 1) * 100:.0f}%)"
+                )
+    return regressions
+
+
+def print_report(report: dict) -> None:
+    print(f"\n{'='*96}")
+    print(f"  Document benchmarks @ {report['commit'] or 'unknown commit'} "
+          f"(median of {report['iterations']})")
+    print(f"{'='*96}")
+    print(f"  {'case':<8} {'document':<24} {'fmt':<5} {'context':>10} {'render':>10} "
+          f"{'save':>9} {'peak KB':>9} {'size KB':>9}")
+    for r in report["results"]:
+        print(f"  {r['case']:<8} {r['document_type']:<24} {r['output_format']:<5} "
+              f"{r['context_ms']:>8.2f}ms {r['render_ms']:>8.2f}ms {r['save_ms']:>7.2f}ms "
+              f"{r['peak_memory_kb']:>9} {r['size_bytes'] // 1024:>9}")
+    print(f"{'='*96}\n")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", nargs="+", choices=BENCHMARK_SIZES, default=list(BENCHMARK_SIZES))
+    parser.add_argument("--iterations", type=int, default=5)
+    parser.add_argument("--output", type=Path, help="JSON file for results (default: benchmark-<commit>.json)")
+    parser.add_argument("--compare", type=Path, help="baseline JSON from an earlier run")
+    parser.add_argument("--threshold", type=float, default=0.25, help="allowed relative slowdown")
+    args = parser.parse_args()
+
+    report = asyncio.run(run(args.sizes, args.iterations))
+    print_report(report)
+
+    output = args.output or Path(f"benchmark-{report['commit'] or 'local'}.json")
+    output.write_text(json.dumps(report, ensure_ascii=False, indent=2))
+    print(f"  Results saved to {output}")
+
+    if args.compare:
+        regressions = compare(json.loads(args.compare.read_text()), report, args.threshold)
+        if regressions:
+            print(f"\n  Regressions vs {args.compare}:")
+            for line in regressions:
+                print(f"    - {line}")
+            sys.exit(1)
+        print(f"  No regressions vs {args.compare}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Link existing case creditors to the shared creditor directory.
+
+Run this script AFTER the Alembic migration 011_creditor_directory.
+
+Every legal-entity creditor with an OGRN is registered in (or matched to)
+the directory and linked to it; its INN copy is cleared where it equals
+the entry's. Addresses typed into cases are not published: new entries get
+no address (admins add it via PATCH /api/creditor-directory/{id}), and
+each creditor keeps its own. Work is done in batches of --batch-size
+creditors, one transaction each, so the script can be interrupted and rerun.
+
+--unlink does the reverse (copies directory INN/address back into the case
+creditors and clears the links); run it before downgrading migration 011.
+
+Usage:
+    cd api && python scripts/build_creditor_directory.py
+    cd api && python scripts/build_creditor_directory.py --batch-size 200
+    cd api && python scripts/build_creditor_directory.py --unlink
+"""
+import argparse
+import asyncio
+import sys
+from pathlib import Path
+
+# Add api directory to path for imports (parent of scripts/)
+api_dir = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(api_dir))
+
+from sqlalchemy import or_, select
+
+from database import async_session_maker, engine
+from models.case import Creditor
+from services.creditor_directory import PRIVATE_CREDITOR_TYPES, CreditorDirectory, apply_entry
+
+
+def _batch(last_id: int, batch_size: int, linked: bool):
+    statement = select(Creditor).where(Creditor.id > last_id).order_by(Creditor.id).limit(batch_size)
+    if linked:
+        return statement.where(Creditor.directory_id.is_not(None))
+    return statement.where(
+        Creditor.directory_id.is_(None),
+        Creditor.ogrn.is_not(None),
+        or_(Creditor.creditor_type.is_(None), Creditor.creditor_type.not_in(PRIVATE_CREDITOR_TYPES)),
+    )
+
+
+async def link(batch_size: int) -> None:
+    linked = entries = last_id = 0
+    while True:
+        async with async_session_maker() as db:
+            creditors = list((await db.execute(_batch(last_id, batch_size, linked=False))).scalars().all())
+            if not creditors:
+                break
+            directory = CreditorDirectory(db)
+            for creditor in creditors:
+                data = {
+                    "name": creditor.name,
+                    "ogrn": creditor.ogrn,
+                    "inn": creditor.own_inn,
+                    "address": creditor.own_address,
+                    "creditor_type": creditor.creditor_type,
+                }
+                entry = await directory.register({**data, "address": None})
+                if entry is None:
+                    continue
+                entries += entry.usage_count == 0
+                values = apply_entry(data, entry)
+                creditor.directory_entry = entry
+                creditor.own_inn = values["inn"]
+                creditor.own_address = values["address"]
+                entry.usage_count += 1
+                linked += 1
+            await db.commit()
+            last_id = creditors[-1].id
+            print(f"  ... up to creditor {last_id}: {linked} linked")
+    print(f"Linked {linked} creditors to {entries} new directory entries")
+
+
+async def unlink(batch_size: int) -> None:
+    unlinked = last_id = 0
+    while True:
+        async with async_session_maker() as db:
+            creditors = list((await db.execute(_batch(last_id, batch_size, linked=True))).scalars().all())
+            if not creditors:
+                break
+            for creditor in creditors:
+                # The properties fall back to the entry while the link exists
+                creditor.own_inn, creditor.own_address = creditor.inn, creditor.address
+                creditor.directory_entry = None
+                unlinked += 1
+            await db.commit()
+            last_id = creditors[-1].id
+    print(f"Unlinked {unlinked} creditors")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--unlink", action="store_true", help="copy directory data back and remove the links")
+    args = parser.parse_args()
+
+    async def run() -> None:
+        await (unlink if args.unlink else link)(args.batch_size)
+        await engine.dispose()
+
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    main()
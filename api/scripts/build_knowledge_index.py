@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Build the AI retrieval index (KNOWLEDGE_INDEX_PATH) from the law text and docs.
+
+Sources:
+- every *.txt in --law-dir: law text, split into passages at "Статья N." lines
+  (put the current 127-FZ text there, e.g. exported from pravo.gov.ru)
+- every *.md in --docs-dir: our own material, split at headings
+
+Usage:
+    cd api && python scripts/build_knowledge_index.py
+    cd api && python scripts/build_knowledge_index.py --law-dir knowledge --docs-dir ../docs
+    cd api && python scripts/build_knowledge_index.py --query "Какие сделки оспаривает финансовый управляющий?"
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+# Add api directory to path for imports (parent of scripts/)
+api_dir = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(api_dir))
+
+from config import settings
+from services.knowledge_index import (
+    KnowledgeIndex,
+    build_index,
+    iter_law_passages,
+    iter_markdown_passages,
+)
+
+
+def collect_passages(law_dir: Path, docs_dir: Path) -> list:
+    passages = []
+    for path in sorted(law_dir.glob("*.txt")):
+        passages += list(iter_law_passages(path))
+        print(f"  {path.name}: {len(passages)} passages so far")
+    for path in sorted(docs_dir.glob("*.md")):
+        passages += list(iter_markdown_passages(path))
+        print(f"  {path.name}: {len(passages)} passages so far")
+    return passages
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--law-dir", type=Path, default=api_dir / "knowledge")
+    parser.add_argument("--docs-dir", type=Path, default=api_dir.parent / "docs")
+    parser.add_argument("--output", type=Path, default=Path(settings.KNOWLEDGE_INDEX_PATH))
+    parser.add_argument("--query", help="search the built index and print the top passages")
+    args = parser.parse_args()
+
+    passages = collect_passages(args.law_dir, args.docs_dir)
+    if not passages:
+        sys.exit(f"No passages found in {args.law_dir} or {args.docs_dir}")
+
+    data = build_index(passages)
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    args.output.write_bytes(data)
+    print(f"Wrote {args.output}: {len(passages)} passages, {len(data) // 1024} KB")
+
+    started = time.perf_counter()
+    index = KnowledgeIndex(args.output)
+    print(f"Index loads in {(time.perf_counter() - started) * 1000:.2f} ms")
+    if args.query:
+        started = time.perf_counter()
+        results = index.search(args.query, k=settings.AI_RETRIEVAL_TOP_K)
+        print(f"Query took {(time.perf_counter() - started) * 1000:.2f} ms")
+        for passage in results:
+            print(f"  [{passage.score:.2f}] {passage.source}, {passage.title}: {passage.text[:120]}…")
+    index.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+"""
+Purge expired and long-revoked refresh tokens once.
+
+The API runs the same compaction periodically (REFRESH_TOKEN_COMPACTION_INTERVAL_MINUTES);
+use this script from cron when the background job is disabled.
+
+Usage:
+    cd api && python scripts/compact_refresh_tokens.py
+    cd api && python scripts/compact_refresh_tokens.py --batch-size 5000 --retention-days 1
+"""
+import argparse
+import asyncio
+import sys
+from datetime import timedelta
+from pathlib import Path
+
+# Add api directory to path for imports (parent of scripts/)
+api_dir = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(api_dir))
+
+from config import settings
+from database import async_session_maker, engine
+from services.auth_service import auth_service
+
+
+async def run(batch_size: int, retention_days: int) -> None:
+    async with async_session_maker() as db:
+        deleted = await auth_service.purge_refresh_tokens(
+            db, batch_size=batch_size, revoked_retention=timedelta(days=retention_days)
+        )
+    await engine.dispose()
+    print(f"Purged {deleted} refresh tokens")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--batch-size", type=int, default=settings.REFRESH_TOKEN_PURGE_BATCH_SIZE)
+    parser.add_argument("--retention-days", type=int, default=settings.REFRESH_TOKEN_REVOKED_RETENTION_DAYS)
+    args = parser.parse_args()
+    asyncio.run(run(args.batch_size, args.retention_days))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Create the creditor notification template (docxtpl / Jinja2 syntax).
+
+One letter is rendered per creditor by the "creditor_notification" document
+type; the per-creditor fields are available as {{ creditor.* }}.
+
+Usage:
+    python scripts/create_creditor_notification_template.py
+"""
+from pathlib import Path
+
+from docx import Document
+from docx.shared import Pt, Inches
+from docx.enum.text import WD_ALIGN_PARAGRAPH
+
+doc = Document()
+
+style = doc.styles['Normal']
+style.font.name = 'Times New Roman'
+style.font.size = Pt(12)
+
+# Russian GOST margins
+for section in doc.sections:
+    section.top_margin = Inches(0.79)
+    section.bottom_margin = Inches(0.79)
+    section.left_margin = Inches(1.18)
+    section.right_margin = Inches(0.59)
+
+
+def add_right(text):
+    p = doc.add_paragraph()
+    p.alignment = WD_ALIGN_PARAGRAPH.RIGHT
+    p.add_run(text)
+
+
+# === HEADER (RIGHT-ALIGNED) ===
+add_right('Кредитору:')
+add_right('{{ creditor.name }}')
+add_right('ОГРН/ИНН: {{ creditor.ogrn }}/{{ creditor.inn }}')
+add_right('{{ creditor.address }}')
+
+doc.add_paragraph()
+
+add_right('от должника:')
+add_right('{{ debtor_full_name }}')
+add_right('{{ debtor_birth_date }} г.р.')
+add_right('{{ debtor_address }}')
+
+doc.add_paragraph()
+
+p = doc.add_paragraph()
+p.alignment = WD_ALIGN_PARAGRAPH.CENTER
+run = p.add_run('УВЕДОМЛЕНИЕ')
+run.bold = True
+
+p = doc.add_paragraph()
+p.alignment = WD_ALIGN_PARAGRAPH.CENTER
+p.add_run('о намерении обратиться в арбитражный суд с заявлением о признании гражданина банкротом')
+
+doc.add_paragraph()
+
+doc.add_paragraph(
+    'Я, {{ debtor_full_name }}, {{ debtor_birth_date }} года рождения, в соответствии с п. 3 ст. 213.4 '
+    'Федерального закона от 26.10.2002 № 127-ФЗ «О несостоятельности (банкротстве)» уведомляю '
+    'о намерении обратиться в {{ court_name }} с заявлением о признании меня несостоятельным (банкротом).'
+)
+
+doc.add_paragraph(
+    'Задолженность перед {{ creditor.name }}'
+    '{% if creditor.contract_number %} по договору № {{ creditor.contract_number }}'
+    '{% if creditor.contract_date %} от {{ creditor.contract_date }}{% endif %}{% endif %}'
+    ' составляет {{ creditor.amount_in_words }}.'
+)
+
+doc.add_paragraph(
+    'Общий размер обязательств перед {{ creditors_count }} кредиторами составляет {{ total_debt_in_words }}.'
+)
+
+doc.add_paragraph(
+    'Финансовый управляющий будет утвержден из числа членов {{ sro_name }}. '
+    'Требования кредиторов рассматриваются в порядке, установленном ст. 213.8 указанного закона.'
+)
+
+# Signature
+doc.add_paragraph()
+doc.add_paragraph()
+doc.add_paragraph('{{ notification_date }}\t\t\t\t\t_____________ / {{ debtor_surname }} {{ debtor_initials }}')
+
+output_path = Path(__file__).resolve().parent.parent / "templates" / "creditor_notification_template_v1_jinja2.docx"
+doc.save(str(output_path))
+print(f"✅ Template created: {output_path}")
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Load test: API latency during a burst of concurrent logins.
+
+Fires N concurrent POST /auth/login requests while probing GET /health every
+few milliseconds, and reports probe latency percentiles before and during
+the burst, login status codes (200 / 503 backpressure) and the password
+hashing pool stats from /health.
+
+With bcrypt on the event loop, probe p99 during the burst grows to roughly
+N x 250 ms / workers; with the hashing pool it should stay in milliseconds.
+
+Usage:
+    # API running locally (docker-compose up api)
+    cd api && python scripts/load_test_login.py
+    cd api && python scripts/load_test_login.py --base-url http://localhost:8000 --logins 50
+    cd api && python scripts/load_test_login.py --email user@example.com --password secret123
+"""
+import argparse
+import asyncio
+import secrets
+import statistics
+import time
+from collections import Counter
+
+import httpx
+
+
+def percentile(values: list[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def describe(values: list[float]) -> str:
+    if not values:
+        return "no samples"
+    return (
+        f"n={len(values):<5} p50={percentile(values, 50):7.1f}ms "
+        f"p99={percentile(values, 99):7.1f}ms max={max(values):7.1f}ms"
+    )
+
+
+async def probe(client: httpx.AsyncClient, stop: asyncio.Event, interval: float) -> list[float]:
+    """Latency (ms) of /health requests until stop is set"""
+    latencies = []
+    while not stop.is_set():
+        started = time.perf_counter()
+        await client.get("/health")
+        latencies.append((time.perf_counter() - started) * 1000)
+        await asyncio.sleep(interval)
+    return latencies
+
+
+async def login(client: httpx.AsyncClient, email: str, password: str) -> tuple[int, float]:
+    started = time.perf_counter()
+    response = await client.post("/auth/login", json={"email": email, "password": password})
+    return response.status_code, (time.perf_counter() - started) * 1000
+
+
+async def ensure_user(client: httpx.AsyncClient, email: str | None, password: str) -> str:
+    if email:
+        return email
+    email = f"loadtest-{secrets.token_hex(4)}@example.com"
+    response = await client.post(
+        "/auth/register",
+        json={"email": email, "password": password, "full_name": "Load Test"},
+    )
+    response.raise_for_status()
+    return email
+
+
+async def run(args) -> None:
+    limits = httpx.Limits(max_connections=args.logins + 10)
+    async with httpx.AsyncClient(base_url=args.base_url, timeout=60, limits=limits) as client:
+        email = await ensure_user(client, args.email, args.password)
+
+        stop = asyncio.Event()
+        baseline_task = asyncio.create_task(probe(client, stop, args.probe_interval))
+        await asyncio.sleep(args.baseline_seconds)
+        stop.set()
+        baseline = await baseline_task
+
+        stop = asyncio.Event()
+        burst_probe = asyncio.create_task(probe(client, stop, args.probe_interval))
+        started = time.perf_counter()
+        results = await asyncio.gather(
+            *(login(client, email, args.password) for _ in range(args.logins))
+        )
+        burst_seconds = time.perf_counter() - started
+        stop.set()
+        during = await burst_probe
+
+        hashing = (await client.get("/health")).json().get("password_hashing", {})
+
+    statuses = Counter(status for status, _ in results)
+    ok_latencies = [ms for status, ms in results if status == 200]
+
+    print(f"\n{'='*72}")
+    print(f"  {args.logins} concurrent logins against {args.base_url}")
+    print(f"{'='*72}")
+    print(f"  /health before burst:  {describe(baseline)}")
+    print(f"  /health during burst:  {describe(during)}")
+    print(f"  login (200):           {describe(ok_latencies)}")
+    print(f"  login statuses:        {dict(sorted(statuses.items()))}")
+    print(f"  burst duration:        {burst_seconds:.2f}s")
+    if hashing:
+        print(f"  hashing pool:          workers={hashing['workers']} queue_limit={hashing['queue_limit']} "
+              f"rejected_total={hashing['rejected_total']}")
+        if hashing["completed_total"]:
+            print(f"  mean queue wait:       "
+                  f"{hashing['wait_seconds_total'] / hashing['completed_total'] * 1000:.1f}ms")
+    if baseline and during:
+        print(f"  p99 slowdown:          x{percentile(during, 99) / max(statistics.median(baseline), 0.001):.1f} "
+              f"vs baseline median")
+    print(f"{'='*72}\n")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--logins", type=int, default=50)
+    parser.add_argument("--email", help="existing user (default: register a new one)")
+    parser.add_argument("--password", default="LoadTest123!")
+    parser.add_argument("--probe-interval", type=float, default=0.01, help="seconds between /health probes")
+    parser.add_argument("--baseline-seconds", type=float, default=2.0)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
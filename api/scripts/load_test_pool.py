@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Load test: query throughput as the connection pool size varies.
+
+For each pool size, runs --requests short transactions from --concurrency
+concurrent tasks (a bot burst) through an engine built with the same options
+as the API (database.engine_options), and reports throughput, latency
+percentiles and how long tasks waited for a pooled connection.
+
+The default query holds the connection for ~5 ms, like a typical request.
+Throughput should grow with the pool until the database (or
+max_connections) becomes the limit; past that point a larger pool only adds
+connections.
+
+Usage:
+    # PostgreSQL running locally (docker-compose up postgres)
+    cd api && python scripts/load_test_pool.py
+    cd api && python scripts/load_test_pool.py --pool-sizes 2,5,10,20,40 --concurrency 100
+    cd api && python scripts/load_test_pool.py --query "SELECT count(*) FROM cases"
+"""
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+# Add api directory to path for imports (parent of scripts/)
+api_dir = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(api_dir))
+
+from sqlalchemy import exc, text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from config import settings
+from database import engine_options, pool_stats
+
+
+def percentile(values: list[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+async def warm_up(engine) -> None:
+    async with engine.connect() as conn:
+        await conn.execute(text("SELECT 1"))
+
+
+async def run_pool_size(database_url: str, pool_size: int, args) -> dict:
+    engine = create_async_engine(
+        database_url,
+        **engine_options(database_url, pool_size=pool_size, max_overflow=0, pool_timeout=args.pool_timeout),
+    )
+    statement = text(args.query)
+    latencies: list[float] = []
+    errors = 0
+    remaining = args.requests
+
+    async def worker() -> None:
+        nonlocal remaining, errors
+        while remaining > 0:
+            remaining -= 1
+            started = time.perf_counter()
+            try:
+                async with engine.connect() as conn:
+                    await conn.execute(statement)
+            except exc.TimeoutError:
+                errors += 1
+                continue
+            latencies.append((time.perf_counter() - started) * 1000)
+
+    # Open the pool's connections before timing
+    await asyncio.gather(*(warm_up(engine) for _ in range(pool_size)))
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+    elapsed = time.perf_counter() - started
+    stats = pool_stats(engine)
+    await engine.dispose()
+
+    checkouts = stats.get("checkouts_total", 0)
+    return {
+        "pool_size": pool_size,
+        "throughput": len(latencies) / elapsed,
+        "p50": percentile(latencies, 50),
+        "p99": percentile(latencies, 99),
+        "mean_wait": stats.get("wait_seconds_total", 0) / checkouts * 1000 if checkouts else 0.0,
+        "max_wait": stats.get("max_wait_seconds", 0) * 1000,
+        "timeouts": errors,
+    }
+
+
+async def run(args) -> None:
+    database_url = args.database_url or settings.DATABASE_URL
+    pool_sizes = [int(size) for size in args.pool_sizes.split(",")]
+
+    print(f"\n{'='*78}")
+    print(f"  {args.requests} x {args.query!r}, {args.concurrency} concurrent tasks")
+    print(f"{'='*78}")
+    print(f"  {'pool':>5} {'req/s':>9} {'p50 ms':>8} {'p99 ms':>8} {'wait ms':>8} {'max wait':>9} {'timeouts':>9}")
+    for pool_size in pool_sizes:
+        r = await run_pool_size(database_url, pool_size, args)
+        print(
+            f"  {r['pool_size']:>5} {r['throughput']:>9.0f} {r['p50']:>8.1f} {r['p99']:>8.1f} "
+            f"{r['mean_wait']:>8.1f} {r['max_wait']:>9.1f} {r['timeouts']:>9}"
+        )
+    print(f"{'='*78}\n")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", help="default: DATABASE_URL")
+    parser.add_argument("--pool-sizes", default="1,2,5,10,20")
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--query", default="SELECT pg_sleep(0.005)")
+    parser.add_argument("--pool-timeout", type=float, default=settings.DB_POOL_TIMEOUT_SECONDS)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -9,6 +9,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from database import get_db
 from config import settings
 from services.auth_service import auth_service
+from services.principal_cache import Principal, principal_cache
 from models.user import User
 
 
@@ -16,12 +17,64 @@ from models.user import User
 bearer_scheme = HTTPBearer(auto_error=False)
 
 
+async def load_principal(db: AsyncSession, user_id: int) -> Optional[Principal]:
+    """Principal for a user ID, from the principal cache or the database."""
+    async def from_db(uid: int) -> Optional[Principal]:
+        user = await auth_service.get_user_by_id(db, uid)
+        return Principal.from_user(user) if user else None
+
+    return await principal_cache.get(user_id, from_db)
+
+
+async def get_current_principal(
+    credentials: HTTPAuthorizationCredentials = Depends(bearer_scheme),
+    db: AsyncSession = Depends(get_db)
+) -> Principal:
+    """
+    Get the authenticated caller (id, role, is_active) from JWT token.
+    Uses the principal cache instead of loading the user on every request.
+    Raises 401 if not authenticated, 403 if deactivated.
+    """
+    if not credentials:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Требуется авторизация",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+    payload = auth_service.decode_access_token(credentials.credentials)
+    if not payload:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Недействительный или истёкший токен",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+    principal = await load_principal(db, int(payload.get("sub")))
+    if not principal:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Пользователь не найден",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+    if not principal.is_active:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Аккаунт деактивирован"
+        )
+
+    return principal
+
+
 async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(bearer_scheme),
     db: AsyncSession = Depends(get_db)
 ) -> User:
     """
     Get current authenticated user from JWT token.
+    Loads the full User row; endpoints that only need id/role should use
+    get_current_principal.
     Raises 401 if not authenticated.
     """
     if not credentials:
@@ -92,12 +145,12 @@ def require_role(*roles: str):
     
     Usage:
         @router.get("/admin")
-        async def admin_only(user: User = Depends(require_role("admin"))):
+        async def admin_only(user: Principal = Depends(require_role("admin"))):
             ...
     """
     async def role_checker(
-        current_user: User = Depends(get_current_user)
-    ) -> User:
+        current_user: Principal = Depends(get_current_principal)
+    ) -> Principal:
         if current_user.role not in roles:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
@@ -148,9 +201,9 @@ async def get_user_or_api_token(
     request: Request,
     credentials: HTTPAuthorizationCredentials = Depends(bearer_scheme),
     db: AsyncSession = Depends(get_db)
-) -> Optional[User]:
+) -> Optional[Principal]:
     """
-    Returns User if JWT auth, None if API token auth.
+    Returns the caller's Principal if JWT auth, None if API token auth.
     Raises 401 if neither.
     """
     # Try API token first (for bot)
@@ -163,10 +216,9 @@ async def get_user_or_api_token(
         payload = auth_service.decode_access_token(token)
         
         if payload:
-            user_id = int(payload.get("sub"))
-            user = await auth_service.get_user_by_id(db, user_id)
-            if user and user.is_active:
-                return user
+            principal = await load_principal(db, int(payload.get("sub")))
+            if principal and principal.is_active:
+                return principal
     
     raise HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
@@ -0,0 +1,186 @@
+"""
+Answer cache and in-flight deduplication for the AI assistant.
+
+Provider calls take seconds, while many users ask the same FAQ-style
+questions. Questions are normalized (case, ё/е, punctuation, whitespace) and
+answers are kept in an in-process LRU with a TTL, keyed by the normalized
+question alone. The provider is left out on purpose: the router may answer
+from a fallback provider, and any provider's answer is as good as a fresh
+one for the TTL.
+
+Optionally (AI_CACHE_SIMILARITY_THRESHOLD > 0) a miss falls back to a
+similarity lookup: questions are embedded locally as hashed character
+trigram vectors and the closest cached question is used if its cosine
+similarity reaches the threshold. No model or external service is involved.
+
+Identical questions asked while a provider call is running wait for that
+call instead of starting their own. Failures are not cached.
+"""
+import asyncio
+import math
+import re
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable
+
+from config import settings
+
+EMBEDDING_DIMENSIONS = 4096
+_NON_WORD = re.compile(r"[^\w]+")
+
+
+def normalize_question(question: str) -> str:
+    """Canonical form used as the cache key"""
+    text = question.lower().replace("ё", "е")
+    return " ".join(_NON_WORD.sub(" ", text).split())
+
+
+def embed_question(normalized: str) -> dict[int, float]:
+    """Sparse unit vector of hashed character trigrams"""
+    padded = f" {normalized} "
+    counts: dict[int, float] = {}
+    for i in range(len(padded) - 2):
+        bucket = hash(padded[i:i + 3]) % EMBEDDING_DIMENSIONS
+        counts[bucket] = counts.get(bucket, 0.0) + 1.0
+    norm = math.sqrt(sum(v * v for v in counts.values())) or 1.0
+    return {k: v / norm for k, v in counts.items()}
+
+
+def cosine_similarity(a: dict[int, float], b: dict[int, float]) -> float:
+    if len(a) > len(b):
+        a, b = b, a
+    return sum(v * b.get(k, 0.0) for k, v in a.items())
+
+
+class _Entry:
+    __slots__ = ("answer", "expires_at", "embedding")
+
+    def __init__(self, answer: str, expires_at: float, embedding: dict[int, float] | None):
+        self.answer = answer
+        self.expires_at = expires_at
+        self.embedding = embedding
+
+
+class AIAnswerCache:
+    """LRU + TTL answer cache with coalescing of identical in-flight questions."""
+
+    def __init__(self, max_entries: int, ttl: float, similarity_threshold: float = 0.0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.similarity_threshold = similarity_threshold
+        self._entries: OrderedDict[str, _Entry] = OrderedDict()
+        self._in_flight: dict[str, asyncio.Future] = {}
+        self.hits = 0
+        self.similar_hits = 0
+        self.coalesced = 0
+        self.misses = 0
+
+    def _lookup(self, key: str) -> str | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry.expires_at <= time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return entry.answer
+
+    def _lookup_similar(self, key: str) -> str | None:
+        if self.similarity_threshold <= 0:
+            return None
+        embedding = embed_question(key)
+        now = time.monotonic()
+        best_key, best_score = None, self.similarity_threshold
+        for cached_key, entry in self._entries.items():
+            if entry.expires_at <= now:
+                continue
+            score = cosine_similarity(embedding, entry.embedding)
+            if score >= best_score:
+                best_key, best_score = cached_key, score
+        if best_key is None:
+            return None
+        self._entries.move_to_end(best_key)
+        return self._entries[best_key].answer
+
+    def _store(self, key: str, answer: str) -> None:
+        embedding = embed_question(key) if self.similarity_threshold > 0 else None
+        self._entries[key] = _Entry(answer, time.monotonic() + self.ttl, embedding)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def get(self, question: str, similar: bool = True) -> str | None:
+        """Cached answer (exact, then similar) without asking the provider"""
+        key = normalize_question(question)
+        answer = self._lookup(key)
+        if answer is not None:
+            self.hits += 1
+            return answer
+        answer = self._lookup_similar(key) if similar else None
+        if answer is not None:
+            self.similar_hits += 1
+            return answer
+        self.misses += 1
+        return None
+
+    def put(self, question: str, answer: str) -> None:
+        self._store(normalize_question(question), answer)
+
+    async def get_or_ask(
+        self,
+        question: str,
+        ask: Callable[[str], Awaitable[str]],
+        similar: bool = True,
+    ) -> str:
+        """
+        Cached answer, or ask(question) shared by all identical concurrent callers.
+        similar=False skips the similarity lookup (questions that embed case data).
+        """
+        key = normalize_question(question)
+
+        answer = self._lookup(key)
+        if answer is not None:
+            self.hits += 1
+            return answer
+
+        future = self._in_flight.get(key)
+        if future is not None:
+            self.coalesced += 1
+            return await asyncio.shield(future)
+
+        answer = self._lookup_similar(key) if similar else None
+        if answer is not None:
+            self.similar_hits += 1
+            return answer
+
+        self.misses += 1
+        # The call runs as its own task so one caller disconnecting does not cancel the others
+        task = asyncio.ensure_future(ask(question))
+        self._in_flight[key] = task
+        task.add_done_callback(lambda done: self._finish(key, done))
+        return await asyncio.shield(task)
+
+    def _finish(self, key: str, task: asyncio.Future) -> None:
+        self._in_flight.pop(key, None)
+        if not task.cancelled() and task.exception() is None:
+            self._store(key, task.result())
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._entries),
+            "in_flight": len(self._in_flight),
+            "hits": self.hits,
+            "similar_hits": self.similar_hits,
+            "coalesced": self.coalesced,
+            "misses": self.misses,
+        }
+
+
+ai_answer_cache = AIAnswerCache(
+    max_entries=settings.AI_CACHE_MAX_ENTRIES,
+    ttl=settings.AI_CACHE_TTL_SECONDS,
+    similarity_threshold=settings.AI_CACHE_SIMILARITY_THRESHOLD,
+)
@@ -0,0 +1,252 @@
+"""
+Case context for the AI assistant.
+
+Turns a Case aggregate into a compact summary the assistant can reason
+about ("what is missing for my petition?"). The summary is built from counts,
+totals, flags and which required fields are empty; it never contains names,
+document numbers, addresses, contacts, VINs or free-text notes, so no PII
+leaves the system.
+
+Lines are ordered by importance and dropped from the end to fit
+AI_CASE_CONTEXT_MAX_TOKENS. Summaries are cached per case and reused while
+Case.updated_at is unchanged (child rows bump it, see models.case), so the
+aggregate is only loaded and decrypted when the case changes.
+"""
+from collections import Counter, OrderedDict
+from datetime import date
+from decimal import Decimal
+
+from fastapi import HTTPException
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from config import settings
+from models import Case
+from services.document_context import format_thousands
+from utils.authorization import case_load_options, check_case_ownership
+
+# Rough size of a token in Cyrillic text for the providers' tokenizers
+CHARS_PER_TOKEN = 3
+TRUNCATION_MARK = "…(сведения сокращены)"
+
+CREDITOR_TYPE_LABELS = {"bank": "банки", "mfo": "МФО", "individual": "физлица"}
+PROPERTY_TYPE_LABELS = {"real_estate": "недвижимость", "vehicle": "транспорт", "other": "прочее"}
+TRANSACTION_TYPE_LABELS = {
+    "real_estate": "недвижимость",
+    "securities": "ценные бумаги",
+    "llc_shares": "доли в ООО",
+    "vehicles": "транспорт",
+}
+
+# Case fields needed for the petition: (attribute, label)
+REQUIRED_CASE_FIELDS = (
+    ("passport_series", "серия паспорта"),
+    ("passport_number", "номер паспорта"),
+    ("passport_issued_by", "кем выдан паспорт"),
+    ("passport_issued_date", "дата выдачи паспорта"),
+    ("birth_date", "дата рождения"),
+    ("registration_address", "адрес регистрации"),
+    ("inn", "ИНН"),
+    ("snils", "СНИЛС"),
+    ("procedure_type", "тип процедуры"),
+    ("court_name", "наименование суда"),
+    ("sro_name", "СРО финансового управляющего"),
+    ("insolvency_grounds", "основания неплатёжеспособности"),
+)
+
+
+def estimate_tokens(text: str) -> int:
+    return -(-len(text) // CHARS_PER_TOKEN)
+
+
+def _rub(amount: Decimal | int | float | None) -> str:
+    return f"{format_thousands(int(amount or 0))} руб."
+
+
+def _age(birth_date: date | None, today: date) -> int | None:
+    if birth_date is None:
+        return None
+    return today.year - birth_date.year - ((today.month, today.day) < (birth_date.month, birth_date.day))
+
+
+def _grouped(rows, label_of, amount_of=None, labels: dict | None = None) -> str:
+    """'банки: 3 (1 200 000 руб.), МФО: 2 (...)' grouped by label_of(row)"""
+    counts, sums = Counter(), Counter()
+    for row in rows:
+        key = label_of(row) or "не указан"
+        counts[key] += 1
+        if amount_of is not None:
+            sums[key] += int(amount_of(row) or 0)
+    parts = []
+    for key, count in counts.most_common():
+        label = (labels or {}).get(key, key)
+        parts.append(f"{label}: {count}" + (f" ({_rub(sums[key])})" if amount_of is not None else ""))
+    return ", ".join(parts)
+
+
+def missing_fields(case: Case) -> list[str]:
+    missing = [label for field, label in REQUIRED_CASE_FIELDS if not getattr(case, field)]
+    if not case.creditors:
+        missing.append("список кредиторов")
+    if not case.total_debt:
+        missing.append("общая сумма долга")
+    if case.marital_status in ("married", "divorced") and not (
+        case.marriage_certificate_number or case.divorce_certificate_number
+    ):
+        missing.append("свидетельство о браке/разводе")
+    if case.is_self_employed and not case.income_records:
+        missing.append("доходы самозанятого по годам")
+    return missing
+
+
+def build_case_summary_lines(case: Case, today: date | None = None) -> list[str]:
+    """PII-free summary lines, most important first"""
+    today = today or date.today()
+    lines = [
+        f"Процедура: {case.procedure_type or 'не выбрана'}; статус дела: {case.status}",
+        f"Общий долг: {_rub(case.total_debt)}; кредиторов: {len(case.creditors)}",
+    ]
+
+    missing = missing_fields(case)
+    lines.append("Не заполнено: " + (", ".join(missing) if missing else "всё обязательное заполнено"))
+
+    if case.creditors:
+        lines.append("Кредиторы по типам: " + _grouped(
+            case.creditors, lambda c: c.creditor_type, lambda c: c.debt_amount, CREDITOR_TYPE_LABELS
+        ))
+        debt_types = _grouped(case.creditors, lambda c: c.debt_type)
+        lines.append(f"Виды задолженности: {debt_types}")
+    if case.debts:
+        lines.append("Долги по кредитным отчётам: " + _grouped(
+            case.debts, lambda d: d.source, lambda d: d.amount_rubles
+        ))
+
+    flags = [
+        f"недвижимость: {'да' if case.has_real_estate else 'нет'}",
+        f"движимое имущество: {'да' if case.has_movable_property else 'нет'}",
+    ]
+    if case.properties:
+        pledged = sum(1 for p in case.properties if p.is_pledged)
+        flags.append(_grouped(case.properties, lambda p: p.property_type, labels=PROPERTY_TYPE_LABELS))
+        flags.append(f"в залоге: {pledged}")
+    lines.append("Имущество: " + "; ".join(flags))
+
+    if case.transactions:
+        lines.append("Сделки за 3 года: " + _grouped(
+            case.transactions, lambda t: t.transaction_type, lambda t: t.amount, TRANSACTION_TYPE_LABELS
+        ))
+    else:
+        lines.append("Сделки за 3 года: нет сведений")
+
+    ages = [_age(child.child_birth_date, today) for child in case.children]
+    minors = sum(1 for age in ages if age is not None and age < 18)
+    family = f"Семейное положение: {case.marital_status or 'не указано'}; детей: {len(ages)}"
+    if ages:
+        family += f" (несовершеннолетних: {minors})"
+    lines.append(family)
+
+    employment = "работает" if case.is_employed else "не работает"
+    if case.is_self_employed:
+        employment += ", самозанятый"
+    lines.append(f"Занятость: {employment}; доход в месяц: {_rub(case.monthly_income)}")
+    if case.income_records:
+        incomes = ", ".join(
+            f"{record.year}: {_rub(record.amount_rubles)}"
+            for record in sorted(case.income_records, key=lambda r: r.year)
+        )
+        lines.append(f"Доходы по годам: {incomes}")
+
+    return lines
+
+
+def fit_to_budget(lines: list[str], max_tokens: int) -> str:
+    """Join lines, dropping the least important ones to stay within max_tokens"""
+    text = "\n".join(lines)
+    if estimate_tokens(text) <= max_tokens:
+        return text
+    kept = []
+    for line in lines:
+        candidate = "\n".join([*kept, line, TRUNCATION_MARK])
+        if estimate_tokens(candidate) > max_tokens:
+            break
+        kept.append(line)
+    return "\n".join([*kept, TRUNCATION_MARK])
+
+
+def build_case_summary(case: Case, max_tokens: int | None = None) -> str:
+    return fit_to_budget(
+        build_case_summary_lines(case),
+        max_tokens or settings.AI_CASE_CONTEXT_MAX_TOKENS,
+    )
+
+
+def build_case_question(summary: str, question: str) -> str:
+    """User message for a question about a specific case"""
+    return (
+        "Сведения о деле пользователя (обезличены):\n"
+        f"{summary}\n\n"
+        f"Вопрос: {question}"
+    )
+
+
+class CaseContextCache:
+    """Case summaries keyed by case ID, valid while updated_at is unchanged (LRU)."""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: OrderedDict[int, tuple[object, str]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, case_id: int, updated_at) -> str | None:
+        entry = self._entries.get(case_id)
+        if entry is None or entry[0] != updated_at:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(case_id)
+        self.hits += 1
+        return entry[1]
+
+    def put(self, case_id: int, updated_at, summary: str) -> None:
+        self._entries[case_id] = (updated_at, summary)
+        self._entries.move_to_end(case_id)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+case_context_cache = CaseContextCache(max_entries=settings.AI_CASE_CONTEXT_CACHE_SIZE)
+
+
+async def get_case_context(db: AsyncSession, case_id: int, current_user) -> str:
+    """
+    Cached summary of a case for the assistant.
+    Access is checked on a single-row query; the aggregate is loaded only on a cache miss.
+    current_user is None for API token (bot) requests.
+    """
+    row = (await db.execute(
+        select(Case.id, Case.case_number, Case.owner_id, Case.updated_at).where(Case.id == case_id)
+    )).one_or_none()
+    if row is None:
+        raise HTTPException(status_code=404, detail="Дело не найдено")
+    if current_user:
+        check_case_ownership(row, current_user)
+
+    summary = case_context_cache.get(case_id, row.updated_at)
+    if summary is not None:
+        return summary
+
+    case = (await db.execute(
+        select(Case)
+        .options(*case_load_options())
+        .where(Case.id == case_id)
+        .execution_options(populate_existing=True)
+    )).scalar_one()
+    summary = build_case_summary(case)
+    case_context_cache.put(case_id, case.updated_at, summary)
+    return summary
@@ -1,7 +1,34 @@
-import httpx
+"""
+AI assistant providers (Timeweb, YandexGPT) and the failover/hedging router.
+
+Providers keep one pooled httpx client for the life of the process.
+AIProviderRouter tries them in order: the configured AI_PROVIDER first,
+then any other provider with credentials. A provider that fails or exceeds
+its latency budget (AI_PROVIDER_TIMEOUT_SECONDS, or
+AI_FIRST_TOKEN_TIMEOUT_SECONDS before the first streamed chunk) is
+replaced by the next one.
+
+With AI_HEDGE_ENABLED, ask() also starts the next provider when the current
+one has not answered within its recent p95 latency and takes whichever
+answer comes first. Streams are not hedged: both vendors would be billed
+for the whole completion.
+"""
+import asyncio
+import json
+import logging
+import time
 from abc import ABC, abstractmethod
+from collections import deque
+from typing import AsyncIterator
+
+import httpx
 from config import settings
 
+logger = logging.getLogger(__name__)
+
+LATENCY_SAMPLES = 200
+MIN_HEDGE_SAMPLES = 20
+
 SYSTEM_PROMPT = """Ты — юридический AI-ассистент по банкротству физических лиц в России.
 
 Отвечай на вопросы по 127-ФЗ "О несостоятельности (банкротстве)":
@@ -14,70 +41,331 @@ SYSTEM_PROMPT = """Ты — юридический AI-ассистент по б
 - Ты НЕ заменяешь профессионального юриста
 - Рекомендуй консультацию со специалистом для конкретных случаев
 - Ссылайся на статьи 127-ФЗ где уместно
-- Отвечай кратко и понятно на русском языке"""
+- Отвечай кратко и понятно на русском языке
+- Если в вопросе приведены выдержки из закона, опирайся на них и указывай номер выдержки или статьи"""
+
+
+class AIProviderError(Exception):
+    """Every provider failed"""
 
 
 class AIProvider(ABC):
+    name = "provider"
+
     @abstractmethod
     async def ask(self, question: str) -> str:
         pass
 
+    async def stream(self, question: str) -> AsyncIterator[str]:
+        """Yield the answer in chunks as the provider produces them"""
+        yield await self.ask(question)
+
+    async def aclose(self) -> None:
+        pass
 
-class TimewebProvider(AIProvider):
-    def __init__(self):
-        self.api_key = settings.TIMEWEB_API_KEY
-        self.api_url = settings.TIMEWEB_API_URL
+
+class HTTPAIProvider(AIProvider):
+    """Provider with a long-lived pooled HTTP client"""
+
+    def __init__(self, transport: httpx.AsyncBaseTransport | None = None):
+        self.client = httpx.AsyncClient(
+            timeout=httpx.Timeout(60.0, connect=5.0),
+            limits=httpx.Limits(max_connections=20, max_keepalive_connections=10),
+            transport=transport,
+        )
+
+    async def aclose(self) -> None:
+        await self.client.aclose()
+
+
+class TimewebProvider(HTTPAIProvider):
+    name = "timeweb"
+
+    def __init__(self, api_key: str = None, api_url: str = None, transport: httpx.AsyncBaseTransport | None = None):
+        super().__init__(transport)
+        self.api_key = api_key if api_key is not None else settings.TIMEWEB_API_KEY
+        self.api_url = api_url or settings.TIMEWEB_API_URL
+
+    def _payload(self, question: str, stream: bool = False) -> dict:
+        return {
+            "model": "gpt-3.5-turbo",  # or another Timeweb model
+            "messages": [
+                {"role": "system", "content": SYSTEM_PROMPT},
+                {"role": "user", "content": question},
+            ],
+            "max_tokens": 1000,
+            "temperature": 0.7,
+            "stream": stream,
+        }
 
     async def ask(self, question: str) -> str:
-        async with httpx.AsyncClient(timeout=60.0) as client:
-            response = await client.post(
-                f"{self.api_url}/chat/completions",
-                headers={"Authorization": f"Bearer {self.api_key}"},
-                json={
-                    "model": "gpt-3.5-turbo",  # or another Timeweb model
-                    "messages": [
-                        {"role": "system", "content": SYSTEM_PROMPT},
-                        {"role": "user", "content": question},
-                    ],
-                    "max_tokens": 1000,
-                    "temperature": 0.7,
-                },
-            )
+        response = await self.client.post(
+            f"{self.api_url}/chat/completions",
+            headers={"Authorization": f"Bearer {self.api_key}"},
+            json=self._payload(question),
+        )
+        response.raise_for_status()
+        data = response.json()
+        return data["choices"][0]["message"]["content"]
+
+    async def stream(self, question: str) -> AsyncIterator[str]:
+        """OpenAI-compatible SSE: one `data: {...}` line per token delta"""
+        async with self.client.stream(
+            "POST",
+            f"{self.api_url}/chat/completions",
+            headers={"Authorization": f"Bearer {self.api_key}"},
+            json=self._payload(question, stream=True),
+        ) as response:
             response.raise_for_status()
-            data = response.json()
-            return data["choices"][0]["message"]["content"]
+            async for line in response.aiter_lines():
+                if not line.startswith("data:"):
+                    continue
+                data = line[5:].strip()
+                if data == "[DONE]":
+                    break
+                choices = json.loads(data).get("choices") or [{}]
+                delta = choices[0].get("delta", {}).get("content")
+                if delta:
+                    yield delta
 
 
-class YandexGPTProvider(AIProvider):
-    def __init__(self):
-        self.api_key = settings.YANDEXGPT_API_KEY
-        self.folder_id = settings.YANDEXGPT_FOLDER_ID
+class YandexGPTProvider(HTTPAIProvider):
+    name = "yandexgpt"
+    default_api_url = "https://llm.api.cloud.yandex.net/foundationModels/v1/completion"
+
+    def __init__(
+        self,
+        api_key: str = None,
+        folder_id: str = None,
+        api_url: str = None,
+        transport: httpx.AsyncBaseTransport | None = None,
+    ):
+        super().__init__(transport)
+        self.api_key = api_key if api_key is not None else settings.YANDEXGPT_API_KEY
+        self.folder_id = folder_id if folder_id is not None else settings.YANDEXGPT_FOLDER_ID
+        self.api_url = api_url or self.default_api_url
+
+    @property
+    def _headers(self) -> dict:
+        return {
+            "Authorization": f"Api-Key {self.api_key}",
+            "x-folder-id": self.folder_id,
+        }
+
+    def _payload(self, question: str, stream: bool = False) -> dict:
+        return {
+            "modelUri": f"gpt://{self.folder_id}/yandexgpt-lite",
+            "completionOptions": {"stream": stream, "maxTokens": 1000, "temperature": 0.7},
+            "messages": [
+                {"role": "system", "text": SYSTEM_PROMPT},
+                {"role": "user", "text": question},
+            ],
+        }
 
     async def ask(self, question: str) -> str:
-        async with httpx.AsyncClient(timeout=60.0) as client:
-            response = await client.post(
-                "https://llm.api.cloud.yandex.net/foundationModels/v1/completion",
-                headers={
-                    "Authorization": f"Api-Key {self.api_key}",
-                    "x-folder-id": self.folder_id,
-                },
-                json={
-                    "modelUri": f"gpt://{self.folder_id}/yandexgpt-lite",
-                    "completionOptions": {"maxTokens": 1000, "temperature": 0.7},
-                    "messages": [
-                        {"role": "system", "text": SYSTEM_PROMPT},
-                        {"role": "user", "text": question},
-                    ],
-                },
-            )
+        response = await self.client.post(self.api_url, headers=self._headers, json=self._payload(question))
+        response.raise_for_status()
+        data = response.json()
+        return data["result"]["alternatives"][0]["message"]["text"]
+
+    async def stream(self, question: str) -> AsyncIterator[str]:
+        """Streaming mode sends one JSON object per line with the full text so far"""
+        async with self.client.stream(
+            "POST", self.api_url, headers=self._headers, json=self._payload(question, stream=True)
+        ) as response:
             response.raise_for_status()
-            data = response.json()
-            return data["result"]["alternatives"][0]["message"]["text"]
+            sent = 0
+            async for line in response.aiter_lines():
+                if not line.strip():
+                    continue
+                text = json.loads(line)["result"]["alternatives"][0]["message"]["text"]
+                if len(text) > sent:
+                    yield text[sent:]
+                    sent = len(text)
+
+
+class ProviderStats:
+    """Recent latencies and counters of one provider"""
+
+    def __init__(self):
+        self.latencies: deque[float] = deque(maxlen=LATENCY_SAMPLES)
+        self.requests = 0
+        self.failures = 0
+
+    def percentile(self, pct: float) -> float | None:
+        if not self.latencies:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+class AIProviderRouter(AIProvider):
+    """Failover (and optional hedging) across providers in priority order."""
+
+    name = "router"
+
+    def __init__(
+        self,
+        providers: list[AIProvider],
+        timeout: float,
+        first_token_timeout: float,
+        hedge: bool = False,
+        hedge_percentile: float = 95,
+        hedge_min_delay: float = 2.0,
+    ):
+        if not providers:
+            raise ValueError("At least one AI provider is required")
+        self.providers = providers
+        self.timeout = timeout
+        self.first_token_timeout = first_token_timeout
+        self.hedge = hedge
+        self.hedge_percentile = hedge_percentile
+        self.hedge_min_delay = hedge_min_delay
+        self.provider_stats = {provider.name: ProviderStats() for provider in providers}
+        self.failovers = 0
+        self.hedged = 0
+
+    def hedge_delay(self, provider: AIProvider) -> float:
+        """Wait this long for provider before hedging: its recent p95, at least hedge_min_delay"""
+        stats = self.provider_stats[provider.name]
+        if len(stats.latencies) < MIN_HEDGE_SAMPLES:
+            return self.hedge_min_delay
+        return max(stats.percentile(self.hedge_percentile), self.hedge_min_delay)
+
+    async def _timed_ask(self, provider: AIProvider, question: str) -> str:
+        stats = self.provider_stats[provider.name]
+        stats.requests += 1
+        started = time.perf_counter()
+        try:
+            answer = await asyncio.wait_for(provider.ask(question), self.timeout)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            stats.failures += 1
+            raise
+        stats.latencies.append(time.perf_counter() - started)
+        return answer
+
+    async def ask(self, question: str) -> str:
+        candidates = list(self.providers)
+        pending: dict[asyncio.Task, AIProvider] = {}
+        errors = []
+
+        def launch() -> AIProvider:
+            provider = candidates.pop(0)
+            pending[asyncio.ensure_future(self._timed_ask(provider, question))] = provider
+            return provider
+
+        current = launch()
+        try:
+            while pending:
+                delay = self.hedge_delay(current) if self.hedge and candidates else None
+                done, _ = await asyncio.wait(pending, timeout=delay, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    self.hedged += 1
+                    current = launch()
+                    continue
+                for task in done:
+                    provider = pending.pop(task)
+                    if task.exception() is None:
+                        return task.result()
+                    errors.append(f"{provider.name}: {task.exception()!r}")
+                    logger.warning("AI provider %s failed: %r", provider.name, task.exception())
+                if not pending and candidates:
+                    self.failovers += 1
+                    current = launch()
+        finally:
+            for task in pending:
+                task.cancel()
+        raise AIProviderError("; ".join(errors))
+
+    async def stream(self, question: str) -> AsyncIterator[str]:
+        """Stream from the first provider that produces a chunk in time; no switching mid-answer"""
+        errors = []
+        for index, provider in enumerate(self.providers):
+            if index:
+                self.failovers += 1
+            stats = self.provider_stats[provider.name]
+            stats.requests += 1
+            started = time.perf_counter()
+            chunks = provider.stream(question)
+            try:
+                first = await asyncio.wait_for(anext(chunks), self.first_token_timeout)
+            except StopAsyncIteration:
+                first = ""
+            except Exception as e:
+                stats.failures += 1
+                errors.append(f"{provider.name}: {e!r}")
+                logger.warning("AI provider %s failed before first chunk: %r", provider.name, e)
+                await chunks.aclose()
+                continue
+
+            stats.latencies.append(time.perf_counter() - started)
+            try:
+                if first:
+                    yield first
+                async for chunk in chunks:
+                    yield chunk
+            finally:
+                await chunks.aclose()
+            return
+        raise AIProviderError("; ".join(errors))
+
+    def stats(self) -> dict:
+        return {
+            "failovers": self.failovers,
+            "hedged": self.hedged,
+            "providers": {
+                name: {
+                    "requests": stats.requests,
+                    "failures": stats.failures,
+                    "p95_ms": round(stats.percentile(95) * 1000) if stats.latencies else None,
+                }
+                for name, stats in self.provider_stats.items()
+            },
+        }
+
+    async def aclose(self) -> None:
+        for provider in self.providers:
+            await provider.aclose()
+
+
+PROVIDERS = {
+    "timeweb": (TimewebProvider, lambda: settings.TIMEWEB_API_KEY),
+    "yandexgpt": (YandexGPTProvider, lambda: settings.YANDEXGPT_API_KEY and settings.YANDEXGPT_FOLDER_ID),
+}
+
+_ai_provider: AIProviderRouter | None = None
+
+
+def build_ai_provider() -> AIProviderRouter:
+    """Configured provider first, then (AI_FALLBACK_ENABLED) every other provider with credentials"""
+    primary = settings.AI_PROVIDER.lower()
+    if primary not in PROVIDERS:
+        primary = "timeweb"  # default
+    names = [primary]
+    if settings.AI_FALLBACK_ENABLED:
+        names += [name for name, (_, configured) in PROVIDERS.items() if name != primary and configured()]
+    return AIProviderRouter(
+        [PROVIDERS[name][0]() for name in names],
+        timeout=settings.AI_PROVIDER_TIMEOUT_SECONDS,
+        first_token_timeout=settings.AI_FIRST_TOKEN_TIMEOUT_SECONDS,
+        hedge=settings.AI_HEDGE_ENABLED,
+        hedge_percentile=settings.AI_HEDGE_PERCENTILE,
+        hedge_min_delay=settings.AI_HEDGE_MIN_DELAY_SECONDS,
+    )
+
+
+def get_ai_provider() -> AIProviderRouter:
+    """Shared provider router (created on first use)"""
+    global _ai_provider
+    if _ai_provider is None:
+        _ai_provider = build_ai_provider()
+    return _ai_provider
 
 
-def get_ai_provider() -> AIProvider:
-    """Factory for AI providers"""
-    provider = settings.AI_PROVIDER.lower()
-    if provider == "yandexgpt":
-        return YandexGPTProvider()
-    return TimewebProvider()  # default
+async def aclose_ai_provider() -> None:
+    global _ai_provider
+    if _ai_provider is not None:
+        await _ai_provider.aclose()
+        _ai_provider = None
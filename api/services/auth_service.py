@@ -3,23 +3,21 @@ Authentication service - JWT tokens, password hashing, user management.
 """
 from datetime import datetime, timedelta
 from typing import Optional
+from uuid import uuid4
 import secrets
 import hashlib
 
-from sqlalchemy import select, update, delete
+from sqlalchemy import select, update, delete, func, or_, and_
 from sqlalchemy.ext.asyncio import AsyncSession
-from passlib.context import CryptContext
 from jose import JWTError, jwt
 
 from models.user import User, RefreshToken
 from schemas.auth import UserRegister, TokenResponse
+from services.password_hasher import password_hasher
+from services.principal_cache import principal_cache
 from config import settings
 
 
-# Password hashing
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-
-
 def compute_email_hash(email: str) -> str:
     """Compute SHA-256 hash of lowercased email for uniqueness checks."""
     return hashlib.sha256(email.lower().encode()).hexdigest()
@@ -31,6 +29,8 @@ ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
 REFRESH_TOKEN_EXPIRE_DAYS = 30
 
+REFRESH_TOKEN_PURGE_LOCK_ID = 0x7265_6672  # pg advisory lock key ("refr")
+
 
 class AuthService:
     """Service for authentication operations"""
@@ -38,14 +38,14 @@ class AuthService:
     # ============== Password ==============
     
     @staticmethod
-    def hash_password(password: str) -> str:
-        """Hash password using bcrypt"""
-        return pwd_context.hash(password)
+    async def hash_password(password: str) -> str:
+        """Hash password using bcrypt (in the password hashing pool)"""
+        return await password_hasher.hash(password)
     
     @staticmethod
-    def verify_password(plain_password: str, hashed_password: str) -> bool:
-        """Verify password against hash"""
-        return pwd_context.verify(plain_password, hashed_password)
+    async def verify_password(plain_password: str, hashed_password: str) -> bool:
+        """Verify password against hash (in the password hashing pool)"""
+        return await password_hasher.verify(plain_password, hashed_password)
     
     # ============== JWT Tokens ==============
     
@@ -107,7 +107,7 @@ class AuthService:
         user = User(
             email=data.email,
             email_hash=email_hash,
-            password_hash=self.hash_password(data.password),
+            password_hash=await self.hash_password(data.password),
             full_name=data.full_name,
             phone=data.phone,
         )
@@ -127,7 +127,7 @@ class AuthService:
         
         if not user:
             return None
-        if not self.verify_password(password, user.password_hash):
+        if not await self.verify_password(password, user.password_hash):
             return None
         if not user.is_active:
             return None
@@ -152,6 +152,15 @@ class AuthService:
         )
         return result.scalar_one_or_none()
     
+    # ============== Account Changes ==============
+    # Password changes invalidate the cached principal.
+
+    async def change_password(self, db: AsyncSession, user: User, new_password: str) -> None:
+        """Set new password and revoke all refresh tokens (force re-login)"""
+        user.password_hash = await self.hash_password(new_password)
+        await self.revoke_all_tokens(db, user.id)
+        await principal_cache.invalidate(user.id)
+
     # ============== Token Management ==============
     
     async def create_tokens(
@@ -159,9 +168,13 @@ class AuthService:
         db: AsyncSession, 
         user: User,
         device_info: str = None,
-        ip_address: str = None
+        ip_address: str = None,
+        family_id: str = None,
     ) -> TokenResponse:
-        """Create access and refresh tokens for user"""
+        """
+        Create access and refresh tokens for user.
+        A new family (login session) is started unless family_id is given.
+        """
         # Access token
         access_token = self.create_access_token(user.id, user.email, user.role)
         
@@ -173,6 +186,7 @@ class AuthService:
         db_token = RefreshToken(
             user_id=user.id,
             token_hash=token_hash,
+            family_id=family_id or str(uuid4()),
             device_info=device_info,
             ip_address=ip_address,
             expires_at=expires_at,
@@ -193,36 +207,108 @@ class AuthService:
         device_info: str = None,
         ip_address: str = None
     ) -> Optional[tuple[User, TokenResponse]]:
-        """Refresh tokens using refresh token"""
+        """
+        Rotate refresh token: revoke it and issue a new one in the same family.
+        Reusing an already rotated token revokes the whole family.
+        """
         token_hash = self.hash_refresh_token(refresh_token)
+        now = datetime.utcnow()
         
-        # Find token
+        # Find token (only the columns needed: no PII decryption)
         result = await db.execute(
-            select(RefreshToken).where(
-                RefreshToken.token_hash == token_hash,
-                RefreshToken.revoked == False,
-                RefreshToken.expires_at > datetime.utcnow()
-            )
+            select(
+                RefreshToken.id,
+                RefreshToken.user_id,
+                RefreshToken.family_id,
+                RefreshToken.revoked,
+                RefreshToken.expires_at,
+            ).where(RefreshToken.token_hash == token_hash)
         )
-        db_token = result.scalar_one_or_none()
+        db_token = result.one_or_none()
+        
+        if not db_token or db_token.expires_at <= now:
+            return None
         
-        if not db_token:
+        if db_token.revoked:
+            # Rotated token presented again: it may have been stolen
+            await self.revoke_family(db, db_token.family_id)
+            return None
+        
+        # Revoke old token; losing a concurrent rotation counts as failure
+        result = await db.execute(
+            update(RefreshToken)
+            .where(RefreshToken.id == db_token.id, RefreshToken.revoked == False)
+            .values(revoked=True, revoked_at=now)
+            .returning(RefreshToken.id)
+        )
+        if result.scalar_one_or_none() is None:
+            await db.rollback()
             return None
         
         # Get user
         user = await self.get_user_by_id(db, db_token.user_id)
         if not user or not user.is_active:
+            await db.commit()
             return None
         
-        # Revoke old token
-        db_token.revoked = True
-        db_token.revoked_at = datetime.utcnow()
-        
         # Create new tokens
-        tokens = await self.create_tokens(db, user, device_info, ip_address)
+        tokens = await self.create_tokens(db, user, device_info, ip_address, db_token.family_id)
         
         return user, tokens
     
+    async def revoke_family(self, db: AsyncSession, family_id: str) -> int:
+        """Revoke every live token of one login session in a single update"""
+        result = await db.execute(
+            update(RefreshToken)
+            .where(RefreshToken.family_id == family_id, RefreshToken.revoked == False)
+            .values(revoked=True, revoked_at=datetime.utcnow())
+        )
+        await db.commit()
+        return result.rowcount
+    
+    async def purge_refresh_tokens(
+        self,
+        db: AsyncSession,
+        batch_size: int = None,
+        revoked_retention: timedelta = None,
+    ) -> int:
+        """
+        Delete expired tokens and tokens revoked longer than revoked_retention ago,
+        in batches (one transaction each) so locks stay short. Returns rows deleted.
+
+        Revoked tokens are kept for a while so that reuse of a rotated token is
+        still detected and revokes its family.
+        """
+        batch_size = batch_size or settings.REFRESH_TOKEN_PURGE_BATCH_SIZE
+        if revoked_retention is None:
+            revoked_retention = timedelta(days=settings.REFRESH_TOKEN_REVOKED_RETENTION_DAYS)
+        is_postgres = db.bind.dialect.name == "postgresql"
+        total = 0
+        while True:
+            if is_postgres:
+                # Only one replica compacts at a time
+                locked = await db.scalar(
+                    select(func.pg_try_advisory_xact_lock(REFRESH_TOKEN_PURGE_LOCK_ID))
+                )
+                if not locked:
+                    await db.rollback()
+                    return total
+            now = datetime.utcnow()
+            batch = (
+                select(RefreshToken.id)
+                .where(or_(
+                    RefreshToken.expires_at < now,
+                    and_(RefreshToken.revoked == True, RefreshToken.revoked_at < now - revoked_retention),
+                ))
+                .limit(batch_size)
+                .scalar_subquery()
+            )
+            result = await db.execute(delete(RefreshToken).where(RefreshToken.id.in_(batch)))
+            await db.commit()
+            total += result.rowcount
+            if result.rowcount < batch_size:
+                return total
+    
     async def revoke_all_tokens(self, db: AsyncSession, user_id: int) -> int:
         """Revoke all refresh tokens for user (logout from all devices)"""
         result = await db.execute(
@@ -0,0 +1,99 @@
+"""
+Case search over public (unencrypted) fields: debtor full name, case number,
+court name and creditor names.
+
+On PostgreSQL (migration 010) a case matches if either
+- its search_vector matches websearch_to_tsquery('russian', q): stemmed
+  words, so "Сбербанка" finds "Сбербанк", or
+- q is word-similar to its search_text (pg_trgm <% operator): typos and
+  partial words, so "Иваноф" finds "Иванов".
+Both are backed by GIN indexes. Results are ranked by ts_rank_cd plus the
+word similarity.
+
+Other databases (SQLite in tests) fall back to substring matching of every
+query word, without ranking. SQLite's LIKE folds ASCII case only, so the
+lowercase, capitalized and uppercase forms of each word are tried.
+"""
+import re
+
+from sqlalchemy import and_, func, literal, literal_column, or_, select
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import load_only
+
+from config import settings
+from models.case import Case, Creditor
+from services.principal_cache import Principal
+from utils.authorization import filter_user_cases
+
+_WORD = re.compile(r"\w+")
+
+# Only public columns are loaded, so search never decrypts PII
+RESULT_COLUMNS = (
+    Case.id, Case.case_number, Case.full_name, Case.status, Case.total_debt, Case.created_at, Case.court_name,
+)
+
+# Generated columns from migration 010 (not mapped on Case, so they are never loaded)
+search_vector = literal_column("cases.search_vector", TSVECTOR)
+search_text = literal_column("cases.search_text")
+
+
+def _creditors_count():
+    return select(func.count(Creditor.id)).where(Creditor.case_id == Case.id).scalar_subquery()
+
+
+async def search_cases(
+    db: AsyncSession,
+    query: str,
+    current_user: Principal,
+    status: str | None = None,
+    limit: int = 20,
+) -> list[tuple[Case, int, float]]:
+    """Cases of the user (all for admins) matching query, best first: (case, creditors count, rank)"""
+    if db.bind.dialect.name == "postgresql":
+        statement = await _postgres_search(db, query)
+    else:
+        statement = _fallback_search(query)
+    if statement is None:
+        return []
+    if status:
+        statement = statement.where(Case.status == status)
+    statement = filter_user_cases(statement, current_user).options(load_only(*RESULT_COLUMNS)).limit(limit)
+    result = await db.execute(statement)
+    return [(case, count, float(rank)) for case, count, rank in result.all()]
+
+
+async def _postgres_search(db: AsyncSession, query: str):
+    text = query.strip().lower()
+    if not text:
+        return None
+    # Threshold of the <% operator for this transaction only
+    await db.execute(
+        select(func.set_config("pg_trgm.word_similarity_threshold", str(settings.SEARCH_SIMILARITY_THRESHOLD), True))
+    )
+    tsquery = func.websearch_to_tsquery("russian", text)
+    rank = func.ts_rank_cd(search_vector, tsquery) + func.word_similarity(text, search_text)
+    return (
+        select(Case, _creditors_count(), rank.label("rank"))
+        .where(or_(search_vector.op("@@")(tsquery), literal(text).op("<%")(search_text)))
+        .order_by(rank.desc(), Case.created_at.desc())
+    )
+
+
+def _fallback_search(query: str):
+    words = _WORD.findall(query.lower())
+    if not words:
+        return None
+    conditions = []
+    for word in words:
+        patterns = [f"%{form}%" for form in dict.fromkeys((word, word.capitalize(), word.upper()))]
+        conditions.append(or_(
+            *(column.like(pattern) for column in (Case.full_name, Case.case_number, Case.court_name)
+              for pattern in patterns),
+            Case.creditors.any(or_(*(Creditor.name.like(pattern) for pattern in patterns))),
+        ))
+    return (
+        select(Case, _creditors_count(), literal_column("1.0").label("rank"))
+        .where(and_(*conditions))
+        .order_by(Case.created_at.desc())
+    )
@@ -1,10 +1,23 @@
 from datetime import datetime
-from sqlalchemy import select
+from typing import Any
+from decimal import Decimal
+from sqlalchemy import func, not_, select, update
 import sqlalchemy as sa
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 from models.case import Case, Creditor, Debt
 from schemas.case import CaseCreate, CaseUpdate
+from services.creditor_directory import CreditorDirectory, apply_entry
+from services.principal_cache import Principal
+from utils.authorization import filter_user_cases
+
+
+# Boolean Case flags that can be toggled atomically
+TOGGLE_FLAGS = ("has_real_estate", "has_movable_property", "is_employed", "is_self_employed")
+# Numeric Case fields that can be incremented atomically
+INCREMENT_FIELDS = ("total_debt", "monthly_income")
+# Numbered child rows and the Case column holding the last number given out
+NUMBER_COUNTERS = {Creditor: Case.creditor_counter, Debt: Case.debt_counter}
 
 
 class CaseService:
@@ -84,21 +97,57 @@ class CaseService:
         )
         return result.scalar_one_or_none()
 
-    async def update(self, case_id: int, data: CaseUpdate) -> Case | None:
-        """Update case"""
-        case = await self.get_by_id(case_id)
-        if not case:
+    async def update(self, case_id: int, data: CaseUpdate, current_user: Principal | None = None) -> Case | None:
+        """Update case (only the fields set in data)"""
+        return await self.update_fields(case_id, data.model_dump(exclude_unset=True), current_user)
+
+    async def update_fields(
+        self,
+        case_id: int,
+        values: dict[str, Any],
+        current_user: Principal | None = None,
+    ) -> Case | None:
+        """
+        Set the given columns in a single UPDATE ... RETURNING; only these
+        columns are bound (and encrypted). With current_user, ownership is part
+        of the WHERE clause (admins may update any case).
+        Returns the case with creditors and debts loaded, None if no case matched.
+        """
+        statement = update(Case).where(Case.id == case_id).values(**values, updated_at=datetime.utcnow())
+        if current_user is not None:
+            statement = filter_user_cases(statement, current_user)
+        statement = (
+            statement.returning(Case)
+            .options(selectinload(Case.creditors), selectinload(Case.debts))
+            .execution_options(populate_existing=True, synchronize_session=False)
+        )
+        case = (await self.db.execute(statement)).scalar_one_or_none()
+        if case is None:
+            await self.db.rollback()
             return None
-
-        update_data = data.model_dump(exclude_unset=True)
-        for key, value in update_data.items():
-            setattr(case, key, value)
-
-        case.updated_at = datetime.utcnow()
         await self.db.commit()
-        await self.db.refresh(case)
         return case
 
+    async def toggle_flag(self, case_id: int, flag: str, current_user: Principal | None = None) -> Case | None:
+        """Flip a boolean flag server-side (SET flag = NOT flag), race-free; NULL counts as false"""
+        if flag not in TOGGLE_FLAGS:
+            raise ValueError(f"Not a toggleable flag: {flag}")
+        column = getattr(Case, flag)
+        return await self.update_fields(case_id, {flag: not_(func.coalesce(column, False))}, current_user)
+
+    async def increment_field(
+        self,
+        case_id: int,
+        field: str,
+        amount: Decimal,
+        current_user: Principal | None = None,
+    ) -> Case | None:
+        """Add amount (may be negative) to a numeric field server-side; NULL counts as 0"""
+        if field not in INCREMENT_FIELDS:
+            raise ValueError(f"Not an incrementable field: {field}")
+        column = getattr(Case, field)
+        return await self.update_fields(case_id, {field: func.coalesce(column, 0) + amount}, current_user)
+
     async def delete(self, case_id: int) -> bool:
         """Delete case"""
         case = await self.get_by_id(case_id)
@@ -109,13 +158,74 @@ class CaseService:
         await self.db.commit()
         return True
 
+    async def next_number(self, model: type[Creditor] | type[Debt], case_id: int, count: int = 1) -> int | None:
+        """
+        Reserve the next creditor/debt number of a case: UPDATE ... SET
+        counter = counter + count RETURNING counter. With count > 1 the block
+        last - count + 1 .. last is reserved. The row lock serializes
+        concurrent adds until commit. None if the case does not exist.
+        """
+        counter = NUMBER_COUNTERS[model]
+        result = await self.db.execute(
+            update(Case)
+            .where(Case.id == case_id)
+            .values({counter: counter + count})
+            .returning(counter)
+            .execution_options(synchronize_session=False)
+        )
+        return result.scalar_one_or_none()
+
+    async def renumber(self, model: type[Creditor] | type[Debt], case_id: int) -> None:
+        """
+        Close the gaps left by deletions: number the case's rows 1..n in their
+        current order with one UPDATE ... FROM (row_number() window), touching
+        only rows whose number changes, and reset the case counter to n.
+        The case row is locked first so a concurrent add cannot slip in between.
+        """
+        await self.db.execute(select(Case.id).where(Case.id == case_id).with_for_update())
+        position = func.row_number().over(order_by=(model.number.asc().nullslast(), model.id))
+        ranked = (
+            select(model.id, position.label("position"))
+            .where(model.case_id == case_id)
+            .subquery()
+        )
+        await self.db.execute(
+            update(model)
+            .where(model.id == ranked.c.id, model.number.is_distinct_from(ranked.c.position))
+            .values(number=ranked.c.position)
+            .execution_options(synchronize_session=False)
+        )
+        counter = NUMBER_COUNTERS[model]
+        rows = select(func.count(model.id)).where(model.case_id == case_id).scalar_subquery()
+        await self.db.execute(
+            update(Case).where(Case.id == case_id).values({counter: rows}).execution_options(synchronize_session=False)
+        )
+
     async def add_creditor(self, case_id: int, creditor_data: dict) -> Creditor | None:
-        """Add creditor to case"""
-        case = await self.get_by_id(case_id)
-        if not case:
+        """
+        Add creditor to case under the next creditor number.
+
+        Legal entities are linked to the shared directory: the entry given by
+        directory_id, or an existing one with the same OGRN/INN. The case row
+        then keeps INN and address only where they differ from the entry.
+        What the user typed is never published to the directory.
+        """
+        number = await self.next_number(Creditor, case_id)
+        if number is None:
             return None
 
-        creditor = Creditor(case_id=case_id, **creditor_data)
+        creditor_data = dict(creditor_data)
+        directory = CreditorDirectory(self.db)
+        directory_id = creditor_data.pop("directory_id", None)
+        if directory_id is not None:
+            entry = await directory.get(directory_id)
+        else:
+            entry = await directory.match(creditor_data)
+        if entry is not None:
+            creditor_data = apply_entry(creditor_data, entry)
+            await directory.count_use(entry.id)
+
+        creditor = Creditor(case_id=case_id, number=number, directory_entry=entry, **creditor_data)
         self.db.add(creditor)
         await self.db.commit()
         await self.db.refresh(creditor)
@@ -138,6 +248,8 @@ class CaseService:
             return False
 
         await self.db.delete(creditor)
+        await self.db.flush()
+        await self.renumber(Creditor, creditor.case_id)
         await self.db.commit()
         return True
 
@@ -165,19 +277,12 @@ class CaseService:
     # === Debt Management ===
 
     async def add_debt(self, case_id: int, debt_data: dict) -> Debt | None:
-        """Add debt to case"""
-        case = await self.get_by_id(case_id)
-        if not case:
+        """Add debt to case under the next debt number"""
+        number = await self.next_number(Debt, case_id)
+        if number is None:
             return None
 
-        # Get next debt number
-        result = await self.db.execute(
-            select(Debt).where(Debt.case_id == case_id).order_by(Debt.number.desc())
-        )
-        last_debt = result.scalar_one_or_none()
-        next_number = (last_debt.number + 1) if last_debt and last_debt.number else 1
-
-        debt = Debt(case_id=case_id, number=next_number, **debt_data)
+        debt = Debt(case_id=case_id, number=number, **debt_data)
         self.db.add(debt)
         await self.db.commit()
         await self.db.refresh(debt)
@@ -218,5 +323,7 @@ class CaseService:
             return False
 
         await self.db.delete(debt)
+        await self.db.flush()
+        await self.renumber(Debt, debt.case_id)
         await self.db.commit()
         return True
@@ -0,0 +1,151 @@
+"""
+Shared creditor directory: lookup, autocomplete and registration of legal
+entities that case creditors reference.
+
+Autocomplete takes a name prefix, a misspelled name or the leading digits
+of an OGRN/INN. On PostgreSQL (migration 011) names are matched by prefix
+or by trigram word similarity; the GIN trigram index on lower(name) serves
+both. Prefix matches rank first, then by similarity and by how often the
+entry was used.
+Other databases fall back to substring matching ranked by usage.
+
+Entries are shared by all users, so they come only from trusted sources:
+admins (POST/PATCH /api/creditor-directory) and the operator's
+scripts/build_creditor_directory.py. Adding a case creditor links it to an
+existing entry but never creates or changes one.
+"""
+from sqlalchemy import case, func, literal, or_, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from config import settings
+from models.creditor_directory import CreditorDirectoryEntry
+
+# Entries are legal entities; individual creditors stay private to their case
+PRIVATE_CREDITOR_TYPES = {"individual"}
+
+
+def apply_entry(data: dict, entry: CreditorDirectoryEntry) -> dict:
+    """
+    Creditor values linked to entry: name, OGRN and type default to the
+    entry's; INN and address are kept only where they differ from it.
+    """
+    data = dict(data)
+    data["name"] = data.get("name") or entry.name
+    data["ogrn"] = data.get("ogrn") or entry.ogrn
+    data["creditor_type"] = data.get("creditor_type") or entry.creditor_type
+    for field in ("inn", "address"):
+        if data.get(field) == getattr(entry, field):
+            data[field] = None
+    return data
+
+
+class CreditorDirectory:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def get(self, entry_id: int) -> CreditorDirectoryEntry | None:
+        return await self.db.get(CreditorDirectoryEntry, entry_id)
+
+    async def find(self, ogrn: str | None = None, inn: str | None = None) -> CreditorDirectoryEntry | None:
+        """Entry with this OGRN, else with this INN"""
+        for column, value in ((CreditorDirectoryEntry.ogrn, ogrn), (CreditorDirectoryEntry.inn, inn)):
+            if value:
+                result = await self.db.execute(select(CreditorDirectoryEntry).where(column == value))
+                entry = result.scalar_one_or_none()
+                if entry is not None:
+                    return entry
+        return None
+
+    async def autocomplete(self, query: str, limit: int = 10) -> list[CreditorDirectoryEntry]:
+        """Entries whose name, OGRN or INN match what the user has typed so far"""
+        text = query.strip().lower()
+        if not text:
+            return []
+        entry = CreditorDirectoryEntry
+        if text.isdigit():
+            statement = (
+                select(entry)
+                .where(or_(entry.ogrn.startswith(text), entry.inn.startswith(text)))  # digits only, no escaping needed
+                .order_by(entry.usage_count.desc(), entry.name)
+            )
+        elif self.db.bind.dialect.name == "postgresql":
+            threshold = str(settings.SEARCH_SIMILARITY_THRESHOLD)
+            await self.db.execute(select(func.set_config("pg_trgm.word_similarity_threshold", threshold, True)))
+            name = func.lower(entry.name)
+            is_prefix = name.startswith(text, autoescape=True)
+            statement = (
+                select(entry)
+                .where(or_(is_prefix, literal(text).op("<%")(name)))
+                .order_by(
+                    case((is_prefix, 0), else_=1),
+                    func.word_similarity(text, name).desc(),
+                    entry.usage_count.desc(),
+                )
+            )
+        else:
+            forms = dict.fromkeys((text, text.capitalize(), text.upper()))
+            statement = (
+                select(entry)
+                .where(or_(*(entry.name.contains(form, autoescape=True) for form in forms)))
+                .order_by(entry.usage_count.desc(), entry.name)
+            )
+        return list((await self.db.execute(statement.limit(limit))).scalars().all())
+
+    async def match(self, data: dict) -> CreditorDirectoryEntry | None:
+        """The existing entry of a legal-entity creditor (by OGRN, then INN); None for individuals"""
+        if data.get("creditor_type") in PRIVATE_CREDITOR_TYPES:
+            return None
+        return await self.find(data.get("ogrn"), data.get("inn"))
+
+    async def create(self, data: dict) -> CreditorDirectoryEntry | None:
+        """Add an entry; None if its OGRN or INN is already in the directory"""
+        entry = CreditorDirectoryEntry(
+            name=data["name"],
+            ogrn=data.get("ogrn"),
+            inn=data.get("inn"),
+            address=data.get("address"),
+            creditor_type=data.get("creditor_type"),
+        )
+        try:
+            async with self.db.begin_nested():
+                self.db.add(entry)
+        except IntegrityError:
+            return None
+        return entry
+
+    async def update(self, entry: CreditorDirectoryEntry, data: dict) -> bool:
+        """
+        Correct an entry; linked creditors without their own INN/address see
+        the new values. False if the OGRN or INN belongs to another entry.
+        """
+        try:
+            async with self.db.begin_nested():
+                for field, value in data.items():
+                    setattr(entry, field, value)
+        except IntegrityError:
+            return False
+        return True
+
+    async def register(self, data: dict) -> CreditorDirectoryEntry | None:
+        """
+        The directory entry for a legal-entity creditor (found by OGRN/INN or
+        added from data); None for individuals and creditors without OGRN.
+        Existing entries are not overwritten. Only for trusted callers (the
+        build script): everything in data is published to all users.
+        """
+        if data.get("creditor_type") in PRIVATE_CREDITOR_TYPES or not data.get("ogrn"):
+            return None
+        entry = await self.find(data.get("ogrn"), data.get("inn"))
+        if entry is not None:
+            return entry
+        # Registered concurrently if create() fails
+        return await self.create(data) or await self.find(data.get("ogrn"), data.get("inn"))
+
+    async def count_use(self, entry_id: int) -> None:
+        await self.db.execute(
+            update(CreditorDirectoryEntry)
+            .where(CreditorDirectoryEntry.id == entry_id)
+            .values(usage_count=CreditorDirectoryEntry.usage_count + 1)
+            .execution_options(synchronize_session=False)
+        )
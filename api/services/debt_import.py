@@ -0,0 +1,175 @@
+"""
+Import of credit-bureau reports (НБКИ, ОКБ, Скоринг Бюро exports) into a
+case's debts.
+
+The report is parsed record by record (services.import_parsing) as CSV, XML
+or JSON. Each record needs a creditor name and an outstanding amount;
+columns, tags and keys are recognized by the aliases below. Lines are
+matched to the case's creditors by OGRN, then INN, then normalized name,
+and compared with the debts already in the case: a line with the same
+creditor, amount and source is a duplicate.
+
+A dry run returns this diff only. Otherwise the new lines are inserted in a
+single multi-row INSERT under a block of debt numbers reserved with one
+counter UPDATE.
+"""
+import re
+from decimal import Decimal
+from typing import BinaryIO, Iterator
+
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from config import settings
+from models.case import Creditor, Debt
+from services.case_service import CaseService
+from services.import_parsing import (
+    ImportFormatError, iter_csv_records, iter_json_records, iter_xml_records, parse_amount, pick, sniff_format,
+)
+
+CREDITOR_ALIASES = (
+    "creditor_name", "creditor", "lender", "organization", "name",
+    "кредитор", "наименование_кредитора", "наименование", "источник",
+)
+OGRN_ALIASES = ("ogrn", "creditor_ogrn", "огрн", "огрн_кредитора")
+INN_ALIASES = ("inn", "creditor_inn", "инн", "инн_кредитора")
+AMOUNT_ALIASES = (
+    "amount", "debt", "debt_amount", "balance", "outstanding", "outstanding_amount", "total_outstanding",
+    "сумма", "сумма_задолженности", "задолженность", "остаток", "остаток_задолженности",
+)
+# Debt.amount_rubles is an INTEGER column
+MAX_AMOUNT = Decimal(2**31 - 1)
+XML_RECORD_TAGS = {"account", "credit", "loan", "debt", "record", "item", "счет", "кредит", "обязательство"}
+
+_LEGAL_FORMS = re.compile(r"\b(пао|ао|оао|зао|ооо|нко|мфк|мкк|кб|акб|банк|ltd|llc|pjsc|jsc)\b")
+_NON_WORD = re.compile(r"[\W_]+")
+
+
+def normalize_creditor_name(name: str) -> str:
+    """Name for matching: lowercase, ё-folded, without quotes, punctuation and legal forms"""
+    text = name.lower().replace("ё", "е")
+    text = _LEGAL_FORMS.sub(" ", _NON_WORD.sub(" ", text))
+    return " ".join(text.split())
+
+
+class ReportLine:
+    """One debt of a credit report, as parsed and matched"""
+
+    __slots__ = ("line", "creditor_name", "ogrn", "inn", "amount", "creditor_id", "status")
+
+    def __init__(self, line: int, creditor_name: str, ogrn: str | None, inn: str | None, amount: Decimal):
+        self.line = line
+        self.creditor_name = creditor_name
+        self.ogrn = ogrn
+        self.inn = inn
+        self.amount = amount
+        self.creditor_id: int | None = None
+        self.status = "new"  # new | duplicate
+
+    @property
+    def rubles_kopecks(self) -> tuple[int, int]:
+        kopecks = int((self.amount * 100).to_integral_value())
+        return divmod(kopecks, 100)
+
+
+def iter_report_records(file: BinaryIO, report_format: str) -> Iterator[tuple[int, dict]]:
+    if report_format == "xml":
+        return iter_xml_records(file, XML_RECORD_TAGS)
+    if report_format == "json":
+        return iter_json_records(file)
+    if report_format == "1c":
+        raise ImportFormatError("Это банковская выписка, а не кредитный отчёт")
+    return iter_csv_records(file)
+
+
+def parse_report(file: BinaryIO, filename: str | None = None) -> tuple[str, list[ReportLine], list[tuple[int, str]]]:
+    """
+    (format, lines, errors) of a report file; errors are (line, message).
+    Records with a zero or negative amount (closed accounts) are skipped.
+    """
+    report_format = sniff_format(file, filename)
+    lines, errors = [], []
+    try:
+        for number, fields in iter_report_records(file, report_format):
+            if len(lines) >= settings.DEBT_IMPORT_MAX_LINES:
+                errors.append((number, f"Больше {settings.DEBT_IMPORT_MAX_LINES} строк, остальные не загружены"))
+                break
+            name = pick(fields, CREDITOR_ALIASES)
+            amount = pick(fields, AMOUNT_ALIASES)
+            if not name or amount is None:
+                errors.append((number, "Нет наименования кредитора или суммы"))
+                continue
+            try:
+                amount = parse_amount(amount, MAX_AMOUNT)
+            except ImportFormatError as e:
+                errors.append((number, str(e)))
+                continue
+            if amount <= 0:
+                continue
+            ogrn, inn = pick(fields, OGRN_ALIASES), pick(fields, INN_ALIASES)
+            lines.append(ReportLine(
+                number, str(name).strip()[:255], str(ogrn) if ogrn else None, str(inn) if inn else None, amount,
+            ))
+    except (ImportFormatError, SyntaxError, UnicodeDecodeError) as e:
+        # SyntaxError: xml.etree.ElementTree.ParseError
+        errors.append((0, f"Файл не распознан как {report_format.upper()}: {e}"))
+    return report_format, lines, errors
+
+
+class DebtImporter:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def match(self, case_id: int, lines: list[ReportLine], source: str) -> None:
+        """Set creditor_id (OGRN, INN, then name) and mark lines that duplicate existing debts"""
+        creditors = (await self.db.execute(select(Creditor).where(Creditor.case_id == case_id))).scalars().all()
+        by_ogrn = {c.ogrn: c.id for c in creditors if c.ogrn}
+        by_inn = {c.inn: c.id for c in creditors if c.inn}
+        by_name = {normalize_creditor_name(c.name): c.id for c in creditors}
+
+        def creditor_key(creditor_id: int | None, name: str):
+            # Debts without a creditor link are compared by the creditor they would match
+            name = normalize_creditor_name(name)
+            return creditor_id or by_name.get(name) or name
+
+        existing = (await self.db.execute(
+            select(Debt.creditor_id, Debt.creditor_name, Debt.amount_rubles, Debt.amount_kopecks, Debt.source)
+            .where(Debt.case_id == case_id)
+        )).all()
+        seen = {
+            (creditor_key(creditor_id, name), rubles, kopecks, debt_source)
+            for creditor_id, name, rubles, kopecks, debt_source in existing
+        }
+
+        for line in lines:
+            line.creditor_id = (
+                by_ogrn.get(line.ogrn) or by_inn.get(line.inn) or by_name.get(normalize_creditor_name(line.creditor_name))
+            )
+            key = (creditor_key(line.creditor_id, line.creditor_name), *line.rubles_kopecks, source)
+            if key in seen:
+                line.status = "duplicate"
+            else:
+                seen.add(key)  # the same line twice in one report is a duplicate too
+
+    async def insert(self, case_id: int, lines: list[ReportLine], source: str) -> int:
+        """Insert the new lines as debts numbered after the existing ones; returns how many"""
+        new_lines = [line for line in lines if line.status == "new"]
+        if not new_lines:
+            return 0
+        last = await CaseService(self.db).next_number(Debt, case_id, count=len(new_lines))
+        first = last - len(new_lines) + 1
+        rows = []
+        for number, line in enumerate(new_lines, first):
+            rubles, kopecks = line.rubles_kopecks
+            rows.append({
+                "case_id": case_id,
+                "creditor_id": line.creditor_id,
+                "number": number,
+                "creditor_name": line.creditor_name,
+                "amount_rubles": rubles,
+                "amount_kopecks": kopecks,
+                "source": source,
+            })
+        await self.db.execute(insert(Debt), rows)
+        await self.db.commit()
+        return len(rows)
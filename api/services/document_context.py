@@ -0,0 +1,486 @@
+"""
+Context builders for document templates.
+
+Formatting helpers for Russian legal documents (dates, money, declensions,
+sum in words) and builders that turn a Case aggregate into a docxtpl context.
+
+The same amounts, dates and names recur across debts, creditors and income
+records of a case, so the pure helpers are memoized. Related rows are
+partitioned in a single pass instead of one list comprehension per type.
+"""
+from collections import defaultdict
+from datetime import datetime
+from decimal import Decimal
+from functools import lru_cache
+from typing import Any, Callable, Iterable
+
+# Russian month names in genitive case
+RUSSIAN_MONTHS = {
+    1: "января", 2: "февраля", 3: "марта", 4: "апреля",
+    5: "мая", 6: "июня", 7: "июля", 8: "августа",
+    9: "сентября", 10: "октября", 11: "ноября", 12: "декабря"
+}
+
+PROCEDURE_TYPE_LABELS = {
+    "Property Realization": "Property Realization",
+    "Debt Restructuring": "Debt Restructuring",
+}
+
+DEFAULT_APPENDICES = (
+    {"number": 1, "description": "Копия паспорта гражданина РФ", "pages": 2},
+    {"number": 2, "description": "Копия СНИЛС", "pages": 1},
+    {"number": 3, "description": "Справка о неучастии в качестве ИП", "pages": 1},
+    {"number": 4, "description": "Выписка из бюро кредитных историй", "pages": 10},
+)
+
+# === Number to words ===
+
+_UNITS_MASCULINE = ("", "один", "два", "три", "четыре", "пять", "шесть", "семь", "восемь", "девять")
+_UNITS_FEMININE = ("", "одна", "две", "три", "четыре", "пять", "шесть", "семь", "восемь", "девять")
+_TEENS = (
+    "десять", "одиннадцать", "двенадцать", "тринадцать", "четырнадцать",
+    "пятнадцать", "шестнадцать", "семнадцать", "восемнадцать", "девятнадцать",
+)
+_TENS = (
+    "", "", "двадцать", "тридцать", "сорок",
+    "пятьдесят", "шестьдесят", "семьдесят", "восемьдесят", "девяносто",
+)
+_HUNDREDS = (
+    "", "сто", "двести", "триста", "четыреста",
+    "пятьсот", "шестьсот", "семьсот", "восемьсот", "девятьсот",
+)
+
+# (forms, feminine) for each group of three digits, lowest first
+_SCALES = (
+    (None, False),
+    (("тысяча", "тысячи", "тысяч"), True),
+    (("миллион", "миллиона", "миллионов"), False),
+    (("миллиард", "миллиарда", "миллиардов"), False),
+    (("триллион", "триллиона", "триллионов"), False),
+)
+
+
+@lru_cache(maxsize=4096)
+def plural_form(number: int, one: str, few: str, many: str) -> str:
+    """Pick the Russian plural form for a number: 1 рубль, 2 рубля, 5 рублей"""
+    number = abs(number)
+    if number % 10 == 1 and number % 100 != 11:
+        return one
+    if 2 <= number % 10 <= 4 and (number % 100 < 10 or number % 100 >= 20):
+        return few
+    return many
+
+
+def rubles_declension(number: int) -> str:
+    """Return proper declension: рубль/рубля/рублей"""
+    return plural_form(number, "рубль", "рубля", "рублей")
+
+
+def kopecks_declension(number: int) -> str:
+    """Return proper declension: копейка/копейки/копеек"""
+    return plural_form(number, "копейка", "копейки", "копеек")
+
+
+def _triad_to_words(triad: int, feminine: bool) -> list[str]:
+    units = _UNITS_FEMININE if feminine else _UNITS_MASCULINE
+    words = [_HUNDREDS[triad // 100]]
+    tens = triad % 100
+    if 10 <= tens <= 19:
+        words.append(_TEENS[tens - 10])
+    else:
+        words.append(_TENS[tens // 10])
+        words.append(units[tens % 10])
+    return [w for w in words if w]
+
+
+@lru_cache(maxsize=4096)
+def number_to_words(number: int, feminine: bool = False) -> str:
+    """Spell out a non-negative integer in Russian: 1250 -> 'одна тысяча двести пятьдесят'"""
+    if number < 0:
+        raise ValueError("number must be non-negative")
+    if number == 0:
+        return "ноль"
+
+    groups = []
+    scale = 0
+    while number:
+        number, triad = divmod(number, 1000)
+        if scale >= len(_SCALES):
+            raise ValueError("number is too large")
+        if triad:
+            forms, scale_feminine = _SCALES[scale]
+            words = _triad_to_words(triad, feminine if scale == 0 else scale_feminine)
+            if forms:
+                words.append(plural_form(triad, *forms))
+            groups.append(" ".join(words))
+        scale += 1
+    return " ".join(reversed(groups))
+
+
+@lru_cache(maxsize=4096)
+def format_amount_in_words(rubles: int, kopecks: int) -> str:
+    """
+    Format amount the way courts expect "сумма прописью":
+    '1 250 000 (один миллион двести пятьдесят тысяч) рублей 50 копеек'
+    """
+    return (
+        f"{format_thousands(rubles)} ({number_to_words(rubles)}) {rubles_declension(rubles)} "
+        f"{kopecks:02d} {kopecks_declension(kopecks)}"
+    )
+
+
+# === Dates, names, money ===
+
+@lru_cache(maxsize=1024)
+def format_russian_date(date_obj) -> str:
+    """Format date in Russian format: '01 января 2024'"""
+    if not date_obj:
+        return ""
+    day = date_obj.day
+    month = RUSSIAN_MONTHS.get(date_obj.month, "")
+    year = date_obj.year
+    return f"{day:02d} {month} {year}"
+
+
+@lru_cache(maxsize=1024)
+def format_money(amount: Decimal | float | None) -> tuple[int, int]:
+    """Split money into rubles and kopeks. Returns: (rubles, kopeks)"""
+    if amount is None:
+        return (0, 0)
+    if not isinstance(amount, Decimal):
+        amount = Decimal(str(amount))
+    normalized = amount.quantize(Decimal("0.01"))
+    rubles = int(normalized)
+    kopeks = int((normalized - Decimal(rubles)) * 100)
+    return (rubles, kopeks)
+
+
+def format_thousands(number: int) -> str:
+    """Group digits with spaces: 1250000 -> '1 250 000'"""
+    return f"{number:,}".replace(",", " ")
+
+
+def get_gender_pronoun(gender: str | None) -> str:
+    """Return gender pronoun: он/она"""
+    return "он" if gender == "M" else "она"
+
+
+@lru_cache(maxsize=1024)
+def format_full_name_with_initials(full_name: str) -> str:
+    """Convert 'Иванов Иван Иванович' to 'Иванов И.И.'"""
+    parts = full_name.strip().split()
+    if len(parts) >= 2:
+        last_name = parts[0]
+        initials = ".".join([p[0].upper() for p in parts[1:]]) + "."
+        return f"{last_name} {initials}"
+    return full_name
+
+
+@lru_cache(maxsize=4096)
+def _amount_parts(rubles: int, kopecks: int) -> tuple[str, str, str, str, str]:
+    return (
+        format_thousands(rubles),
+        rubles_declension(rubles),
+        f"{kopecks:02d}",
+        kopecks_declension(kopecks),
+        number_to_words(rubles),
+    )
+
+
+def format_amount_with_words(rubles: int, kopecks: int) -> dict:
+    """Format amount with proper Russian word declensions"""
+    amount_rubles, rubles_word, amount_kopecks, kopecks_word, rubles_in_words = _amount_parts(rubles, kopecks)
+    return {
+        "amount_rubles": amount_rubles,
+        "amount_rubles_word": rubles_word,
+        "amount_kopecks": amount_kopecks,
+        "amount_kopecks_word": kopecks_word,
+        "amount_rubles_in_words": rubles_in_words,
+    }
+
+
+def format_total_debt(amount: Decimal | float | None) -> str:
+    if amount is None:
+        return "0"
+    return f"{float(amount):,.0f}".replace(",", " ")
+
+
+def get_procedure_type_context(case) -> dict:
+    procedure_type = case.procedure_type or ""
+    return {
+        "procedure_type": procedure_type,
+        "procedure_type_label": PROCEDURE_TYPE_LABELS.get(procedure_type, procedure_type),
+    }
+
+
+# === Row partitioning ===
+
+def partition_by(rows: Iterable[Any], key: Callable[[Any], Any]) -> dict[Any, list]:
+    """Group rows by key in a single pass, preserving order within each group"""
+    groups: dict[Any, list] = defaultdict(list)
+    for row in rows:
+        groups[key(row)].append(row)
+    return groups
+
+
+def _transaction_item(transaction) -> dict:
+    rubles, kopecks = format_money(transaction.amount)
+    return {
+        "description": transaction.description,
+        "date": format_russian_date(transaction.transaction_date),
+        "amount": format_thousands(rubles),
+        "kopecks": f"{kopecks:02d}",
+    }
+
+
+# === Context builders ===
+
+def build_debtor_context(case) -> dict:
+    """Debtor, court and total debt fields shared by all case documents"""
+    debtor_full_name = case.full_name
+    debtor_surname = debtor_full_name.split()[0] if debtor_full_name else ""
+    debtor_initials = format_full_name_with_initials(debtor_full_name).replace(debtor_surname, "").strip()
+
+    total_rubles, total_kopecks = format_money(case.total_debt)
+    total_debt_formatted = format_amount_with_words(total_rubles, total_kopecks)
+
+    context = {
+        # Court
+        "court_name": case.court_name or "Арбитражный суд",
+        "court_address": case.court_address or "",
+
+        # Debtor personal
+        "case_number": case.case_number,
+        "debtor_full_name": debtor_full_name,
+        "debtor_surname": debtor_surname,
+        "debtor_initials": debtor_initials,
+        "debtor_birth_date": format_russian_date(case.birth_date),
+        "debtor_passport_series": case.passport_series or "",
+        "debtor_passport_number": case.passport_number or "",
+        "debtor_passport_issued_by": case.passport_issued_by or "",
+        "debtor_passport_date": format_russian_date(case.passport_issued_date),
+        "debtor_passport_code": case.passport_code or "",
+        "debtor_address": case.registration_address or "",
+        "debtor_inn": case.inn or "",
+        "debtor_snils": case.snils or "",
+        "debtor_phone": case.phone or "",
+        "debtor_gender_pronoun": get_gender_pronoun(case.gender),
+
+        # Total debt
+        "total_debt_rubles": total_debt_formatted["amount_rubles"],
+        "total_debt_rubles_word": total_debt_formatted["amount_rubles_word"],
+        "total_debt_kopecks": total_debt_formatted["amount_kopecks"],
+        "total_debt_kopecks_word": total_debt_formatted["amount_kopecks_word"],
+        "total_debt_in_words": format_amount_in_words(total_rubles, total_kopecks),
+
+        # Financial manager
+        "sro_name": case.sro_name or "Ассоциация арбитражных управляющих",
+    }
+    context.update(get_procedure_type_context(case))
+    return context
+
+
+def build_petition_context(case, now: datetime | None = None) -> dict:
+    """Build the full bankruptcy petition context from a Case aggregate"""
+    context = build_debtor_context(case)
+
+    # === CREDITORS & CREDITOR REGISTRY ===
+    creditors_list = []
+    creditor_registry = []
+    for idx, creditor in enumerate(case.creditors, 1):
+        creditors_list.append({
+            "number": idx,
+            "name": creditor.name,
+            "ogrn": creditor.ogrn or "",
+            "inn": creditor.inn or "",
+            "address": creditor.address or ""
+        })
+        rubles, kopecks = format_money(creditor.debt_amount)
+        creditor_registry.append({
+            "number": idx,
+            "name": creditor.name,
+            "amount": format_thousands(rubles),
+            "kopecks": f"{kopecks:02d}",
+            "amount_in_words": format_amount_in_words(rubles, kopecks),
+        })
+
+    # === DEBTS ===
+    debts_list = []
+    for idx, debt in enumerate(case.debts, 1):
+        debts_list.append({
+            "number": debt.number or idx,
+            "creditor_name": debt.creditor_name,
+            **format_amount_with_words(debt.amount_rubles, debt.amount_kopecks),
+            "amount_in_words": format_amount_in_words(debt.amount_rubles, debt.amount_kopecks),
+            "source": debt.source or "ОКБ"
+        })
+
+    # === CHILDREN ===
+    children_list = []
+    for child in case.children:
+        children_list.append({
+            "child_name": child.child_name,
+            "child_birth_date": format_russian_date(child.child_birth_date),
+            "child_has_certificate": child.child_has_certificate,
+            "child_certificate_number": child.child_certificate_number or "",
+            "child_certificate_date": format_russian_date(child.child_certificate_date),
+            "child_has_passport": child.child_has_passport,
+            "child_passport_series": child.child_passport_series or "",
+            "child_passport_number": child.child_passport_number or "",
+            "child_passport_issued_by": child.child_passport_issued_by or "",
+            "child_passport_date": format_russian_date(child.child_passport_date),
+            "child_passport_code": child.child_passport_code or ""
+        })
+
+    # === INCOME ===
+    income_years_list = []
+    for income in case.income_records:
+        income_formatted = format_amount_with_words(income.amount_rubles, income.amount_kopecks)
+        income_years_list.append({
+            "year": income.year,
+            "amount": f"{income_formatted['amount_rubles']} рублей {income_formatted['amount_kopecks']} копеек",
+            "amount_word": income_formatted["amount_rubles_word"],
+            "certificate_number": income.certificate_number or ""
+        })
+
+    # === PROPERTY ===
+    properties = partition_by(case.properties, lambda p: p.property_type)
+    vehicles_list = properties.get("vehicle", [])
+    vehicle = vehicles_list[0] if vehicles_list else None
+
+    movable_property_description = ""
+    if vehicle:
+        movable_property_description = f"легковой автомобиль {vehicle.vehicle_make} {vehicle.vehicle_model} {vehicle.vehicle_year} года выпуска"
+        if vehicle.vehicle_color:
+            movable_property_description += f", {vehicle.vehicle_color} цвета"
+        if vehicle.vehicle_vin:
+            movable_property_description += f", VIN: {vehicle.vehicle_vin}"
+    is_pledged = bool(vehicle and vehicle.is_pledged)
+
+    # === TRANSACTIONS ===
+    transactions = partition_by(case.transactions, lambda t: t.transaction_type)
+
+    context.update({
+        # IP Status
+        "ip_certificate_number": case.ip_certificate_number or "",
+        "ip_certificate_date": format_russian_date(case.ip_certificate_date),
+
+        # Creditors & Debts
+        "creditors": creditors_list,
+        "debts": debts_list,
+
+        # Marital status
+        "is_married": case.marital_status == "married",
+        "is_divorced": case.marital_status == "divorced",
+        "spouse_name": case.spouse_name or "",
+        "marriage_certificate_number": case.marriage_certificate_number or "",
+        "marriage_certificate_date": format_russian_date(case.marriage_certificate_date),
+        "divorce_certificate_number": case.divorce_certificate_number or "",
+        "divorce_certificate_date": format_russian_date(case.divorce_certificate_date),
+
+        # Children
+        "has_children": len(children_list) > 0,
+        "multiple_children": len(children_list) > 1,
+        "children": children_list,
+
+        # Employment
+        "is_employed": case.is_employed or False,
+        "is_self_employed": case.is_self_employed or False,
+        "income_years": income_years_list,
+
+        # Property
+        "has_real_estate": case.has_real_estate or False,
+        "real_estate_description": "",
+        "has_movable_property": case.has_movable_property or False,
+        "movable_property_description": movable_property_description,
+        "is_pledged": is_pledged,
+        "property_type": "автомобиль",
+        "pledge_creditor": vehicle.pledge_creditor if is_pledged else "",
+        "pledge_document": vehicle.pledge_document if is_pledged else "",
+
+        # Transactions (the template loops over each list and renders t.description)
+        "transactions_real_estate": [_transaction_item(t) for t in transactions.get("real_estate", [])],
+        "transactions_securities": [_transaction_item(t) for t in transactions.get("securities", [])],
+        "transactions_llc_shares": [_transaction_item(t) for t in transactions.get("llc_shares", [])],
+        "transactions_vehicles": [_transaction_item(t) for t in transactions.get("vehicles", [])],
+
+        # Insolvency grounds
+        "insolvency_grounds": case.insolvency_grounds or "гражданин прекратил расчеты с кредиторами",
+
+        # Financial manager
+        "restructuring_duration": case.restructuring_duration or "3 месяца",
+
+        # Creditor registry
+        "creditor_registry": creditor_registry,
+
+        # Appendices (default list)
+        "appendices": [dict(a) for a in DEFAULT_APPENDICES],
+
+        # Date
+        "petition_date": (now or datetime.now()).strftime("%d.%m.%Y"),
+    })
+    return context
+
+
+def build_creditor_context(creditor, number: int) -> dict:
+    """Per-creditor fields for creditor notification letters"""
+    rubles, kopecks = format_money(creditor.debt_amount)
+    return {
+        "number": creditor.number or number,
+        "name": creditor.name,
+        "ogrn": creditor.ogrn or "",
+        "inn": creditor.inn or "",
+        "address": creditor.address or "",
+        "debt_type": creditor.debt_type or "",
+        "contract_number": creditor.contract_number or "",
+        "contract_date": format_russian_date(creditor.contract_date),
+        "amount": format_thousands(rubles),
+        "kopecks": f"{kopecks:02d}",
+        "amount_in_words": format_amount_in_words(rubles, kopecks),
+    }
+
+
+def build_creditor_notification_contexts(case, now: datetime | None = None) -> list[dict]:
+    """
+    One context per creditor for notification letters.
+    The debtor part is built once and shared by every letter.
+    """
+    shared = build_debtor_context(case)
+    shared["creditors_count"] = len(case.creditors)
+    shared["notification_date"] = (now or datetime.now()).strftime("%d.%m.%Y")
+    return [
+        {**shared, "creditor": build_creditor_context(creditor, idx)}
+        for idx, creditor in enumerate(case.creditors, 1)
+    ]
+
+
+def build_application_context(case, now: datetime | None = None) -> dict:
+    """Build the basic bankruptcy application context from a Case aggregate"""
+    creditors_list = []
+    for creditor in case.creditors:
+        creditors_list.append(
+            {
+                "name": creditor.name,
+                "debt_amount": format_total_debt(creditor.debt_amount),
+                "debt_type": creditor.debt_type or "",
+            }
+        )
+
+    passport_parts = [part for part in [case.passport_series, case.passport_number] if part]
+    total_rubles, total_kopecks = format_money(case.total_debt)
+
+    context = {
+        "case_number": case.case_number,
+        "full_name": case.full_name,
+        "birth_date": format_russian_date(case.birth_date),
+        "passport": " ".join(passport_parts),
+        "inn": case.inn or "",
+        "address": case.registration_address or "",
+        "total_debt": format_total_debt(case.total_debt),
+        "total_debt_in_words": format_amount_in_words(total_rubles, total_kopecks),
+        "creditors_count": len(creditors_list),
+        "creditors": creditors_list,
+        "current_date": (now or datetime.now()).strftime("%d.%m.%Y"),
+    }
+    context.update(get_procedure_type_context(case))
+    return context
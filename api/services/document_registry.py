@@ -0,0 +1,253 @@
+"""
+Registry of document types backed by templates in api/templates/.
+
+Each document type declares its template file, the Case relationships its
+context builder reads and the builder itself. Template files are discovered
+in TEMPLATES_DIR; a type is available only when its template exists.
+Templates are read and their Jinja sources compiled lazily on first render
+and reused by later renders.
+
+Mail-merge types render one letter per related row (e.g. per creditor) from
+a single compiled template, into one merged DOCX or a ZIP of letters.
+"""
+import threading
+from io import BytesIO
+from pathlib import Path
+from typing import Callable, Iterable
+
+from docxtpl import DocxTemplate
+from jinja2 import Environment
+
+from models.case import CASE_RELATIONSHIPS
+from services.document_context import (
+    build_petition_context,
+    build_application_context,
+    build_creditor_notification_contexts,
+)
+from services.mail_merge import MailMergeTemplate
+
+TEMPLATES_DIR = Path(__file__).resolve().parent.parent / "templates"
+
+
+class CompilingEnvironment(Environment):
+    """
+    Jinja environment that memoizes compiled templates by source.
+
+    docxtpl patches the document XML and calls from_string() on every render;
+    the patched source is identical between renders of the same template,
+    so the compiled template can be reused.
+    """
+
+    def __init__(self, **options):
+        super().__init__(**options)
+        self._compiled = {}
+        self._compiled_lock = threading.Lock()
+
+    def from_string(self, source, globals=None, template_class=None):
+        if globals or template_class:
+            return super().from_string(source, globals=globals, template_class=template_class)
+        template = self._compiled.get(source)
+        if template is None:
+            with self._compiled_lock:
+                template = self._compiled.get(source)
+                if template is None:
+                    template = super().from_string(source)
+                    self._compiled[source] = template
+        return template
+
+
+class EmptyDocumentError(ValueError):
+    """The case has nothing to fill the document with (e.g. no creditors to notify)"""
+
+
+class DocumentType:
+    """A document that can be generated for a case from a docx template."""
+
+    output_formats: tuple[str, ...] = ("docx",)
+
+    def __init__(
+        self,
+        key: str,
+        label: str,
+        description: str,
+        template_name: str,
+        context_builder: Callable[..., dict],
+        relationships: Iterable[str] = (),
+        templates_dir: Path = TEMPLATES_DIR,
+    ):
+        unknown = set(relationships) - set(CASE_RELATIONSHIPS)
+        if unknown:
+            raise ValueError(f"Unknown case relationships: {', '.join(sorted(unknown))}")
+
+        self.key = key
+        self.label = label
+        self.description = description
+        self.template_name = template_name
+        self.context_builder = context_builder
+        self.relationships = tuple(relationships)
+        self.templates_dir = templates_dir
+
+        self._template_bytes: bytes | None = None
+        self._fields: frozenset[str] | None = None
+        self._jinja_env = CompilingEnvironment()
+        self._load_lock = threading.Lock()
+
+    @property
+    def template_path(self) -> Path:
+        return self.templates_dir / self.template_name
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._template_bytes is not None
+
+    def _get_template_bytes(self) -> bytes:
+        if self._template_bytes is None:
+            with self._load_lock:
+                if self._template_bytes is None:
+                    if not self.template_path.exists():
+                        raise FileNotFoundError(f"Template not found: templates/{self.template_name}")
+                    self._template_bytes = self.template_path.read_bytes()
+        return self._template_bytes
+
+    def load_template(self) -> DocxTemplate:
+        """Fresh DocxTemplate over the cached template file (docxtpl mutates it on render)"""
+        return DocxTemplate(BytesIO(self._get_template_bytes()))
+
+    @property
+    def fields(self) -> frozenset[str]:
+        """Context fields the template refers to"""
+        if self._fields is None:
+            self._fields = frozenset(
+                self.load_template().get_undeclared_template_variables(self._jinja_env)
+            )
+        return self._fields
+
+    def build_context(self, case) -> dict:
+        return self.context_builder(case)
+
+    def render_context(self, context: dict, output_format: str = "docx") -> BytesIO:
+        doc = self.load_template()
+        doc.render(context, jinja_env=self._jinja_env)
+        buffer = BytesIO()
+        doc.save(buffer)
+        buffer.seek(0)
+        return buffer
+
+    def render(self, case, output_format: str = "docx") -> BytesIO:
+        if output_format not in self.output_formats:
+            raise ValueError(f"Unsupported output format for {self.key}: {output_format}")
+        return self.render_context(self.build_context(case), output_format)
+
+
+class MailMergeDocumentType(DocumentType):
+    """
+    A document rendered once per related row with a shared compiled template.
+
+    The context builder returns a list of contexts, one per letter, and
+    render_context() takes that list. An empty list raises
+    EmptyDocumentError with empty_message instead of rendering the bare
+    template.
+    """
+
+    output_formats = ("docx", "zip")
+
+    def __init__(self, *args, letter_name: Callable[[dict], str], empty_message: str, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.letter_name = letter_name
+        self.empty_message = empty_message
+        self._merge_template: MailMergeTemplate | None = None
+
+    def get_merge_template(self) -> MailMergeTemplate:
+        if self._merge_template is None:
+            template_bytes = self._get_template_bytes()
+            with self._load_lock:
+                if self._merge_template is None:
+                    self._merge_template = MailMergeTemplate(template_bytes, self._jinja_env)
+        return self._merge_template
+
+    def render_context(self, contexts: list[dict], output_format: str = "docx") -> BytesIO:
+        if not contexts:
+            raise EmptyDocumentError(self.empty_message)
+        template = self.get_merge_template()
+        if output_format == "zip":
+            return template.render_zip(
+                (self.letter_name(context), context) for context in contexts
+            )
+        return template.render_merged(contexts)
+
+
+class DocumentRegistry:
+    """Document types keyed by name, filtered by templates present on disk."""
+
+    def __init__(self, templates_dir: Path = TEMPLATES_DIR):
+        self.templates_dir = templates_dir
+        self._types: dict[str, DocumentType] = {}
+        self._discovered: frozenset[str] | None = None
+
+    def register(self, document_type: DocumentType) -> DocumentType:
+        if document_type.key in self._types:
+            raise ValueError(f"Document type already registered: {document_type.key}")
+        self._types[document_type.key] = document_type
+        return document_type
+
+    def discover(self) -> frozenset[str]:
+        """Template file names found in the templates directory (scanned once)"""
+        if self._discovered is None:
+            self._discovered = frozenset(p.name for p in self.templates_dir.glob("*.docx"))
+        return self._discovered
+
+    def refresh(self) -> None:
+        """Rescan the templates directory, e.g. after adding a template"""
+        self._discovered = None
+
+    def available(self) -> list[DocumentType]:
+        discovered = self.discover()
+        return [t for t in self._types.values() if t.template_name in discovered]
+
+    def get(self, key: str) -> DocumentType | None:
+        document_type = self._types.get(key)
+        if document_type and document_type.template_name in self.discover():
+            return document_type
+        return None
+
+    def __contains__(self, key: str) -> bool:
+        return self.get(key) is not None
+
+
+document_registry = DocumentRegistry()
+
+document_registry.register(DocumentType(
+    key="bankruptcy_petition",
+    label="Заявление о банкротстве (полное)",
+    description="Полное заявление о признании гражданина банкротом со всеми данными",
+    template_name="bankruptcy_petition_template_v1_jinja2.docx",
+    context_builder=build_petition_context,
+    relationships=CASE_RELATIONSHIPS,
+))
+
+document_registry.register(DocumentType(
+    key="bankruptcy_application",
+    label="Заявление о банкротстве (базовое)",
+    description="Базовое заявление о банкротстве",
+    template_name="bankruptcy_application.docx",
+    context_builder=build_application_context,
+    relationships=("creditors",),
+))
+
+
+def _creditor_letter_name(context: dict) -> str:
+    creditor = context["creditor"]
+    safe_name = "".join(ch if ch.isalnum() else "_" for ch in creditor["name"]).strip("_")
+    return f"{creditor['number']:03d}_{safe_name[:60]}.docx"
+
+
+document_registry.register(MailMergeDocumentType(
+    key="creditor_notification",
+    label="Уведомление кредиторов",
+    description="Письмо-уведомление каждому кредитору о подаче заявления о банкротстве",
+    template_name="creditor_notification_template_v1_jinja2.docx",
+    context_builder=build_creditor_notification_contexts,
+    relationships=("creditors",),
+    letter_name=_creditor_letter_name,
+    empty_message="В деле нет кредиторов: уведомлять некого",
+))
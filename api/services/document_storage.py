@@ -1,60 +1,80 @@
 from __future__ import annotations
 
-import os
 from datetime import datetime
 from pathlib import Path
-from typing import Iterable
+from typing import AsyncIterator, BinaryIO
 
+from services.storage import storage
 
-BASE_DOCUMENTS_DIR = Path(
-    os.getenv(
-        "CASE_DOCUMENTS_DIR",
-        Path(__file__).parent.parent / "case_documents"
-    )
-)
+
+DOCUMENT_MEDIA_TYPES = {
+    ".docx": "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+    ".zip": "application/zip",
+}
+
+CASE_DOCUMENTS_FOLDER = "Case Documents"
 
 
-def get_case_documents_dir(case) -> Path:
-    case_dir = BASE_DOCUMENTS_DIR / case.case_number / "Case Documents"
-    case_dir.mkdir(parents=True, exist_ok=True)
-    return case_dir
+def get_case_documents_prefix(case) -> str:
+    return f"{case.case_number}/{CASE_DOCUMENTS_FOLDER}"
+
+
+def case_document_key(case, file_name: str) -> str:
+    if not file_name or "/" in file_name or "\\" in file_name or file_name.startswith("."):
+        raise ValueError("Invalid document path")
+    return f"{get_case_documents_prefix(case)}/{file_name}"
 
 
-def build_document_filename(document_type: str, case_number: str, timestamp: datetime | None = None) -> str:
+def build_document_filename(
+    document_type: str,
+    case_number: str,
+    timestamp: datetime | None = None,
+    extension: str = "docx",
+) -> str:
     safe_type = "".join(ch if ch.isalnum() or ch in ("-", "_") else "_" for ch in document_type)
     ts = (timestamp or datetime.now()).strftime("%Y%m%d_%H%M%S")
-    return f"{safe_type}_{case_number}_{ts}.docx"
+    return f"{safe_type}_{case_number}_{ts}.{extension}"
 
 
-def save_document(case, filename: str, buffer) -> Path:
-    case_dir = get_case_documents_dir(case)
-    file_path = case_dir / filename
-    with open(file_path, "wb") as f:
-        f.write(buffer.getvalue())
-    return file_path
+def get_document_media_type(file_name: str) -> str:
+    return DOCUMENT_MEDIA_TYPES.get(Path(file_name).suffix, "application/octet-stream")
 
 
-def list_case_documents(case) -> list[dict]:
-    case_dir = get_case_documents_dir(case)
-    if not case_dir.exists():
-        return []
+async def save_document(case, filename: str, buffer: BinaryIO) -> dict:
+    size = await storage.save(
+        case_document_key(case, filename), buffer, get_document_media_type(filename)
+    )
+    return {"file_name": filename, "size_bytes": size, "modified_at": datetime.now()}
+
 
+async def list_case_documents(case) -> list[dict]:
     documents = []
-    for path in sorted(case_dir.glob("*.docx"), key=lambda p: p.stat().st_mtime, reverse=True):
-        stat = path.stat()
+    for obj in await storage.list(get_case_documents_prefix(case)):
+        file_name = obj["key"].rsplit("/", 1)[-1]
+        if Path(file_name).suffix not in DOCUMENT_MEDIA_TYPES:
+            continue
         documents.append(
             {
-                "file_name": path.name,
-                "size_bytes": stat.st_size,
-                "modified_at": datetime.fromtimestamp(stat.st_mtime).isoformat(),
+                "file_name": file_name,
+                "size_bytes": obj["size_bytes"],
+                "modified_at": obj["modified_at"].isoformat(),
             }
         )
+    documents.sort(key=lambda doc: doc["modified_at"], reverse=True)
     return documents
 
 
-def resolve_case_document_path(case, file_name: str) -> Path:
-    case_dir = get_case_documents_dir(case).resolve()
-    file_path = (case_dir / file_name).resolve()
-    if not str(file_path).startswith(str(case_dir)):
-        raise ValueError("Invalid document path")
-    return file_path
+async def open_case_document(case, file_name: str) -> AsyncIterator[bytes]:
+    """Stream a stored document; raises FileNotFoundError if it does not exist"""
+    return await storage.open(case_document_key(case, file_name))
+
+
+async def get_case_document_url(case, file_name: str, expires_in: int) -> str | None:
+    """
+    Presigned URL for downloading a document directly from the store,
+    None if the backend has no direct URLs (local storage).
+    """
+    key = case_document_key(case, file_name)
+    if await storage.stat(key) is None:
+        raise FileNotFoundError(file_name)
+    return storage.presigned_url(key, expires_in, file_name)
@@ -0,0 +1,228 @@
+"""
+Streaming readers shared by the file importers (credit-bureau reports, bank
+statements).
+
+Uploaded files are read incrementally from their binary file object; no
+reader holds more than the current record (and a read buffer) in memory.
+Russian exports come in UTF-8 or Windows-1251, with ';' or ',' separated
+columns and amounts like "12 345,67". Bank statements also come in the 1C
+client-bank exchange format (1CClientBankExchange, key=value sections).
+"""
+import codecs
+import csv
+import io
+import json
+import re
+from datetime import date, datetime
+from decimal import Decimal, InvalidOperation
+from typing import BinaryIO, Iterator
+from xml.etree.ElementTree import iterparse
+
+CHUNK_SIZE = 64 * 1024
+ONE_C_SIGNATURE = "1CClientBankExchange"
+DATE_FORMATS = ("%d.%m.%Y", "%Y-%m-%d", "%d/%m/%Y", "%d.%m.%y", "%Y-%m-%dT%H:%M:%S")
+
+_SPACES = re.compile(r"\s+")
+
+
+class ImportFormatError(ValueError):
+    """A file or one of its records cannot be read"""
+
+
+def detect_encoding(file: BinaryIO) -> str:
+    """utf-8(-sig) if the first chunk decodes as UTF-8, else cp1251; the file position is kept"""
+    position = file.tell()
+    head = file.read(CHUNK_SIZE)
+    file.seek(position)
+    if head.startswith(codecs.BOM_UTF8):
+        return "utf-8-sig"
+    try:
+        head.decode("utf-8")
+    except UnicodeDecodeError as e:
+        if e.start < len(head) - 3:  # not just a character cut at the chunk end
+            return "cp1251"
+    return "utf-8"
+
+
+def open_text(file: BinaryIO, encoding: str | None = None) -> io.TextIOWrapper:
+    return io.TextIOWrapper(file, encoding=encoding or detect_encoding(file), newline="")
+
+
+def normalize_key(key: str) -> str:
+    """Header or tag name as a lookup key: lowercased, ё-folded, single underscores"""
+    return _SPACES.sub("_", key.strip().lower().replace("ё", "е")).strip("_")
+
+
+def sniff_format(file: BinaryIO, filename: str | None = None) -> str:
+    """csv, xml, json or 1c, by extension, else by the file's start"""
+    extension = (filename or "").rsplit(".", 1)[-1].lower()
+    if extension in ("csv", "xml", "json"):
+        return extension
+    position = file.tell()
+    head = file.read(1024).lstrip(codecs.BOM_UTF8).lstrip()
+    file.seek(position)
+    if head.startswith(ONE_C_SIGNATURE.encode()):
+        return "1c"
+    if head.startswith(b"<"):
+        return "xml"
+    if head[:1] in (b"[", b"{"):
+        return "json"
+    return "csv"
+
+
+def iter_csv_records(file: BinaryIO) -> Iterator[tuple[int, dict[str, str]]]:
+    """(line number, {normalized header: value}) per data row; the delimiter is sniffed from the header"""
+    text = open_text(file)
+    header = text.readline()
+    if not header.strip():
+        return
+    try:
+        dialect = csv.Sniffer().sniff(header, delimiters=";,\t|")
+    except csv.Error:
+        dialect = csv.excel
+    keys = [normalize_key(column) for column in next(csv.reader([header], dialect))]
+    for line_number, row in enumerate(csv.reader(text, dialect), 2):
+        if any(cell.strip() for cell in row):
+            yield line_number, {key: value.strip() for key, value in zip(keys, row)}
+
+
+def _local_name(tag: str) -> str:
+    return tag.rsplit("}", 1)[-1]
+
+
+def iter_xml_records(file: BinaryIO, record_tags: set[str]) -> Iterator[tuple[int, dict[str, str]]]:
+    """
+    (record number, fields) per element whose local name is in record_tags.
+    Fields are the element's attributes and the text of its descendants,
+    keyed by normalized local name. Processed elements are cleared.
+    """
+    record_tags = {normalize_key(tag) for tag in record_tags}
+    number = 0
+    for _, element in iterparse(file, events=("end",)):
+        if normalize_key(_local_name(element.tag)) not in record_tags:
+            continue
+        number += 1
+        fields = {normalize_key(_local_name(name)): value.strip() for name, value in element.attrib.items()}
+        for child in element.iter():
+            if child is not element and child.text and child.text.strip():
+                fields.setdefault(normalize_key(_local_name(child.tag)), child.text.strip())
+        element.clear()
+        yield number, fields
+
+
+def iter_json_records(file: BinaryIO) -> Iterator[tuple[int, dict]]:
+    """
+    (record number, object) per object of the first array in the document:
+    a top-level array, or e.g. {"accounts": [...]}. Objects are decoded one
+    at a time from a sliding buffer.
+    """
+    decoder = json.JSONDecoder()
+    text = open_text(file)
+    buffer = ""
+    position = 0
+    eof = False
+
+    def fill() -> bool:
+        nonlocal buffer, position, eof
+        chunk = text.read(CHUNK_SIZE)
+        if not chunk:
+            eof = True
+            return False
+        buffer = buffer[position:] + chunk
+        position = 0
+        return True
+
+    while True:  # skip to the opening bracket of the array
+        start = buffer.find("[", position)
+        if start >= 0:
+            position = start + 1
+            break
+        position = len(buffer)
+        if not fill():
+            return
+
+    number = 0
+    while True:
+        while position < len(buffer) and buffer[position] in " \t\r\n,":
+            position += 1
+        if position >= len(buffer):
+            if not fill():
+                raise ImportFormatError("Неожиданный конец JSON")
+            continue
+        if buffer[position] == "]":
+            return
+        try:
+            value, end = decoder.raw_decode(buffer, position)
+        except json.JSONDecodeError as e:
+            if eof or not fill():
+                raise ImportFormatError(f"Некорректный JSON: {e.msg}") from None
+            continue
+        position = end
+        number += 1
+        if isinstance(value, dict):
+            yield number, {normalize_key(str(key)): value for key, value in value.items()}
+
+
+def iter_1c_records(
+    file: BinaryIO, section: str = "СекцияДокумент", end_marker: str = "КонецДокумента",
+) -> Iterator[tuple[int, dict[str, str]]]:
+    """
+    (line number, fields) per section of a 1C exchange file: the lines from
+    "<section>=<kind>" to end_marker. The kind is
+    returned as "вид_документа". Keys are normalized (e.g. "назначениеплатежа").
+    """
+    text = open_text(file)
+    header = text.readline().strip().lstrip("\ufeff")
+    if header != ONE_C_SIGNATURE:
+        raise ImportFormatError(f"Нет заголовка {ONE_C_SIGNATURE}")
+    fields, start = None, 0
+    for line_number, line in enumerate(text, 2):
+        key, _, value = line.strip().partition("=")
+        if key == section:
+            fields, start = {"вид_документа": value.strip()}, line_number
+        elif key == end_marker and fields is not None:
+            yield start, fields
+            fields = None
+        elif fields is not None and key:
+            fields[normalize_key(key)] = value.strip()
+
+
+def pick(fields: dict, aliases: tuple[str, ...]):
+    """The first non-empty value among alias keys (already normalized)"""
+    for alias in aliases:
+        value = fields.get(alias)
+        if value not in (None, ""):
+            return value
+    return None
+
+
+def parse_amount(value, maximum: Decimal | None = None) -> Decimal:
+    """
+    Decimal from 12345.67, "12 345,67", "-1 000" or "1,234.56". NaN,
+    infinities and amounts beyond ±maximum (the target column's range) are
+    rejected.
+    """
+    if isinstance(value, (int, float, Decimal)):
+        text = str(value)
+    else:
+        text = _SPACES.sub("", str(value)).replace("руб.", "").replace("₽", "")
+        if "," in text and "." in text:
+            text = text.replace(",", "")  # 1,234.56
+        text = text.replace(",", ".")
+    try:
+        amount = Decimal(text)
+    except InvalidOperation:
+        raise ImportFormatError(f"Некорректная сумма: {value}") from None
+    if not amount.is_finite() or (maximum is not None and abs(amount) > maximum):
+        raise ImportFormatError(f"Некорректная сумма: {value}")
+    return amount
+
+
+def parse_date(value) -> date:
+    text = str(value).strip()
+    for date_format in DATE_FORMATS:
+        try:
+            return datetime.strptime(text, date_format).date()
+        except ValueError:
+            continue
+    raise ImportFormatError(f"Некорректная дата: {value}")
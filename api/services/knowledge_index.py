@@ -0,0 +1,269 @@
+"""
+Local retrieval index over the 127-FZ text and our docs/ material.
+
+scripts/build_knowledge_index.py splits the sources into passages (one
+article of the law, or one section of a markdown document) and writes a
+BM25 index to a single binary file:
+
+    header   magic, version, section offsets (HEADER)
+    meta     JSON: vocabulary {term: [postings offset, count, ...]},
+             passages [[source, title], ...], avgdl
+    lengths  uint32 token count per passage
+    postings (uint32 passage, uint16 term frequency) records per term
+    texts    uint64 (offset, length) per passage, then UTF-8 texts
+
+The API memory-maps the file at startup. Only the JSON vocabulary is
+parsed up front; postings and passage texts are read from the mapping per
+query, so loading takes milliseconds and memory is shared by workers.
+"""
+import heapq
+import json
+import logging
+import math
+import mmap
+import re
+import struct
+import time
+from pathlib import Path
+from typing import Iterable, Iterator
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"KIDX"
+VERSION = 1
+HEADER = struct.Struct("<4sI4Q")  # magic, version, meta/lengths/postings/texts offsets
+LENGTH = struct.Struct("<I")
+POSTING = struct.Struct("<IH")
+TEXT_SPAN = struct.Struct("<QQ")
+
+BM25_K1 = 1.5
+BM25_B = 0.75
+STEM_LENGTH = 6
+MAX_PASSAGE_WORDS = 300
+
+_TOKEN = re.compile(r"\w+")
+_ARTICLE = re.compile(r"^\s*Статья\s+(\d+(?:\.\d+)*)\.?\s*(.*)$")
+_HEADING = re.compile(r"^#{1,6}\s+(.*)$")
+
+STOP_WORDS = frozenset(
+    "и в во не что он на я с со как а то все она так его но да ты к у же вы за бы по "
+    "только ее мне было вот от меня еще нет о из ему теперь когда даже ну вдруг ли если "
+    "уже или ни быть был него до вас нибудь опять уж вам ведь там потом себя ничего ей "
+    "может они тут где есть надо ней для мы тебя их чем была сам чтоб без будто чего раз "
+    "тоже себе под будет ж тогда кто этот того потому этого какой совсем ним здесь этом "
+    "один почти мой тем чтобы нее сейчас были куда зачем всех никогда можно при наконец "
+    "два об другой хоть после над больше тот через эти нас про всего них какая много разве "
+    "три эту моя впрочем хорошо свою этой перед иногда лучше чуть том нельзя такой им более "
+    "всегда конечно всю между это также либо которые который которых которой настоящего "
+    "федерального закона статьи".split()
+)
+
+
+def tokenize(text: str) -> list[str]:
+    """Lowercased, ё-folded word tokens without stop words, cut to a crude stem"""
+    tokens = []
+    for token in _TOKEN.findall(text.lower().replace("ё", "е")):
+        if token in STOP_WORDS or (len(token) < 2 and not token.isdigit()):
+            continue
+        tokens.append(token if token.isdigit() else token[:STEM_LENGTH])
+    return tokens
+
+
+class Passage:
+    """One retrievable unit of text"""
+
+    __slots__ = ("source", "title", "text", "score")
+
+    def __init__(self, source: str, title: str, text: str, score: float = 0.0):
+        self.source = source
+        self.title = title
+        self.text = text
+        self.score = score
+
+    def __repr__(self) -> str:
+        return f"Passage({self.source!r}, {self.title!r}, score={self.score:.2f})"
+
+
+def _windows(source: str, title: str, lines: list[str]) -> Iterator[Passage]:
+    """Split long text into passages of at most MAX_PASSAGE_WORDS words, keeping the title"""
+    words = " ".join(line.strip() for line in lines if line.strip()).split()
+    for start in range(0, len(words), MAX_PASSAGE_WORDS):
+        chunk = words[start:start + MAX_PASSAGE_WORDS]
+        if chunk:
+            yield Passage(source, title, " ".join(chunk))
+
+
+def iter_law_passages(path: Path, source: str = "127-ФЗ") -> Iterator[Passage]:
+    """Passages of a law text split at 'Статья N. Title' lines"""
+    title, lines = None, []
+    for line in path.read_text(encoding="utf-8").splitlines():
+        match = _ARTICLE.match(line)
+        if match:
+            if title:
+                yield from _windows(source, title, lines)
+            title, lines = f"Статья {match.group(1)}. {match.group(2)}".strip(), []
+        elif title:
+            lines.append(line)
+    if title:
+        yield from _windows(source, title, lines)
+
+
+def iter_markdown_passages(path: Path) -> Iterator[Passage]:
+    """Passages of a markdown document split at headings"""
+    title, lines = path.stem, []
+    for line in path.read_text(encoding="utf-8").splitlines():
+        match = _HEADING.match(line)
+        if match:
+            yield from _windows(path.name, title, lines)
+            title, lines = match.group(1).strip(), []
+        else:
+            lines.append(line)
+    yield from _windows(path.name, title, lines)
+
+
+def build_index(passages: Iterable[Passage]) -> bytes:
+    """Serialize passages and their BM25 postings (format in the module docstring)"""
+    passages = list(passages)
+    postings: dict[str, list[tuple[int, int]]] = {}
+    lengths = []
+    for passage_id, passage in enumerate(passages):
+        tokens = tokenize(f"{passage.title} {passage.text}")
+        lengths.append(len(tokens))
+        counts: dict[str, int] = {}
+        for token in tokens:
+            counts[token] = counts.get(token, 0) + 1
+        for token, tf in counts.items():
+            postings.setdefault(token, []).append((passage_id, min(tf, 0xFFFF)))
+
+    postings_blob = bytearray()
+    vocabulary = {}
+    for term in sorted(postings):
+        vocabulary[term] = [len(postings_blob) // POSTING.size, len(postings[term])]
+        for record in postings[term]:
+            postings_blob += POSTING.pack(*record)
+
+    texts = [passage.text.encode("utf-8") for passage in passages]
+    spans, offset = bytearray(), 0
+    for text in texts:
+        spans += TEXT_SPAN.pack(offset, len(text))
+        offset += len(text)
+
+    meta = json.dumps({
+        "vocabulary": vocabulary,
+        "passages": [[p.source, p.title] for p in passages],
+        "avgdl": sum(lengths) / len(lengths) if lengths else 0.0,
+    }, ensure_ascii=False).encode("utf-8")
+    lengths_blob = b"".join(LENGTH.pack(length) for length in lengths)
+
+    meta_at = HEADER.size
+    lengths_at = meta_at + len(meta)
+    postings_at = lengths_at + len(lengths_blob)
+    texts_at = postings_at + len(postings_blob)
+    return b"".join([
+        HEADER.pack(MAGIC, VERSION, meta_at, lengths_at, postings_at, texts_at),
+        meta, lengths_blob, bytes(postings_blob), bytes(spans), *texts,
+    ])
+
+
+class KnowledgeIndex:
+    """Read-only BM25 index over a memory-mapped index file."""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._file = self.path.open("rb")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, meta_at, lengths_at, postings_at, texts_at = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise ValueError(f"Not a knowledge index (v{VERSION}): {path}")
+        meta = json.loads(self._map[meta_at:lengths_at])
+        self.vocabulary: dict[str, list[int]] = meta["vocabulary"]
+        self.passages: list[list[str]] = meta["passages"]
+        self.avgdl: float = meta["avgdl"] or 1.0
+        self._lengths_at = lengths_at
+        self._postings_at = postings_at
+        self._texts_at = texts_at
+        self._text_base = texts_at + TEXT_SPAN.size * len(self.passages)
+
+    def __len__(self) -> int:
+        return len(self.passages)
+
+    def _idf(self, df: int) -> float:
+        n = len(self.passages)
+        return math.log(1 + (n - df + 0.5) / (df + 0.5))
+
+    def _text(self, passage_id: int) -> str:
+        offset, length = TEXT_SPAN.unpack_from(self._map, self._texts_at + passage_id * TEXT_SPAN.size)
+        start = self._text_base + offset
+        return self._map[start:start + length].decode("utf-8")
+
+    def search(self, query: str, k: int = 3) -> list[Passage]:
+        """Top-k passages by BM25"""
+        scores: dict[int, float] = {}
+        for term in set(tokenize(query)):
+            entry = self.vocabulary.get(term)
+            if entry is None:
+                continue
+            first, count = entry
+            idf = self._idf(count)
+            start = self._postings_at + first * POSTING.size
+            for passage_id, tf in POSTING.iter_unpack(self._map[start:start + count * POSTING.size]):
+                (length,) = LENGTH.unpack_from(self._map, self._lengths_at + passage_id * LENGTH.size)
+                norm = BM25_K1 * (1 - BM25_B + BM25_B * length / self.avgdl)
+                scores[passage_id] = scores.get(passage_id, 0.0) + idf * tf * (BM25_K1 + 1) / (tf + norm)
+        top = heapq.nlargest(k, scores.items(), key=lambda item: item[1])
+        return [
+            Passage(*self.passages[passage_id], text=self._text(passage_id), score=score)
+            for passage_id, score in top
+        ]
+
+    def close(self) -> None:
+        self._map.close()
+        self._file.close()
+
+
+def format_passages(passages: list[Passage], max_tokens: int) -> str:
+    """Numbered excerpts for the prompt, cut to roughly max_tokens (3 chars per token)"""
+    budget = max_tokens * 3
+    excerpts = []
+    for number, passage in enumerate(passages, 1):
+        header = f"[{number}] {passage.source}, {passage.title}: "
+        room = budget - len(header)
+        if room <= 0:
+            break
+        text = passage.text if len(passage.text) <= room else passage.text[:room - 1] + "…"
+        excerpts.append(header + text)
+        budget -= len(header) + len(text)
+    return "\n".join(excerpts)
+
+
+knowledge_index: KnowledgeIndex | None = None
+
+
+def load_knowledge_index(path: str | Path | None = None) -> KnowledgeIndex | None:
+    """Open the index (at startup); None if there is no index file"""
+    global knowledge_index
+    path = Path(path or settings.KNOWLEDGE_INDEX_PATH)
+    if not path.exists():
+        logger.info("Knowledge index %s not found, AI answers are not grounded", path)
+        return None
+    started = time.perf_counter()
+    knowledge_index = KnowledgeIndex(path)
+    logger.info(
+        "Loaded knowledge index %s: %d passages in %.1f ms",
+        path, len(knowledge_index), (time.perf_counter() - started) * 1000,
+    )
+    return knowledge_index
+
+
+def get_knowledge_index() -> KnowledgeIndex | None:
+    return knowledge_index
+
+
+def close_knowledge_index() -> None:
+    global knowledge_index
+    if knowledge_index is not None:
+        knowledge_index.close()
+        knowledge_index = None
@@ -0,0 +1,116 @@
+"""
+Mail merge for docx templates.
+
+The template body is patched and compiled once; each letter is a Jinja fill
+of that compiled body. Letters are either merged into one DOCX (separated by
+page breaks) or packed as separate DOCX files into a ZIP archive.
+
+Only the document body is merged: headers, footers and core properties are
+copied from the template as is.
+"""
+import re
+import zipfile
+from io import BytesIO
+from typing import Iterable
+
+from docx import Document
+from docx.oxml.ns import nsmap, qn
+from docxtpl import DocxTemplate
+from jinja2 import Environment
+from lxml import etree
+
+
+def _page_break_paragraph():
+    paragraph = etree.Element(qn("w:p"))
+    run = etree.SubElement(paragraph, qn("w:r"))
+    etree.SubElement(run, qn("w:br"), {qn("w:type"): "page"})
+    return paragraph
+
+
+class MailMergeTemplate:
+    """A docx template compiled once and filled for many contexts."""
+
+    def __init__(self, template_bytes: bytes, jinja_env: Environment | None = None):
+        self._template_bytes = template_bytes
+        # docxtpl helpers (patch_xml, resolve_listing, fix_tables) are stateless
+        # apart from the loaded document, which is only read here
+        self._helper = DocxTemplate(BytesIO(template_bytes))
+        self._helper.render_init()
+
+        body_xml = self._helper.patch_xml(self._helper.get_xml())
+        body_xml = re.sub(r"<w:p([ >])", r"\n<w:p\1", body_xml)
+        self._body = (jinja_env or Environment()).from_string(body_xml)
+
+    def fill_body(self, context: dict):
+        """Render the body for one context and return it as an lxml element"""
+        xml = self._body.render(context)
+        xml = re.sub(r"\n<w:p([ >])", r"<w:p\1", xml)
+        xml = (
+            xml.replace("{_{", "{{")
+            .replace("}_}", "}}")
+            .replace("{_%", "{%")
+            .replace("%_}", "%}")
+        )
+        xml = self._helper.resolve_listing(xml)
+        return self._helper.fix_tables(xml)
+
+    def _new_document(self):
+        return Document(BytesIO(self._template_bytes))
+
+    @staticmethod
+    def _replace_body(document, body) -> None:
+        root = document.element
+        root.replace(root.body, body)
+
+    @staticmethod
+    def _renumber_drawings(body, start: int = 1000) -> int:
+        # docPr ids must be unique within a document
+        for elt in body.xpath("//wp:docPr", namespaces=nsmap):
+            start += 1
+            elt.attrib["id"] = str(start)
+        return start
+
+    def render_merged(self, contexts: Iterable[dict]) -> BytesIO:
+        """Render all contexts into a single DOCX, one letter per page group"""
+        merged = None
+        section = None
+        for context in contexts:
+            body = self.fill_body(context)
+            if merged is None:
+                merged = body
+                section = merged.find(qn("w:sectPr"))
+                continue
+            for element in [_page_break_paragraph(), *body]:
+                if element.tag == qn("w:sectPr"):
+                    continue
+                if section is not None:
+                    section.addprevious(element)
+                else:
+                    merged.append(element)
+
+        document = self._new_document()
+        if merged is not None:
+            self._renumber_drawings(merged)
+            self._replace_body(document, merged)
+
+        buffer = BytesIO()
+        document.save(buffer)
+        buffer.seek(0)
+        return buffer
+
+    def render_zip(self, contexts: Iterable[tuple[str, dict]]) -> BytesIO:
+        """Render (file_name, context) pairs into a ZIP of separate DOCX files"""
+        document = self._new_document()
+
+        buffer = BytesIO()
+        with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as archive:
+            for file_name, context in contexts:
+                body = self.fill_body(context)
+                self._renumber_drawings(body)
+                self._replace_body(document, body)
+                letter = BytesIO()
+                document.save(letter)
+                archive.writestr(file_name, letter.getvalue())
+
+        buffer.seek(0)
+        return buffer
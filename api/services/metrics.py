@@ -0,0 +1,260 @@
+"""
+Request-level performance metrics.
+
+PerformanceMiddleware times every request and, through a context variable,
+collects what the request spent its time on:
+
+- SQL: statement count and time, from engine cursor events (instrument_engine)
+- decryption: EncryptedString/EncryptedText decrypt count and time
+  (record_decrypt is registered in utils.encryption.decrypt_observers)
+- response size and status
+
+Aggregates are kept in process and exposed in the Prometheus text format at
+/metrics (metrics are per worker; Prometheus sums them per instance label).
+With PERF_DEBUG_HEADER enabled, each response also carries a Server-Timing
+header with its own breakdown, e.g.
+
+    Server-Timing: app;dur=41.2, sql;dur=12.8;desc="9 queries", decrypt;dur=3.1;desc="140 values"
+
+No client library is needed: the exposition format is plain text.
+"""
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+
+from sqlalchemy import event
+
+from config import settings
+from utils.encryption import decrypt_observers
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+POOL_WAIT_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0)
+
+UNMATCHED_ROUTE = "unmatched"
+EXCLUDED_PATHS = {"/metrics"}
+
+
+class RequestStats:
+    """Counters of one request, shared through _current_request"""
+
+    __slots__ = ("sql_count", "sql_seconds", "decrypt_count", "decrypt_seconds")
+
+    def __init__(self):
+        self.sql_count = 0
+        self.sql_seconds = 0.0
+        self.decrypt_count = 0
+        self.decrypt_seconds = 0.0
+
+
+_current_request: ContextVar[RequestStats | None] = ContextVar("request_stats", default=None)
+
+
+def current_request_stats() -> RequestStats | None:
+    return _current_request.get()
+
+
+def record_decrypt(seconds: float) -> None:
+    stats = _current_request.get()
+    if stats is not None:
+        stats.decrypt_count += 1
+        stats.decrypt_seconds += seconds
+
+
+decrypt_observers.append(record_decrypt)
+
+
+class Histogram:
+    """Cumulative-bucket histogram per label set"""
+
+    def __init__(self, name: str, help_text: str, labels: tuple[str, ...], buckets: tuple):
+        self.name = name
+        self.help_text = help_text
+        self.labels = labels
+        self.buckets = buckets
+        self._series: dict[tuple, list] = {}  # labels -> [bucket counts..., +Inf count, sum]
+
+    def observe(self, label_values: tuple, value: float) -> None:
+        series = self._series.get(label_values)
+        if series is None:
+            series = self._series[label_values] = [0] * (len(self.buckets) + 1) + [0.0]
+        series[bisect_left(self.buckets, value)] += 1
+        series[-1] += value
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        for label_values, series in sorted(self._series.items()):
+            labels = _labels(self.labels, label_values)
+            cumulative = 0
+            for bound, count in zip((*self.buckets, "+Inf"), series):
+                cumulative += count
+                lines.append(f'{self.name}_bucket{{{labels}{"," if labels else ""}le="{bound}"}} {cumulative}')
+            selector = f"{{{labels}}}" if labels else ""
+            lines.append(f"{self.name}_sum{selector} {series[-1]:.6f}")
+            lines.append(f"{self.name}_count{selector} {cumulative}")
+        return lines
+
+
+class Counter:
+    """Monotonic counter per label set"""
+
+    def __init__(self, name: str, help_text: str, labels: tuple[str, ...]):
+        self.name = name
+        self.help_text = help_text
+        self.labels = labels
+        self._series: dict[tuple, float] = {}
+
+    def inc(self, label_values: tuple, value: float = 1) -> None:
+        self._series[label_values] = self._series.get(label_values, 0) + value
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        for label_values, value in sorted(self._series.items()):
+            lines.append(f"{self.name}{{{_labels(self.labels, label_values)}}} {_number(value)}")
+        return lines
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(names: tuple[str, ...], values: tuple) -> str:
+    return ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values))
+
+
+def _number(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else f"{value:.6f}"
+
+
+class MetricsRegistry:
+    """Request metrics of this worker process"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = Counter("http_requests_total", "HTTP requests", ("method", "route", "status"))
+        self.duration = Histogram(
+            "http_request_duration_seconds", "Request latency", ("method", "route"), DURATION_BUCKETS
+        )
+        self.sql_queries = Histogram(
+            "http_request_sql_queries", "SQL statements per request", ("method", "route"), QUERY_COUNT_BUCKETS
+        )
+        self.sql_seconds = Counter("http_request_sql_seconds_total", "Time in SQL", ("method", "route"))
+        self.decrypts = Counter("http_request_decrypts_total", "Decrypted field values", ("method", "route"))
+        self.decrypt_seconds = Counter(
+            "http_request_decrypt_seconds_total", "Time decrypting field values", ("method", "route")
+        )
+        self.response_size = Histogram(
+            "http_response_size_bytes", "Response body size", ("method", "route"), SIZE_BUCKETS
+        )
+        self.pool_wait = Histogram(
+            "db_pool_checkout_wait_seconds", "Wait for a pooled DB connection", (), POOL_WAIT_BUCKETS
+        )
+
+    def observe(self, method: str, route: str, status: int, seconds: float, size: int, stats: RequestStats) -> None:
+        key = (method, route)
+        with self._lock:
+            self.requests.inc((method, route, status))
+            self.duration.observe(key, seconds)
+            self.sql_queries.observe(key, stats.sql_count)
+            self.sql_seconds.inc(key, stats.sql_seconds)
+            self.decrypts.inc(key, stats.decrypt_count)
+            self.decrypt_seconds.inc(key, stats.decrypt_seconds)
+            self.response_size.observe(key, size)
+
+    def observe_pool_wait(self, seconds: float) -> None:
+        with self._lock:
+            self.pool_wait.observe((), seconds)
+
+    def render(self, gauges: dict[str, float] | None = None, counters: dict[str, float] | None = None) -> str:
+        """Exposition text; gauges/counters are unlabelled values collected at scrape time"""
+        with self._lock:
+            lines = []
+            for metric in (
+                self.requests, self.duration, self.sql_queries, self.sql_seconds,
+                self.decrypts, self.decrypt_seconds, self.response_size, self.pool_wait,
+            ):
+                lines += metric.render()
+        for kind, values in (("gauge", gauges), ("counter", counters)):
+            for name, value in (values or {}).items():
+                lines += [f"# TYPE {name} {kind}", f"{name} {_number(value)}"]
+        return "\n".join(lines) + "\n"
+
+
+metrics = MetricsRegistry()
+
+
+def instrument_engine(engine) -> None:
+    """Count SQL statements and their time into the current request's stats; record pool waits"""
+    sync_engine = getattr(engine, "sync_engine", engine)
+    if hasattr(sync_engine.pool, "wait_observer"):
+        sync_engine.pool.wait_observer = metrics.observe_pool_wait
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        if context is not None:
+            context._perf_started = time.perf_counter()
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        stats = _current_request.get()
+        if stats is not None:
+            stats.sql_count += 1
+            started = getattr(context, "_perf_started", None)
+            if started is not None:
+                stats.sql_seconds += time.perf_counter() - started
+
+
+def server_timing(stats: RequestStats, seconds: float) -> str:
+    return (
+        f"app;dur={seconds * 1000:.1f}, "
+        f'sql;dur={stats.sql_seconds * 1000:.1f};desc="{stats.sql_count} queries", '
+        f'decrypt;dur={stats.decrypt_seconds * 1000:.1f};desc="{stats.decrypt_count} values"'
+    )
+
+
+class PerformanceMiddleware:
+    """
+    Pure ASGI middleware (BaseHTTPMiddleware would buffer streaming responses
+    and run the endpoint in another context, losing the per-request stats).
+    """
+
+    def __init__(self, app, registry: MetricsRegistry = metrics, debug_header: bool | None = None):
+        self.app = app
+        self.registry = registry
+        self.debug_header = settings.PERF_DEBUG_HEADER if debug_header is None else debug_header
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] in EXCLUDED_PATHS:
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = _current_request.set(stats)
+        started = time.perf_counter()
+        status_code = 500
+        size = 0
+
+        async def send_wrapper(message):
+            nonlocal status_code, size
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                if self.debug_header:
+                    headers = list(message.get("headers", []))
+                    timing = server_timing(stats, time.perf_counter() - started)
+                    headers.append((b"server-timing", timing.encode("latin-1")))
+                    message = {**message, "headers": headers}
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current_request.reset(token)
+            # Route template, not the raw path, to keep label cardinality bounded
+            route = getattr(scope.get("route"), "path", UNMATCHED_ROUTE)
+            self.registry.observe(
+                scope["method"], route, status_code, time.perf_counter() - started, size, stats
+            )
@@ -0,0 +1,111 @@
+"""
+Password hashing off the event loop.
+
+bcrypt takes ~200-300 ms of CPU per hash/verify. Running it inline in an
+async handler blocks every other request on the worker for that long, so
+hashes run in a dedicated bounded thread pool (bcrypt releases the GIL).
+
+At most `max_workers + max_queue` operations are accepted at a time; further
+calls fail fast with PasswordHasherBusy, which the API turns into 503 with
+Retry-After instead of letting a login burst queue up without bound.
+"""
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from passlib.context import CryptContext
+
+from config import settings
+
+
+class PasswordHasherBusy(Exception):
+    """Hash queue is full"""
+
+
+class PasswordHasher:
+    """Bounded executor for password hashing with queue metrics."""
+
+    def __init__(self, context: CryptContext, max_workers: int, max_queue: int):
+        self.context = context
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="password-hash")
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._running = 0
+        self.completed_total = 0
+        self.rejected_total = 0
+        self.wait_seconds_total = 0.0
+        self.hash_seconds_total = 0.0
+
+    @property
+    def in_flight(self) -> int:
+        """Operations accepted and not finished (queued + running)"""
+        return self._in_flight
+
+    @property
+    def queue_depth(self) -> int:
+        """Operations waiting for a worker"""
+        return max(self._in_flight - self._running, 0)
+
+    def _call(self, queued_at: float, func, *args):
+        started = time.perf_counter()
+        with self._lock:
+            self._running += 1
+            self.wait_seconds_total += started - queued_at
+        try:
+            return func(*args)
+        finally:
+            with self._lock:
+                self._running -= 1
+                self.completed_total += 1
+                self.hash_seconds_total += time.perf_counter() - started
+
+    async def _submit(self, func, *args):
+        with self._lock:
+            if self._in_flight >= self.max_workers + self.max_queue:
+                self.rejected_total += 1
+                raise PasswordHasherBusy()
+            self._in_flight += 1
+        try:
+            future = self._executor.submit(self._call, time.perf_counter(), func, *args)
+        except BaseException:
+            self._release()
+            raise
+        # Released when the job finishes or is cancelled while still queued
+        # (the awaiting request was cancelled), so no slot can leak
+        future.add_done_callback(self._release)
+        return await asyncio.wrap_future(future)
+
+    def _release(self, future=None) -> None:
+        with self._lock:
+            self._in_flight -= 1
+
+    async def hash(self, password: str) -> str:
+        return await self._submit(self.context.hash, password)
+
+    async def verify(self, password: str, hashed: str) -> bool:
+        return await self._submit(self.context.verify, password, hashed)
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.max_workers,
+            "queue_limit": self.max_queue,
+            "in_flight": self.in_flight,
+            "queue_depth": self.queue_depth,
+            "completed_total": self.completed_total,
+            "rejected_total": self.rejected_total,
+            "wait_seconds_total": round(self.wait_seconds_total, 3),
+            "hash_seconds_total": round(self.hash_seconds_total, 3),
+        }
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+password_hasher = PasswordHasher(
+    CryptContext(schemes=["bcrypt"], deprecated="auto"),
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+    max_queue=settings.PASSWORD_HASH_QUEUE_LIMIT,
+)
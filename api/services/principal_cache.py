@@ -0,0 +1,161 @@
+"""
+Cache of authenticated user principals (id, role, is_active).
+
+Resource endpoints only need to know who the caller is and whether they are
+active and an admin; loading the full User row (and decrypting email, name
+and phone) on every request is avoided by caching just those three fields:
+
+- in process, for PRINCIPAL_LOCAL_CACHE_TTL_SECONDS (short, per replica)
+- in Redis, for PRINCIPAL_CACHE_TTL_SECONDS (shared by replicas)
+
+invalidate() drops both entries; it must be called whenever a user's role,
+is_active or password changes. Other replicas may serve their in-process
+entry until it expires, so the local TTL bounds how stale a principal can be.
+"""
+import json
+import logging
+import time
+from typing import Awaitable, Callable
+
+import redis.asyncio as aioredis
+from redis.exceptions import RedisError
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "principal:"
+MAX_LOCAL_ENTRIES = 10_000
+# After a Redis error, skip Redis for this long instead of paying the timeout per request
+REDIS_RETRY_AFTER_SECONDS = 30.0
+
+
+class Principal:
+    """The authenticated caller: only the fields authorization needs."""
+
+    __slots__ = ("id", "role", "is_active")
+
+    def __init__(self, id: int, role: str, is_active: bool):
+        self.id = id
+        self.role = role
+        self.is_active = is_active
+
+    @classmethod
+    def from_user(cls, user) -> "Principal":
+        return cls(user.id, user.role, user.is_active)
+
+    def to_json(self) -> str:
+        return json.dumps({"id": self.id, "role": self.role, "is_active": self.is_active})
+
+    @classmethod
+    def from_json(cls, raw: str | bytes) -> "Principal":
+        data = json.loads(raw)
+        return cls(data["id"], data["role"], data["is_active"])
+
+    def __repr__(self) -> str:
+        return f"Principal(id={self.id}, role={self.role!r}, is_active={self.is_active})"
+
+
+class PrincipalCache:
+    """Two-level (in-process + Redis) principal cache with TTLs."""
+
+    def __init__(self, redis_url: str | None, ttl: int, local_ttl: float):
+        self.redis_url = redis_url
+        self.ttl = ttl
+        self.local_ttl = local_ttl
+        self._local: dict[int, tuple[float, Principal]] = {}
+        self._redis = None
+        self._redis_retry_at = 0.0
+
+    @property
+    def redis(self):
+        if self._redis is None and self.redis_url:
+            self._redis = aioredis.from_url(
+                self.redis_url, socket_connect_timeout=0.5, socket_timeout=0.5
+            )
+        return self._redis
+
+    def _cache_redis(self):
+        """Redis client for cache reads/writes, None while Redis is failing"""
+        if self._redis_retry_at > time.monotonic():
+            return None
+        return self.redis
+
+    @staticmethod
+    def _key(user_id: int) -> str:
+        return f"{KEY_PREFIX}{user_id}"
+
+    def _redis_failed(self, action: str, error: Exception) -> None:
+        logger.warning("Principal cache %s failed: %s", action, error)
+        self._redis_retry_at = time.monotonic() + REDIS_RETRY_AFTER_SECONDS
+
+    def _remember(self, principal: Principal) -> None:
+        now = time.monotonic()
+        if len(self._local) >= MAX_LOCAL_ENTRIES:
+            self._local = {k: v for k, v in self._local.items() if v[0] > now}
+            if len(self._local) >= MAX_LOCAL_ENTRIES:
+                self._local.clear()
+        self._local[principal.id] = (now + self.local_ttl, principal)
+
+    async def _get_shared(self, user_id: int) -> Principal | None:
+        redis = self._cache_redis()
+        if redis is None or self.ttl <= 0:
+            return None
+        try:
+            raw = await redis.get(self._key(user_id))
+        except (RedisError, OSError) as e:
+            self._redis_failed("read", e)
+            return None
+        return Principal.from_json(raw) if raw else None
+
+    async def _set_shared(self, principal: Principal) -> None:
+        redis = self._cache_redis()
+        if redis is None or self.ttl <= 0:
+            return
+        try:
+            await redis.set(self._key(principal.id), principal.to_json(), ex=self.ttl)
+        except (RedisError, OSError) as e:
+            self._redis_failed("write", e)
+
+    async def get(
+        self,
+        user_id: int,
+        loader: Callable[[int], Awaitable[Principal | None]],
+    ) -> Principal | None:
+        """Cached principal, or loader(user_id) on a miss (None is not cached)"""
+        entry = self._local.get(user_id)
+        if entry and entry[0] > time.monotonic():
+            return entry[1]
+
+        principal = await self._get_shared(user_id)
+        if principal is None:
+            principal = await loader(user_id)
+            if principal is None:
+                return None
+            await self._set_shared(principal)
+
+        self._remember(principal)
+        return principal
+
+    async def invalidate(self, user_id: int) -> None:
+        """Drop the cached principal (always tries Redis, even while it is failing)"""
+        self._local.pop(user_id, None)
+        redis = self.redis
+        if redis is None:
+            return
+        try:
+            await redis.delete(self._key(user_id))
+        except (RedisError, OSError) as e:
+            self._redis_failed("invalidation", e)
+
+    async def aclose(self) -> None:
+        if self._redis is not None:
+            await self._redis.aclose()
+            self._redis = None
+
+
+principal_cache = PrincipalCache(
+    settings.REDIS_URL,
+    ttl=settings.PRINCIPAL_CACHE_TTL_SECONDS,
+    local_ttl=settings.PRINCIPAL_LOCAL_CACHE_TTL_SECONDS,
+)
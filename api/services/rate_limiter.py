@@ -0,0 +1,204 @@
+"""
+Distributed rate limiting on Redis (sliding window log).
+
+Every request is counted against the "default" budget and, for expensive
+endpoints marked with @rate_limit("<budget>"), against that budget as well.
+Budgets are keyed by caller identity, not by connection:
+
+- JWT users:            user:<id>
+- bot (API token):      tg:<X-Telegram-User-Id>, or "bot" without the header
+- anonymous:            ip:<client IP> (X-Real-IP when the peer is a trusted proxy)
+
+Each budget is a sorted set of request timestamps. All budgets of a request
+are checked in a single MULTI pipeline (one round trip); a rejected request
+is removed again so it does not consume the budget.
+
+If Redis is unavailable the limiter fails open and skips Redis for
+REDIS_RETRY_AFTER_SECONDS instead of paying the timeout per request.
+"""
+import logging
+import math
+import secrets
+import time
+
+import redis.asyncio as aioredis
+from fastapi import HTTPException, Request, status
+from redis.exceptions import RedisError
+
+from config import settings
+from services.auth_service import auth_service
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "ratelimit:"
+REDIS_RETRY_AFTER_SECONDS = 30.0
+EXEMPT_PATHS = {"/health", "/metrics"}
+
+PERIOD_SECONDS = {"second": 1, "minute": 60, "hour": 3600, "day": 86400}
+
+
+def parse_limit(value: str) -> tuple[int, int]:
+    """'20/minute' -> (20, 60)"""
+    count, _, period = value.partition("/")
+    period = period.strip().lower().rstrip("s")
+    if period not in PERIOD_SECONDS or not count.strip().isdigit():
+        raise ValueError(f"Invalid rate limit: {value!r}")
+    return int(count), PERIOD_SECONDS[period]
+
+
+def rate_limit(budget: str):
+    """
+    Mark an endpoint as counted against a named budget (in addition to "default").
+
+    Usage:
+        @router.post("/ask")
+        @rate_limit("ai")
+        async def ask_ai(...):
+            ...
+    """
+    def decorator(endpoint):
+        endpoint.rate_limit_budget = budget
+        return endpoint
+
+    return decorator
+
+
+class RateLimitResult:
+    """Outcome of one check: allowed, or rejected with seconds until a slot frees up."""
+
+    __slots__ = ("allowed", "budget", "limit", "retry_after")
+
+    def __init__(self, allowed: bool, budget: str | None = None, limit: int = 0, retry_after: int = 0):
+        self.allowed = allowed
+        self.budget = budget
+        self.limit = limit
+        self.retry_after = retry_after
+
+
+class RateLimiter:
+    """Sliding-window limiter over Redis sorted sets."""
+
+    def __init__(self, redis_url: str | None, budgets: dict[str, str]):
+        self.redis_url = redis_url
+        self.budgets = {name: parse_limit(value) for name, value in budgets.items()}
+        self._redis = None
+        self._redis_retry_at = 0.0
+
+    @property
+    def redis(self):
+        if self._redis is None and self.redis_url:
+            self._redis = aioredis.from_url(
+                self.redis_url, socket_connect_timeout=0.5, socket_timeout=0.5
+            )
+        return self._redis
+
+    def _limiter_redis(self):
+        """Redis client, None while Redis is failing"""
+        if self._redis_retry_at > time.monotonic():
+            return None
+        return self.redis
+
+    async def hit(self, identity: str, budgets: list[str]) -> RateLimitResult:
+        """Count one request against budgets; rejected requests are not counted"""
+        redis = self._limiter_redis()
+        checks = [(name, *self.budgets[name]) for name in budgets if name in self.budgets]
+        if redis is None or not checks:
+            return RateLimitResult(True)
+
+        now = time.time()
+        member = f"{now:.6f}:{secrets.token_hex(4)}"
+        keys = [f"{KEY_PREFIX}{name}:{identity}" for name, _, _ in checks]
+        try:
+            pipe = redis.pipeline(transaction=True)
+            for key, (_, _, window) in zip(keys, checks):
+                pipe.zremrangebyscore(key, 0, now - window)
+                pipe.zadd(key, {member: now})
+                pipe.zcard(key)
+                pipe.zrange(key, 0, 0, withscores=True)
+                pipe.expire(key, window)
+            replies = await pipe.execute()
+
+            for index, (name, limit, window) in enumerate(checks):
+                count, oldest = replies[index * 5 + 2], replies[index * 5 + 3]
+                if count > limit:
+                    await self._forget(redis, keys, member)
+                    oldest_at = oldest[0][1] if oldest else now
+                    retry_after = max(1, math.ceil(oldest_at + window - now))
+                    return RateLimitResult(False, name, limit, retry_after)
+        except (RedisError, OSError) as e:
+            logger.warning("Rate limiter unavailable, allowing requests: %s", e)
+            self._redis_retry_at = time.monotonic() + REDIS_RETRY_AFTER_SECONDS
+            return RateLimitResult(True)
+
+        return RateLimitResult(True)
+
+    @staticmethod
+    async def _forget(redis, keys: list[str], member: str) -> None:
+        pipe = redis.pipeline(transaction=False)
+        for key in keys:
+            pipe.zrem(key, member)
+        await pipe.execute()
+
+    async def aclose(self) -> None:
+        if self._redis is not None:
+            await self._redis.aclose()
+            self._redis = None
+
+
+def client_ip(request: Request) -> str:
+    """Client address; X-Real-IP is trusted only from configured proxies (nginx)"""
+    peer = request.client.host if request.client else "unknown"
+    if peer in settings.RATE_LIMIT_TRUSTED_PROXIES:
+        return request.headers.get("X-Real-IP", peer)
+    return peer
+
+
+def rate_limit_identity(request: Request) -> str:
+    """Who a request is counted against (see module docstring)"""
+    auth_header = request.headers.get("Authorization", "")
+    token = auth_header[7:] if auth_header.startswith("Bearer ") else ""
+    api_token = request.headers.get("X-API-Token", "")
+
+    if settings.API_TOKEN and settings.API_TOKEN in (token, api_token):
+        telegram_user_id = request.headers.get("X-Telegram-User-Id", "")
+        return f"tg:{telegram_user_id}" if telegram_user_id.isdigit() else "bot"
+
+    if token:
+        payload = auth_service.decode_access_token(token)
+        if payload and payload.get("sub"):
+            return f"user:{payload['sub']}"
+
+    return f"ip:{client_ip(request)}"
+
+
+async def enforce_rate_limit(request: Request) -> None:
+    """App-wide dependency: 429 with Retry-After when a budget is exhausted"""
+    if not settings.RATE_LIMIT_ENABLED or request.url.path in EXEMPT_PATHS:
+        return
+
+    budgets = ["default"]
+    budget = getattr(request.scope.get("endpoint"), "rate_limit_budget", None)
+    if budget:
+        budgets.append(budget)
+
+    result = await rate_limiter.hit(rate_limit_identity(request), budgets)
+    if not result.allowed:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Слишком много запросов, повторите позже",
+            headers={
+                "Retry-After": str(result.retry_after),
+                "X-RateLimit-Limit": str(result.limit),
+                "X-RateLimit-Budget": result.budget,
+            },
+        )
+
+
+rate_limiter = RateLimiter(
+    settings.REDIS_URL,
+    budgets={
+        "default": settings.RATE_LIMIT_DEFAULT,
+        "documents": settings.RATE_LIMIT_DOCUMENTS,
+        "ai": settings.RATE_LIMIT_AI,
+    },
+)
@@ -0,0 +1,192 @@
+"""
+Import of bank statements into a case's three-year transaction history.
+
+Statements come as CSV exports or in the 1C client-bank exchange format.
+They are read record by record (services.import_parsing) and classified by
+the rules below into the petition's transaction types; lines that match no
+rule (groceries, salary, transfers) are counted and skipped. So are lines
+already in the case (same type, date, amount and description), so
+re-uploading a statement or an overlapping export adds nothing twice.
+
+Records are processed in batches of IMPORT_BATCH_SIZE: a batch is parsed
+in a worker thread, then written, so memory does not grow with the
+statement. On PostgreSQL batches are written with COPY (asyncpg
+copy_records_to_table) on the session's connection, inside its
+transaction; other databases use an executemany INSERT.
+"""
+import asyncio
+import re
+from datetime import date, datetime
+from decimal import Decimal
+from itertools import islice
+from typing import BinaryIO, Iterator
+
+from sqlalchemy import insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from models.case import Case, Transaction
+from services.import_parsing import (
+    ImportFormatError, iter_1c_records, iter_csv_records, parse_amount, parse_date, pick, sniff_format,
+)
+
+IMPORT_BATCH_SIZE = 1000
+MAX_REPORTED_ERRORS = 50
+
+# (transaction_type, pattern) in priority order, matched against the
+# lowercased, ё-folded purpose and counterparty of a statement line.
+# Only deals are reportable: a pattern needs the wording of a contract
+# that transfers the object (sale, gift, exchange, share participation)
+# next to the object itself. Routine payments about it (fines, insurance,
+# mortgage installments, state fees) must not match.
+_DEAL = r"(?:купли[- ]продажи|продаж\w*|покупк\w*|приобретени\w*|дарени\w*|отчуждени\w*|мены|уступк\w*|\bдкп\b)"
+_NEAR = r"\W+(?:[\d/.,%]+\s*)?(?:\w+\W+)?"  # a fraction and one word at most: "1/2 доли", "легкового автомобиля"
+
+CLASSIFICATION_RULES = (
+    ("llc_shares", re.compile(
+        _DEAL + _NEAR + r"(?:дол\w*|част\w*)\W+(?:\w+\W+){0,2}?(?:уставн\w* капитал|ооо\b)"
+    )),
+    ("real_estate", re.compile(
+        _DEAL + _NEAR + r"(?:недвижим|квартир|жил\w* дом|земельн\w* участ|нежил\w* помещ|комнат[аыу]?\b|гараж)"
+        r"|договор\w* участи\w* в долев\w* строительств|\bдду\b"
+    )),
+    ("vehicles", re.compile(
+        _DEAL + _NEAR + r"(?:автомоб|автомаш|транспортн\w* средств|мотоцикл|прицеп|катер|маломерн\w* суд|\bтс\b)"
+    )),
+    ("securities", re.compile(
+        _DEAL + _NEAR + r"(?:ценн\w* бумаг|акци[йия]\b|облигаци|паев|пиф\b|вексел)"
+    )),
+)
+
+DATE_ALIASES = ("дата", "дата_операции", "дата_проводки", "дата_платежа", "date", "operation_date", "value_date")
+AMOUNT_ALIASES = ("сумма", "сумма_операции", "сумма_в_валюте_счета", "amount")
+DEBIT_ALIASES = ("дебет", "расход", "списание", "debit", "withdrawal")
+CREDIT_ALIASES = ("кредит", "приход", "поступление", "credit", "deposit")
+PURPOSE_ALIASES = (
+    "назначение_платежа", "назначениеплатежа", "назначение", "описание", "описание_операции", "основание",
+    "description", "purpose", "details",
+)
+COUNTERPARTY_ALIASES = ("контрагент", "наименование_контрагента", "counterparty")
+PAYER_ALIASES = ("плательщик1", "плательщик")
+RECIPIENT_ALIASES = ("получатель1", "получатель")
+
+# Transaction.amount is NUMERIC(15, 2)
+MAX_AMOUNT = Decimal("9999999999999.99")
+CENT = Decimal("0.01")
+
+COPY_COLUMNS = ("case_id", "transaction_type", "description", "transaction_date", "amount")
+
+
+def classify(text: str) -> str | None:
+    """Transaction type of a statement line, None if it is not reportable"""
+    text = text.lower().replace("ё", "е")
+    for transaction_type, pattern in CLASSIFICATION_RULES:
+        if pattern.search(text):
+            return transaction_type
+    return None
+
+
+class StatementLine:
+    __slots__ = ("line", "transaction_type", "description", "transaction_date", "amount")
+
+    def __init__(self, line: int, transaction_type: str, description: str, transaction_date: date | None,
+                 amount: Decimal | None):
+        self.line = line
+        self.transaction_type = transaction_type
+        self.description = description
+        self.transaction_date = transaction_date
+        self.amount = amount
+
+
+def _statement_line(number: int, fields: dict) -> StatementLine | None:
+    """Classified line of a record, None if it matches no rule"""
+    purpose = str(pick(fields, PURPOSE_ALIASES) or "").strip()
+    counterparty = pick(fields, COUNTERPARTY_ALIASES)
+    if counterparty is None:
+        payer, recipient = pick(fields, PAYER_ALIASES), pick(fields, RECIPIENT_ALIASES)
+        counterparty = " → ".join(party for party in (payer, recipient) if party) or None
+    description = f"{purpose} ({counterparty})" if purpose and counterparty else purpose or counterparty
+    if not description:
+        raise ImportFormatError("Нет назначения платежа")
+    transaction_type = classify(description)
+    if transaction_type is None:
+        return None
+
+    # Exports often fill the unused debit/credit column with 0,00: take the first non-zero amount
+    amounts = [
+        abs(parse_amount(value, MAX_AMOUNT)).quantize(CENT)
+        for value in (pick(fields, aliases) for aliases in (AMOUNT_ALIASES, DEBIT_ALIASES, CREDIT_ALIASES))
+        if value is not None
+    ]
+    amount = next((value for value in amounts if value), amounts[0] if amounts else None)
+    transaction_date = pick(fields, DATE_ALIASES)
+    transaction_date = parse_date(transaction_date) if transaction_date else None
+    return StatementLine(number, transaction_type, str(description), transaction_date, amount)
+
+
+def iter_statement(file: BinaryIO, filename: str | None = None) -> Iterator[tuple[int, StatementLine | None, str | None]]:
+    """(line number, classified line or None, error or None) per statement record"""
+    statement_format = sniff_format(file, filename)
+    if statement_format == "1c":
+        records = iter_1c_records(file)
+    elif statement_format == "csv":
+        records = iter_csv_records(file)
+    else:
+        raise ImportFormatError("Выписка должна быть в формате CSV или 1С (1CClientBankExchange)")
+    for number, fields in records:
+        try:
+            yield number, _statement_line(number, fields), None
+        except ImportFormatError as e:
+            yield number, None, str(e)
+
+
+class StatementImporter:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def run(self, case_id: int, file: BinaryIO, filename: str | None = None, dry_run: bool = False) -> dict:
+        """
+        Import a statement; returns the counts per transaction type, the
+        number of skipped and duplicate lines and the first
+        MAX_REPORTED_ERRORS errors. Raises ImportFormatError if the file is
+        not a statement.
+        """
+        summary = {"dry_run": dry_run, "imported": 0, "by_type": {}, "skipped": 0, "duplicates": 0, "errors": []}
+        # Reportable transactions of a case number in the hundreds, not the statement's thousands of lines
+        seen = set(map(tuple, (await self.db.execute(
+            select(Transaction.transaction_type, Transaction.transaction_date, Transaction.amount, Transaction.description)
+            .where(Transaction.case_id == case_id)
+        )).all()))
+        records = iter_statement(file, filename)
+        while batch := await asyncio.to_thread(lambda: list(islice(records, IMPORT_BATCH_SIZE))):
+            rows = []
+            for number, line, error in batch:
+                if error is not None:
+                    if len(summary["errors"]) < MAX_REPORTED_ERRORS:
+                        summary["errors"].append({"line": number, "message": error})
+                elif line is None:
+                    summary["skipped"] += 1
+                elif (key := (line.transaction_type, line.transaction_date, line.amount, line.description)) in seen:
+                    summary["duplicates"] += 1
+                else:
+                    seen.add(key)
+                    summary["by_type"][line.transaction_type] = summary["by_type"].get(line.transaction_type, 0) + 1
+                    rows.append(
+                        (case_id, line.transaction_type, line.description, line.transaction_date, line.amount)
+                    )
+            summary["imported"] += len(rows)
+            if rows and not dry_run:
+                await self._write(rows)
+        if summary["imported"] and not dry_run:
+            # COPY and Core inserts bypass the ORM flush that bumps the case
+            await self.db.execute(update(Case).where(Case.id == case_id).values(updated_at=datetime.utcnow()))
+            await self.db.commit()
+        return summary
+
+    async def _write(self, rows: list[tuple]) -> None:
+        if self.db.bind.dialect.name == "postgresql":
+            connection = await (await self.db.connection()).get_raw_connection()
+            await connection.driver_connection.copy_records_to_table(
+                Transaction.__tablename__, records=rows, columns=COPY_COLUMNS
+            )
+        else:
+            await self.db.execute(insert(Transaction), [dict(zip(COPY_COLUMNS, row)) for row in rows])
@@ -0,0 +1,532 @@
+"""
+Object storage for generated case documents.
+
+Backends:
+- LocalStorage: files under a directory (development, single API replica)
+- S3Storage: S3-compatible object store (AWS S3, MinIO, Yandex Object Storage)
+  spoken to over httpx with AWS Signature V4
+- CachedStorage: local LRU disk cache in front of a remote backend
+
+Objects are addressed by "/"-separated keys. Uploads and downloads are
+streamed in chunks, so an object is never held in memory as a whole.
+"""
+import asyncio
+import hashlib
+import hmac
+import os
+import shutil
+import threading
+import xml.etree.ElementTree as ET
+from collections import OrderedDict
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from pathlib import Path
+from typing import AsyncIterator, BinaryIO
+from urllib.parse import quote
+
+import httpx
+
+from config import settings
+
+CHUNK_SIZE = 64 * 1024
+UNSIGNED_PAYLOAD = "UNSIGNED-PAYLOAD"
+EMPTY_PAYLOAD_HASH = hashlib.sha256(b"").hexdigest()
+S3_XML_NS = {"s3": "http://s3.amazonaws.com/doc/2006-03-01/"}
+
+
+class StorageError(Exception):
+    """Storage backend failed to complete an operation"""
+
+
+def _object_info(key: str, size: int, modified_at: datetime) -> dict:
+    return {"key": key, "size_bytes": size, "modified_at": modified_at}
+
+
+def _read_chunks(source: BinaryIO):
+    while True:
+        chunk = source.read(CHUNK_SIZE)
+        if not chunk:
+            break
+        yield chunk
+
+
+async def _iter_file(path: Path) -> AsyncIterator[bytes]:
+    source = open(path, "rb")
+    try:
+        while True:
+            chunk = await asyncio.to_thread(source.read, CHUNK_SIZE)
+            if not chunk:
+                break
+            yield chunk
+    finally:
+        source.close()
+
+
+def _write_atomic(path: Path, source: BinaryIO) -> int:
+    """Copy source into path through a temporary file; returns bytes written"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f".{path.name}.part")
+    with open(tmp_path, "wb") as target:
+        shutil.copyfileobj(source, target, CHUNK_SIZE)
+        size = target.tell()
+    os.replace(tmp_path, path)
+    return size
+
+
+class Storage:
+    """Interface shared by storage backends."""
+
+    async def save(self, key: str, source: BinaryIO, content_type: str | None = None) -> int:
+        """Stream source (from its current position) into key; returns the size"""
+        raise NotImplementedError
+
+    async def open(self, key: str) -> AsyncIterator[bytes]:
+        """Chunks of the object; raises FileNotFoundError if it does not exist"""
+        raise NotImplementedError
+
+    async def stat(self, key: str) -> dict | None:
+        raise NotImplementedError
+
+    async def list(self, prefix: str) -> list[dict]:
+        raise NotImplementedError
+
+    async def delete(self, key: str) -> None:
+        raise NotImplementedError
+
+    def presigned_url(self, key: str, expires_in: int, file_name: str | None = None) -> str | None:
+        """Time-limited URL for downloading key directly, if the backend supports it"""
+        return None
+
+    async def aclose(self) -> None:
+        pass
+
+
+class LocalStorage(Storage):
+    """Objects stored as files under root."""
+
+    def __init__(self, root: Path):
+        self.root = Path(root)
+
+    def _path(self, key: str) -> Path:
+        root = self.root.resolve()
+        path = (root / key).resolve()
+        if path == root or not path.is_relative_to(root):
+            raise ValueError("Invalid storage key")
+        return path
+
+    async def save(self, key: str, source: BinaryIO, content_type: str | None = None) -> int:
+        return await asyncio.to_thread(_write_atomic, self._path(key), source)
+
+    async def open(self, key: str) -> AsyncIterator[bytes]:
+        path = self._path(key)
+        if not path.is_file():
+            raise FileNotFoundError(key)
+        return _iter_file(path)
+
+    def _info(self, path: Path) -> dict:
+        stat = path.stat()
+        key = path.relative_to(self.root.resolve()).as_posix()
+        return _object_info(key, stat.st_size, datetime.fromtimestamp(stat.st_mtime))
+
+    async def stat(self, key: str) -> dict | None:
+        path = self._path(key)
+        if not path.is_file():
+            return None
+        return self._info(path)
+
+    async def list(self, prefix: str) -> list[dict]:
+        directory = self._path(prefix)
+        if not directory.is_dir():
+            return []
+        return [
+            self._info(path)
+            for path in directory.rglob("*")
+            if path.is_file() and not path.name.endswith(".part")
+        ]
+
+    async def delete(self, key: str) -> None:
+        self._path(key).unlink(missing_ok=True)
+
+
+class S3Signer:
+    """AWS Signature Version 4 for S3 requests and presigned URLs."""
+
+    algorithm = "AWS4-HMAC-SHA256"
+
+    def __init__(self, access_key: str, secret_key: str, region: str, service: str = "s3"):
+        self.access_key = access_key
+        self.secret_key = secret_key
+        self.region = region
+        self.service = service
+
+    def _scope(self, now: datetime) -> str:
+        return f"{now:%Y%m%d}/{self.region}/{self.service}/aws4_request"
+
+    def _signature(self, now: datetime, canonical_request: str) -> str:
+        string_to_sign = "\n".join([
+            self.algorithm,
+            f"{now:%Y%m%dT%H%M%SZ}",
+            self._scope(now),
+            hashlib.sha256(canonical_request.encode()).hexdigest(),
+        ])
+        key = f"AWS4{self.secret_key}".encode()
+        for part in (f"{now:%Y%m%d}", self.region, self.service, "aws4_request"):
+            key = hmac.new(key, part.encode(), hashlib.sha256).digest()
+        return hmac.new(key, string_to_sign.encode(), hashlib.sha256).hexdigest()
+
+    @staticmethod
+    def canonical_query(params: dict[str, str]) -> str:
+        return "&".join(
+            f"{quote(k, safe='-_.~')}={quote(str(v), safe='-_.~')}"
+            for k, v in sorted(params.items())
+        )
+
+    def sign_headers(
+        self,
+        method: str,
+        host: str,
+        path: str,
+        params: dict[str, str],
+        headers: dict[str, str],
+        payload_hash: str,
+        now: datetime,
+    ) -> dict[str, str]:
+        """Headers (including Authorization) for a request; path must be URI-encoded"""
+        headers = {k.lower(): str(v).strip() for k, v in headers.items()}
+        headers["host"] = host
+        headers["x-amz-date"] = f"{now:%Y%m%dT%H%M%SZ}"
+        headers["x-amz-content-sha256"] = payload_hash
+        signed_headers = ";".join(sorted(headers))
+        canonical_request = "\n".join([
+            method,
+            path,
+            self.canonical_query(params),
+            "".join(f"{k}:{headers[k]}\n" for k in sorted(headers)),
+            signed_headers,
+            payload_hash,
+        ])
+        headers["authorization"] = (
+            f"{self.algorithm} Credential={self.access_key}/{self._scope(now)}, "
+            f"SignedHeaders={signed_headers}, Signature={self._signature(now, canonical_request)}"
+        )
+        del headers["host"]
+        return headers
+
+    def presign(
+        self,
+        method: str,
+        host: str,
+        path: str,
+        params: dict[str, str],
+        expires_in: int,
+        now: datetime,
+    ) -> str:
+        """Query string of a presigned URL; path must be URI-encoded"""
+        params = {
+            **params,
+            "X-Amz-Algorithm": self.algorithm,
+            "X-Amz-Credential": f"{self.access_key}/{self._scope(now)}",
+            "X-Amz-Date": f"{now:%Y%m%dT%H%M%SZ}",
+            "X-Amz-Expires": str(expires_in),
+            "X-Amz-SignedHeaders": "host",
+        }
+        canonical_request = "\n".join([
+            method,
+            path,
+            self.canonical_query(params),
+            f"host:{host}\n",
+            "host",
+            UNSIGNED_PAYLOAD,
+        ])
+        params["X-Amz-Signature"] = self._signature(now, canonical_request)
+        return self.canonical_query(params)
+
+
+class S3Storage(Storage):
+    """Objects stored in an S3-compatible bucket (path-style addressing)."""
+
+    def __init__(
+        self,
+        endpoint_url: str,
+        bucket: str,
+        access_key: str,
+        secret_key: str,
+        region: str = "us-east-1",
+        transport: httpx.AsyncBaseTransport | None = None,
+        timeout: float = 30.0,
+    ):
+        self.endpoint = httpx.URL(endpoint_url.rstrip("/"))
+        self.bucket = bucket
+        self.signer = S3Signer(access_key, secret_key, region)
+        self._transport = transport
+        self._timeout = timeout
+        self._client: httpx.AsyncClient | None = None
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(transport=self._transport, timeout=self._timeout)
+        return self._client
+
+    @property
+    def host(self) -> str:
+        return self.endpoint.netloc.decode()
+
+    def _path(self, key: str = "") -> str:
+        base = self.endpoint.raw_path.decode().rstrip("/")
+        return f"{base}/{quote(self.bucket, safe='')}/{quote(key, safe='/-_.~')}"
+
+    async def _send(
+        self,
+        method: str,
+        key: str = "",
+        params: dict[str, str] | None = None,
+        headers: dict[str, str] | None = None,
+        content=None,
+        payload_hash: str = EMPTY_PAYLOAD_HASH,
+        stream: bool = False,
+    ) -> httpx.Response:
+        params = params or {}
+        path = self._path(key)
+        signed = self.signer.sign_headers(
+            method, self.host, path, params, headers or {}, payload_hash,
+            datetime.now(timezone.utc),
+        )
+        query = self.signer.canonical_query(params)
+        url = f"{self.endpoint.scheme}://{self.host}{path}" + (f"?{query}" if query else "")
+        request = self.client.build_request(method, url, headers=signed, content=content)
+        try:
+            return await self.client.send(request, stream=stream)
+        except httpx.HTTPError as e:
+            raise StorageError(f"S3 {method} {key} failed: {e}") from e
+
+    @staticmethod
+    def _raise_for_status(response: httpx.Response, action: str) -> None:
+        if response.status_code >= 300:
+            raise StorageError(f"S3 {action} failed with HTTP {response.status_code}")
+
+    async def save(self, key: str, source: BinaryIO, content_type: str | None = None) -> int:
+        start = source.tell()
+        size = source.seek(0, os.SEEK_END) - start
+        source.seek(start)
+
+        async def body():
+            for chunk in _read_chunks(source):
+                yield chunk
+
+        headers = {"content-length": str(size)}
+        if content_type:
+            headers["content-type"] = content_type
+        response = await self._send("PUT", key, headers=headers, content=body(), payload_hash=UNSIGNED_PAYLOAD)
+        self._raise_for_status(response, f"PUT {key}")
+        return size
+
+    async def open(self, key: str) -> AsyncIterator[bytes]:
+        response = await self._send("GET", key, stream=True)
+        if response.status_code == 404:
+            await response.aclose()
+            raise FileNotFoundError(key)
+        if response.status_code >= 300:
+            await response.aclose()
+            self._raise_for_status(response, f"GET {key}")
+
+        async def chunks():
+            try:
+                async for chunk in response.aiter_bytes(CHUNK_SIZE):
+                    yield chunk
+            finally:
+                await response.aclose()
+
+        return chunks()
+
+    async def stat(self, key: str) -> dict | None:
+        response = await self._send("HEAD", key)
+        if response.status_code == 404:
+            return None
+        self._raise_for_status(response, f"HEAD {key}")
+        return _object_info(
+            key,
+            int(response.headers.get("content-length", 0)),
+            parsedate_to_datetime(response.headers["last-modified"]),
+        )
+
+    async def list(self, prefix: str) -> list[dict]:
+        objects = []
+        params = {"list-type": "2", "prefix": prefix.rstrip("/") + "/"}
+        while True:
+            response = await self._send("GET", params=params)
+            self._raise_for_status(response, f"LIST {prefix}")
+            root = ET.fromstring(response.content)
+            for item in root.findall("s3:Contents", S3_XML_NS):
+                objects.append(_object_info(
+                    item.findtext("s3:Key", namespaces=S3_XML_NS),
+                    int(item.findtext("s3:Size", "0", namespaces=S3_XML_NS)),
+                    datetime.fromisoformat(
+                        item.findtext("s3:LastModified", namespaces=S3_XML_NS).replace("Z", "+00:00")
+                    ),
+                ))
+            token = root.findtext("s3:NextContinuationToken", namespaces=S3_XML_NS)
+            if root.findtext("s3:IsTruncated", namespaces=S3_XML_NS) != "true" or not token:
+                return objects
+            params = {**params, "continuation-token": token}
+
+    async def delete(self, key: str) -> None:
+        response = await self._send("DELETE", key)
+        if response.status_code != 404:
+            self._raise_for_status(response, f"DELETE {key}")
+
+    def presigned_url(self, key: str, expires_in: int, file_name: str | None = None) -> str | None:
+        params = {}
+        if file_name:
+            params["response-content-disposition"] = (
+                f"attachment; filename*=UTF-8''{quote(file_name, safe='')}"
+            )
+        path = self._path(key)
+        query = self.signer.presign("GET", self.host, path, params, expires_in, datetime.now(timezone.utc))
+        return f"{self.endpoint.scheme}://{self.host}{path}?{query}"
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+class CachedStorage(Storage):
+    """
+    Remote storage with a local LRU disk cache.
+
+    Writes go through the cache to the remote store; reads are served from
+    the cache when possible, otherwise streamed from the remote store while
+    being copied into the cache. Least recently used files are evicted once
+    the cache exceeds max_bytes.
+    """
+
+    def __init__(self, remote: Storage, cache_dir: Path, max_bytes: int):
+        self.remote = remote
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[str, int] | None = None
+        self._lock = threading.Lock()
+
+    def _cache_path(self, key: str) -> Path:
+        return self.cache_dir / hashlib.sha256(key.encode()).hexdigest()
+
+    @property
+    def entries(self) -> OrderedDict[str, int]:
+        """Cached file names and sizes, least recently used first"""
+        if self._entries is None:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            files = [p for p in self.cache_dir.iterdir() if p.is_file() and not p.name.endswith(".part")]
+            files.sort(key=lambda p: p.stat().st_mtime)
+            self._entries = OrderedDict((p.name, p.stat().st_size) for p in files)
+        return self._entries
+
+    @property
+    def size_bytes(self) -> int:
+        return sum(self.entries.values())
+
+    def _remember(self, path: Path, size: int) -> None:
+        with self._lock:
+            self.entries[path.name] = size
+            self.entries.move_to_end(path.name)
+            total = sum(self.entries.values())
+            while total > self.max_bytes and len(self.entries) > 1:
+                name, evicted = self.entries.popitem(last=False)
+                (self.cache_dir / name).unlink(missing_ok=True)
+                total -= evicted
+
+    def _touch(self, path: Path) -> bool:
+        with self._lock:
+            if path.name not in self.entries or not path.exists():
+                self.entries.pop(path.name, None)
+                return False
+            self.entries.move_to_end(path.name)
+        os.utime(path)
+        return True
+
+    def _forget(self, path: Path) -> None:
+        with self._lock:
+            self.entries.pop(path.name, None)
+        path.unlink(missing_ok=True)
+
+    async def save(self, key: str, source: BinaryIO, content_type: str | None = None) -> int:
+        # Staged under a .part name (ignored by the entries scan) and moved into
+        # the cache only once the remote save succeeded: a failed upload must
+        # not leave a cached copy of an object the bucket does not have
+        path = self._cache_path(key)
+        staged = path.with_name(f"{path.name}.{id(source)}.part")
+        size = await asyncio.to_thread(_write_atomic, staged, source)
+        try:
+            with open(staged, "rb") as cached:
+                await self.remote.save(key, cached, content_type)
+            os.replace(staged, path)
+        finally:
+            staged.unlink(missing_ok=True)
+        self._remember(path, size)
+        return size
+
+    async def open(self, key: str) -> AsyncIterator[bytes]:
+        path = self._cache_path(key)
+        if self._touch(path):
+            return _iter_file(path)
+
+        chunks = await self.remote.open(key)
+        return self._fill(path, chunks)
+
+    async def _fill(self, path: Path, chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f"{path.name}.{id(chunks)}.part")
+        complete = False
+        try:
+            with open(tmp_path, "wb") as target:
+                async for chunk in chunks:
+                    target.write(chunk)
+                    yield chunk
+                size = target.tell()
+            os.replace(tmp_path, path)
+            complete = True
+            self._remember(path, size)
+        finally:
+            if not complete:
+                tmp_path.unlink(missing_ok=True)
+
+    async def stat(self, key: str) -> dict | None:
+        return await self.remote.stat(key)
+
+    async def list(self, prefix: str) -> list[dict]:
+        return await self.remote.list(prefix)
+
+    async def delete(self, key: str) -> None:
+        self._forget(self._cache_path(key))
+        await self.remote.delete(key)
+
+    def presigned_url(self, key: str, expires_in: int, file_name: str | None = None) -> str | None:
+        return self.remote.presigned_url(key, expires_in, file_name)
+
+    async def aclose(self) -> None:
+        await self.remote.aclose()
+
+
+def create_storage() -> Storage:
+    """Storage backend configured by STORAGE_BACKEND"""
+    if settings.STORAGE_BACKEND == "local":
+        return LocalStorage(Path(settings.CASE_DOCUMENTS_DIR))
+    if settings.STORAGE_BACKEND == "s3":
+        remote = S3Storage(
+            settings.S3_ENDPOINT_URL,
+            settings.S3_BUCKET,
+            settings.S3_ACCESS_KEY,
+            settings.S3_SECRET_KEY,
+            settings.S3_REGION,
+        )
+        if settings.STORAGE_CACHE_MAX_MB <= 0:
+            return remote
+        return CachedStorage(
+            remote,
+            Path(settings.STORAGE_CACHE_DIR),
+            settings.STORAGE_CACHE_MAX_MB * 1024 * 1024,
+        )
+    raise ValueError(f"Unknown STORAGE_BACKEND: {settings.STORAGE_BACKEND}")
+
+
+storage = create_storage()
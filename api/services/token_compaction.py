@@ -0,0 +1,46 @@
+"""
+Background compaction of the refresh_tokens table.
+
+Every login and refresh inserts a row and rotation revokes the previous one,
+so without cleanup the table (and its indexes) grows with every session ever
+issued. The job deletes expired tokens and tokens revoked more than
+REFRESH_TOKEN_REVOKED_RETENTION_DAYS ago in small batches; on PostgreSQL an
+advisory lock keeps replicas from compacting concurrently.
+
+scripts/compact_refresh_tokens.py runs the same purge once (e.g. from cron).
+"""
+import asyncio
+import logging
+
+from config import settings
+from database import async_session_maker
+from services.auth_service import auth_service
+
+logger = logging.getLogger(__name__)
+
+
+async def compact_refresh_tokens() -> int:
+    """Run one compaction pass, returns deleted rows"""
+    async with async_session_maker() as db:
+        return await auth_service.purge_refresh_tokens(db)
+
+
+async def run_compaction_loop(interval_seconds: float) -> None:
+    while True:
+        try:
+            deleted = await compact_refresh_tokens()
+            if deleted:
+                logger.info("Purged %d refresh tokens", deleted)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("Refresh token compaction failed")
+        await asyncio.sleep(interval_seconds)
+
+
+def start_compaction() -> asyncio.Task | None:
+    """Start the periodic job, None when disabled in settings"""
+    interval = settings.REFRESH_TOKEN_COMPACTION_INTERVAL_MINUTES
+    if interval <= 0:
+        return None
+    return asyncio.create_task(run_compaction_loop(interval * 60))
@@ -1,10 +1,13 @@
+from typing import Iterable
+
 from fastapi import HTTPException, status
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
 from models.user import User
-from models.case import Case
+from services.principal_cache import Principal
+from models.case import Case, CASE_RELATIONSHIPS
 
 
 class AuthorizationError(HTTPException):
@@ -12,9 +15,14 @@ class AuthorizationError(HTTPException):
         super().__init__(status_code=status.HTTP_403_FORBIDDEN, detail=message)
 
 
+def case_load_options(relationships: Iterable[str] = CASE_RELATIONSHIPS) -> list:
+    """selectinload options for the given Case relationship names."""
+    return [selectinload(getattr(Case, name)) for name in relationships]
+
+
 def check_case_ownership(
     case: Case,
-    current_user: User,
+    current_user: User | Principal,
     allow_admin_override: bool = True
 ) -> None:
     """Validate case ownership or admin override."""
@@ -29,21 +37,18 @@ def check_case_ownership(
 
 async def verify_case_access(
     case_id: int,
-    current_user: User,
+    current_user: User | Principal,
     db: AsyncSession,
-    allow_admin_override: bool = True
+    allow_admin_override: bool = True,
+    relationships: Iterable[str] = CASE_RELATIONSHIPS,
 ) -> Case:
-    """Verify user has access to a case and return it. Raises 404 if not found, 403 if not owner."""
+    """
+    Verify user has access to a case and return it. Raises 404 if not found, 403 if not owner.
+    Only the listed relationships are eager-loaded.
+    """
     result = await db.execute(
         select(Case)
-        .options(
-            selectinload(Case.creditors),
-            selectinload(Case.debts),
-            selectinload(Case.children),
-            selectinload(Case.income_records),
-            selectinload(Case.properties),
-            selectinload(Case.transactions),
-        )
+        .options(*case_load_options(relationships))
         .where(Case.id == case_id)
     )
     case = result.scalar_one_or_none()
@@ -59,7 +64,7 @@ async def verify_case_access(
 
 def filter_user_cases(
     db_query,
-    current_user: User,
+    current_user: User | Principal,
     allow_admin_override: bool = True
 ):
     """Filter query to only show users cases (or all if admin)."""
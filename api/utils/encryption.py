@@ -9,6 +9,7 @@ This module provides:
 import os
 import base64
 import hashlib
+import time
 from typing import Any
 from cryptography.hazmat.primitives.ciphers.aead import AESGCM
 from cryptography.exceptions import InvalidTag
@@ -18,6 +19,9 @@ from sqlalchemy import String, TypeDecorator
 # Encryption key from environment
 _ENCRYPTION_KEY: bytes | None = None
 
+# Called with the duration of every decryption (services.metrics registers one)
+decrypt_observers: list = []
+
 
 def _get_encryption_key() -> bytes:
     """
@@ -91,6 +95,7 @@ def decrypt_value(encrypted: str) -> str:
     if not encrypted:
         return encrypted
 
+    started = time.perf_counter()
     try:
         key = _get_encryption_key()
         aesgcm = AESGCM(key)
@@ -111,6 +116,10 @@ def decrypt_value(encrypted: str) -> str:
         raise ValueError("Decryption failed: invalid key or corrupted data")
     except Exception as e:
         raise ValueError(f"Decryption failed: {str(e)}")
+    finally:
+        elapsed = time.perf_counter() - started
+        for observer in decrypt_observers:
+            observer(elapsed)
 
 
 def is_encrypted(value: str) -> bool:
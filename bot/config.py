@@ -8,6 +8,8 @@ class Settings(BaseSettings):
     API_BASE_URL: str = "http://localhost:8000"
     REDIS_URL: str = "redis://localhost:6379/1"
     API_TOKEN: str | None = None
+    # Minimum seconds between edits of a streamed AI answer (Telegram edit rate limits)
+    AI_STREAM_EDIT_INTERVAL_SECONDS: float = 1.5
 
 
 settings = Settings()
@@ -1,15 +1,58 @@
 from aiogram import Router, F
+from aiogram.exceptions import TelegramAPIError, TelegramRetryAfter
 from aiogram.types import Message
 from aiogram.filters import Command
+from config import settings
 from services.api_client import APIClient
 from exceptions import BotException, AIServiceError
+from html import escape
+from typing import AsyncIterator
 import logging
+import time
 
 logger = logging.getLogger(__name__)
 
 router = Router()
 api = APIClient()
 
+ANSWER_HEADER = "💡 <b>Ответ AI-ассистента:</b>\n\n"
+TELEGRAM_MESSAGE_LIMIT = 4096
+
+
+def format_answer(answer: str, typing: bool = False) -> str:
+    text = escape(answer)
+    limit = TELEGRAM_MESSAGE_LIMIT - len(ANSWER_HEADER) - 2
+    if len(text) > limit:
+        text = text[:limit - 1] + "…"
+    return ANSWER_HEADER + text + (" ▌" if typing else "")
+
+
+async def stream_answer(message: Message, chunks: AsyncIterator[str]) -> str:
+    """
+    Show an answer in `message` while it streams in.
+    Edits are debounced to one per AI_STREAM_EDIT_INTERVAL_SECONDS; the final
+    text is always shown.
+    """
+    answer = ""
+    next_edit_at = time.monotonic() + settings.AI_STREAM_EDIT_INTERVAL_SECONDS / 2
+    async for chunk in chunks:
+        answer += chunk
+        now = time.monotonic()
+        if now < next_edit_at:
+            continue
+        next_edit_at = now + settings.AI_STREAM_EDIT_INTERVAL_SECONDS
+        try:
+            await message.edit_text(format_answer(answer, typing=True), parse_mode="HTML")
+        except TelegramRetryAfter as e:
+            next_edit_at = now + e.retry_after
+        except TelegramAPIError as e:
+            logger.debug(f"Skipped intermediate AI answer edit: {e}")
+
+    if not answer:
+        raise AIServiceError("Empty AI answer")
+    await message.edit_text(format_answer(answer), parse_mode="HTML")
+    return answer
+
 
 @router.message(Command("ai"))
 @router.message(F.text == "💬 Спросить AI")
@@ -32,8 +75,7 @@ async def cmd_ai(message: Message):
     wait_msg = await message.answer("🤔 Думаю...")
 
     try:
-        answer = await api.ask_ai(question)
-        await wait_msg.edit_text(f"💡 <b>Ответ AI-ассистента:</b>\n\n{answer}", parse_mode="HTML")
+        await stream_answer(wait_msg, api.stream_ai(question, message.from_user.id))
     except AIServiceError as e:
         logger.error(f"AI service error: {e}")
         await wait_msg.edit_text(f"❌ {e.user_message}")
@@ -5,6 +5,7 @@ from states.case_states import CreditorManagement
 from keyboards.case_menu import (
     get_creditors_menu,
     get_creditor_selection_keyboard,
+    get_creditor_directory_keyboard,
     get_creditor_edit_menu,
     get_confirm_delete_keyboard,
 )
@@ -83,11 +84,7 @@ async def start_add_creditor(callback: CallbackQuery, state: FSMContext):
     await callback.answer()
 
 
-@router.message(CreditorManagement.add_name)
-async def process_creditor_name(message: Message, state: FSMContext):
-    """Process creditor name and ask for OGRN"""
-    await state.update_data(name=message.text.strip())
-
+async def ask_creditor_ogrn(message: Message, state: FSMContext):
     await message.answer(
         "Введите ОГРН кредитора:\n"
         "<i>(13 цифр, например: 1027700132195)</i>\n\n"
@@ -97,6 +94,55 @@ async def process_creditor_name(message: Message, state: FSMContext):
     await state.set_state(CreditorManagement.add_ogrn)
 
 
+async def ask_creditor_debt_amount(message: Message, state: FSMContext):
+    await message.answer(
+        "Введите сумму задолженности перед этим кредитором в рублях:\n"
+        "<i>Например: 500000</i>\n\n"
+        "Или отправьте <b>0</b> если пока неизвестна",
+        parse_mode="HTML"
+    )
+    await state.set_state(CreditorManagement.add_debt_amount)
+
+
+@router.message(CreditorManagement.add_name)
+async def process_creditor_name(message: Message, state: FSMContext):
+    """Process creditor name: offer matches from the creditor directory, else ask for OGRN"""
+    name = message.text.strip()
+    await state.update_data(name=name, directory_id=None)
+
+    entries = []
+    if len(name) >= 2:
+        try:
+            entries = await api.search_creditor_directory(name)
+        except Exception as e:
+            logger.warning(f"Creditor directory search failed: {e}")
+
+    if not entries:
+        await ask_creditor_ogrn(message, state)
+        return
+
+    data = await state.get_data()
+    await state.update_data(directory_names={str(entry["id"]): entry["name"] for entry in entries})
+    await message.answer(
+        "Найдено в справочнике кредиторов. Выберите — ОГРН, ИНН и адрес заполнятся автоматически:",
+        reply_markup=get_creditor_directory_keyboard(entries, data["case_id"]),
+    )
+    await state.set_state(CreditorManagement.add_directory_choice)
+
+
+@router.callback_query(CreditorManagement.add_directory_choice, F.data.startswith("creditordir:"))
+async def process_creditor_directory_choice(callback: CallbackQuery, state: FSMContext):
+    """Use a directory entry (skips OGRN/INN/address) or continue manually"""
+    choice = callback.data.split(":")[-1]
+    data = await state.get_data()
+    if choice in data.get("directory_names", {}):
+        await state.update_data(directory_id=int(choice), name=data["directory_names"][choice])
+        await ask_creditor_debt_amount(callback.message, state)
+    else:
+        await ask_creditor_ogrn(callback.message, state)
+    await callback.answer()
+
+
 @router.message(CreditorManagement.add_ogrn)
 async def process_creditor_ogrn(message: Message, state: FSMContext):
     """Process OGRN and ask for INN"""
@@ -152,14 +198,7 @@ async def process_creditor_address(message: Message, state: FSMContext):
     """Process address and ask for debt amount"""
     address = message.text.strip()
     await state.update_data(address=None if address == "-" else address)
-
-    await message.answer(
-        "Введите сумму задолженности перед этим кредитором в рублях:\n"
-        "<i>Например: 500000</i>\n\n"
-        "Или отправьте <b>0</b> если пока неизвестна",
-        parse_mode="HTML"
-    )
-    await state.set_state(CreditorManagement.add_debt_amount)
+    await ask_creditor_debt_amount(message, state)
 
 
 @router.message(CreditorManagement.add_debt_amount)
@@ -176,13 +215,20 @@ async def process_creditor_debt_amount(message: Message, state: FSMContext):
 
     # Save creditor via API
     try:
-        creditor_data = {
-            "name": data['name'],
-            "ogrn": data.get('ogrn'),
-            "inn": data.get('inn'),
-            "address": data.get('address'),
-            "debt_amount": debt_amount if debt_amount > 0 else None
-        }
+        if data.get('directory_id'):
+            creditor_data = {
+                "directory_id": data['directory_id'],
+                "name": data['name'],
+                "debt_amount": debt_amount if debt_amount > 0 else None
+            }
+        else:
+            creditor_data = {
+                "name": data['name'],
+                "ogrn": data.get('ogrn'),
+                "inn": data.get('inn'),
+                "address": data.get('address'),
+                "debt_amount": debt_amount if debt_amount > 0 else None
+            }
 
         await api.add_creditor(case_id, creditor_data)
 
@@ -18,13 +18,25 @@ logger = logging.getLogger(__name__)
 router = Router()
 api = APIClient()
 
-# Document type labels in Russian
-DOCUMENT_TYPE_LABELS = {
-    "bankruptcy_petition": "Заявление о банкротстве",
-    "bankruptcy_application": "Простое заявление",
-    "creditor_notification": "Уведомление кредиторов",
-    "court_motion": "Ходатайство в суд",
-}
+def format_document_types_menu(document_types: list[dict]) -> str:
+    """Menu text listing document types available on the API"""
+    lines = [
+        "📄 <b>Генерация документов</b>\n",
+        "Выберите тип документа для генерации:\n",
+    ]
+    for doc in document_types:
+        description = f" — {doc['description']}" if doc.get("description") else ""
+        lines.append(f"<b>{doc['label']}</b>{description}\n")
+    return "\n".join(lines)
+
+
+async def load_document_types(state: FSMContext) -> list[dict]:
+    """Fetch available document types and remember their labels for this dialog"""
+    document_types = await api.get_document_types()
+    await state.update_data(
+        document_type_labels={doc["document_type"]: doc["label"] for doc in document_types}
+    )
+    return document_types
 
 
 @router.message(Command("документы", "documents"))
@@ -32,17 +44,26 @@ DOCUMENT_TYPE_LABELS = {
 async def cmd_documents_menu(message: Message, state: FSMContext):
     """Open the Documents menu"""
     await state.clear()  # Clear any previous state
-    await state.set_state(DocumentGeneration.select_document_type)
 
+    try:
+        document_types = await load_document_types(state)
+    except BotException as e:
+        logger.error(f"Error getting document types: {e}")
+        await message.answer(f"❌ {e.user_message}", reply_markup=get_main_keyboard())
+        return
+
+    if not document_types:
+        await message.answer(
+            "📭 Шаблоны документов пока не настроены.",
+            reply_markup=get_main_keyboard()
+        )
+        return
+
+    await state.set_state(DocumentGeneration.select_document_type)
     await message.answer(
-        "📄 <b>Генерация документов</b>\n\n"
-        "Выберите тип документа для генерации:\n\n"
-        "📜 <b>Заявление о банкротстве</b> — полное заявление со всеми данными\n\n"
-        "📋 <b>Простое заявление</b> — базовый шаблон заявления\n\n"
-        "📨 <b>Уведомление кредиторов</b> — письмо-уведомление для кредиторов\n\n"
-        "⚖️ <b>Ходатайство в суд</b> — ходатайство по делу о банкротстве",
+        format_document_types_menu(document_types),
         parse_mode="HTML",
-        reply_markup=get_document_types_keyboard()
+        reply_markup=get_document_types_keyboard(document_types)
     )
 
 
@@ -60,8 +81,10 @@ async def process_document_type_selection(callback: CallbackQuery, state: FSMCon
         await callback.answer()
         return
 
-    # Check if document type is supported (only petition and application are implemented)
-    if doc_type not in ["bankruptcy_petition", "bankruptcy_application"]:
+    # Only types reported by the API have templates
+    data = await state.get_data()
+    document_type_labels = data.get("document_type_labels", {})
+    if doc_type not in document_type_labels:
         await callback.answer(
             "⚠️ Этот тип документа пока в разработке",
             show_alert=True
@@ -87,7 +110,7 @@ async def process_document_type_selection(callback: CallbackQuery, state: FSMCon
 
         await state.set_state(DocumentGeneration.select_case)
 
-        doc_label = DOCUMENT_TYPE_LABELS.get(doc_type, doc_type)
+        doc_label = document_type_labels[doc_type]
         await callback.message.edit_text(
             f"📄 <b>Выбран документ:</b> {doc_label}\n\n"
             "Выберите дело для генерации документа:",
@@ -111,11 +134,18 @@ async def process_case_selection(callback: CallbackQuery, state: FSMContext):
     if action == "back":
         # Go back to document type selection
         await state.set_state(DocumentGeneration.select_document_type)
+        try:
+            document_types = await load_document_types(state)
+        except BotException as e:
+            logger.error(f"Error getting document types: {e}")
+            await callback.message.answer(f"❌ {e.user_message}", reply_markup=get_main_keyboard())
+            await state.clear()
+            await callback.answer()
+            return
         await callback.message.edit_text(
-            "📄 <b>Генерация документов</b>\n\n"
-            "Выберите тип документа для генерации:",
+            format_document_types_menu(document_types),
             parse_mode="HTML",
-            reply_markup=get_document_types_keyboard()
+            reply_markup=get_document_types_keyboard(document_types)
         )
         await callback.answer()
         return
@@ -149,7 +179,7 @@ async def process_case_selection(callback: CallbackQuery, state: FSMContext):
 
     try:
         # Generate document via API (this also saves it to case folder)
-        doc_info = await api.generate_document(case_id, document_type)
+        doc_info = await api.generate_document(case_id, document_type, callback.from_user.id)
 
         # Download the generated document
         doc_content = await api.download_document(case_id, doc_info["file_name"])
@@ -161,7 +191,7 @@ async def process_case_selection(callback: CallbackQuery, state: FSMContext):
                 filename=doc_info["file_name"]
             )
 
-            doc_label = DOCUMENT_TYPE_LABELS.get(document_type, document_type)
+            doc_label = data.get("document_type_labels", {}).get(document_type, document_type)
             await callback.message.answer_document(
                 document=document,
                 caption=f"✅ <b>{doc_label}</b>\n\n"
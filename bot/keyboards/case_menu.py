@@ -137,6 +137,17 @@ def get_creditor_selection_keyboard(creditors: list, action: str, case_id: int)
     return InlineKeyboardMarkup(inline_keyboard=keyboard)
 
 
+def get_creditor_directory_keyboard(entries: list, case_id: int) -> InlineKeyboardMarkup:
+    """Directory matches for a typed creditor name, plus manual entry"""
+    keyboard = [
+        [InlineKeyboardButton(text=f"🏦 {entry['name'][:40]}", callback_data=f"creditordir:pick:{entry['id']}")]
+        for entry in entries
+    ]
+    keyboard.append([InlineKeyboardButton(text="✍️ Ввести вручную", callback_data="creditordir:manual")])
+    keyboard.append([InlineKeyboardButton(text="❌ Отмена", callback_data=f"creditors:{case_id}:menu")])
+    return InlineKeyboardMarkup(inline_keyboard=keyboard)
+
+
 def get_creditor_edit_menu(creditor_id: int, case_id: int) -> InlineKeyboardMarkup:
     """Menu for editing creditor fields"""
     keyboard = [
@@ -65,30 +65,24 @@ def get_procedure_type_keyboard() -> InlineKeyboardMarkup:
     return keyboard
 
 
-def get_document_types_keyboard() -> InlineKeyboardMarkup:
-    """Keyboard for selecting document type to generate"""
-    keyboard = InlineKeyboardMarkup(
-        inline_keyboard=[
-            [InlineKeyboardButton(
-                text="📜 Заявление о банкротстве",
-                callback_data="doctype:bankruptcy_petition"
-            )],
-            [InlineKeyboardButton(
-                text="📋 Простое заявление",
-                callback_data="doctype:bankruptcy_application"
-            )],
-            [InlineKeyboardButton(
-                text="📨 Уведомление кредиторов",
-                callback_data="doctype:creditor_notification"
-            )],
-            [InlineKeyboardButton(
-                text="⚖️ Ходатайство в суд",
-                callback_data="doctype:court_motion"
-            )],
-            [InlineKeyboardButton(text="❌ Отмена", callback_data="doctype:cancel")],
-        ]
-    )
-    return keyboard
+DOCUMENT_TYPE_EMOJI = {
+    "bankruptcy_petition": "📜",
+    "bankruptcy_application": "📋",
+    "creditor_notification": "📨",
+}
+
+
+def get_document_types_keyboard(document_types: list[dict]) -> InlineKeyboardMarkup:
+    """Keyboard for selecting document type to generate (types come from the API)"""
+    buttons = [
+        [InlineKeyboardButton(
+            text=f"{DOCUMENT_TYPE_EMOJI.get(doc['document_type'], '📄')} {doc['label']}",
+            callback_data=f"doctype:{doc['document_type']}"
+        )]
+        for doc in document_types
+    ]
+    buttons.append([InlineKeyboardButton(text="❌ Отмена", callback_data="doctype:cancel")])
+    return InlineKeyboardMarkup(inline_keyboard=buttons)
 
 
 def get_cases_for_document_keyboard(cases: list[dict]) -> InlineKeyboardMarkup:
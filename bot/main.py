@@ -4,6 +4,7 @@ from aiogram import Bot, Dispatcher
 from aiogram.fsm.storage.redis import RedisStorage
 from redis.asyncio import Redis
 from config import settings
+from services.api_client import bind_telegram_user
 from handlers import (
     start,
     cases,
@@ -36,6 +37,8 @@ async def main():
     storage = RedisStorage(redis=redis)
 
     dp = Dispatcher(storage=storage)
+    # Every API call carries the Telegram user it is made for (per-user rate limits)
+    dp.update.outer_middleware(bind_telegram_user)
 
     # Include routers
     dp.include_router(start.router)
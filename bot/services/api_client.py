@@ -1,5 +1,8 @@
 import httpx
+import json
 import logging
+from contextvars import ContextVar
+from typing import AsyncIterator
 from tenacity import (
     retry,
     stop_after_attempt,
@@ -19,6 +22,20 @@ from exceptions import (
 
 logger = logging.getLogger(__name__)
 
+# Telegram user of the update being handled (set by bind_telegram_user).
+# Sent with every API call: the API rate-limits bot requests per user.
+current_telegram_user_id: ContextVar[int | None] = ContextVar("current_telegram_user_id", default=None)
+
+
+async def bind_telegram_user(handler, event, data):
+    """Dispatcher outer middleware: API calls made while handling an update carry its user"""
+    user = data.get("event_from_user")
+    token = current_telegram_user_id.set(user.id if user else None)
+    try:
+        return await handler(event, data)
+    finally:
+        current_telegram_user_id.reset(token)
+
 
 class APIClient:
     def __init__(self):
@@ -202,13 +219,13 @@ class APIClient:
         retry=retry_if_exception_type((httpx.TimeoutException, httpx.NetworkError)),
         before_sleep=before_sleep_log(logger, logging.WARNING),
     )
-    async def ask_ai(self, question: str) -> str:
+    async def ask_ai(self, question: str, telegram_user_id: int | None = None) -> str:
         """Ask AI assistant"""
         try:
             async with httpx.AsyncClient(timeout=60.0) as client:
                 response = await client.post(
                     f"{self.base_url}/api/ai/ask",
-                    headers=self._headers,
+                    headers=self._user_headers(telegram_user_id),
                     json={"question": question},
                 )
                 result = self._handle_response(response)
@@ -223,8 +240,65 @@ class APIClient:
             logger.error("Invalid AI response format")
             raise AIServiceError("Invalid response from AI service")
 
+    async def stream_ai(self, question: str, telegram_user_id: int | None = None) -> AsyncIterator[str]:
+        """Ask AI assistant, yielding answer chunks as the API streams them (SSE)"""
+        try:
+            async with httpx.AsyncClient(timeout=60.0) as client:
+                async with client.stream(
+                    "POST",
+                    f"{self.base_url}/api/ai/ask/stream",
+                    headers=self._user_headers(telegram_user_id),
+                    json={"question": question},
+                ) as response:
+                    if response.status_code != 200:
+                        await response.aread()
+                        self._handle_response(response)
+                    event = None
+                    async for line in response.aiter_lines():
+                        if line.startswith("event:"):
+                            event = line[6:].strip()
+                        elif line.startswith("data:"):
+                            data = json.loads(line[5:])
+                            if event == "error":
+                                raise AIServiceError(data.get("detail", "AI stream error"))
+                            if event == "done":
+                                return
+                            if data.get("delta"):
+                                yield data["delta"]
+                        elif not line:
+                            event = None
+        except httpx.TimeoutException:
+            logger.error("Timeout streaming AI answer")
+            raise AIServiceError("AI service timeout")
+        except httpx.NetworkError as e:
+            logger.error(f"Network error streaming AI answer: {e}")
+            raise AIServiceError(f"Network error: {str(e)}")
+
     # ==================== CREDITORS ====================
 
+    @retry(
+        stop=stop_after_attempt(3),
+        wait=wait_exponential(multiplier=1, min=2, max=10),
+        retry=retry_if_exception_type((httpx.TimeoutException, httpx.NetworkError)),
+        before_sleep=before_sleep_log(logger, logging.WARNING),
+    )
+    async def search_creditor_directory(self, query: str, limit: int = 5) -> list:
+        """Shared creditor directory entries matching a name, OGRN or INN"""
+        try:
+            async with httpx.AsyncClient(timeout=10.0) as client:
+                response = await client.get(
+                    f"{self.base_url}/api/creditor-directory",
+                    params={"q": query, "limit": limit},
+                    headers=self._headers,
+                )
+                return self._handle_response(response)
+        except httpx.TimeoutException:
+            logger.error("Timeout searching creditor directory")
+            raise APITimeoutError("Timeout searching creditor directory")
+        except httpx.NetworkError as e:
+            logger.error(f"Network error searching creditor directory: {e}")
+            raise APIError(f"Network error: {str(e)}")
+
     @retry(
         stop=stop_after_attempt(3),
         wait=wait_exponential(multiplier=1, min=2, max=10),
@@ -913,13 +987,15 @@ class APIClient:
         retry=retry_if_exception_type((httpx.TimeoutException, httpx.NetworkError)),
         before_sleep=before_sleep_log(logger, logging.WARNING),
     )
-    async def generate_document(self, case_id: int, document_type: str) -> dict:
+    async def generate_document(
+        self, case_id: int, document_type: str, telegram_user_id: int | None = None
+    ) -> dict:
         """Generate a document for a case"""
         try:
             async with httpx.AsyncClient(timeout=60.0) as client:
                 response = await client.post(
                     f"{self.base_url}/api/documents/cases/{case_id}/generate",
-                    headers=self._headers,
+                    headers=self._user_headers(telegram_user_id),
                     json={"document_type": document_type}
                 )
                 return self._handle_response(response)
@@ -972,7 +1048,12 @@ class APIClient:
 
     @property
     def _headers(self) -> dict:
-        """Attach API token when configured."""
-        if self.api_token:
-            return {"X-API-Token": self.api_token}
-        return {}
+        """API token (when configured) and the Telegram user the API rate-limits by."""
+        return self._user_headers(current_telegram_user_id.get())
+
+    def _user_headers(self, telegram_user_id: int | None) -> dict:
+        """API token headers for an explicit Telegram user."""
+        headers = {"X-API-Token": self.api_token} if self.api_token else {}
+        if telegram_user_id is not None:
+            headers["X-Telegram-User-Id"] = str(telegram_user_id)
+        return headers
@@ -44,6 +44,7 @@ class CreditorManagement(StatesGroup):
 
     # Adding new creditor
     add_name = State()
+    add_directory_choice = State()
     add_ogrn = State()
     add_inn = State()
     add_address = State()
@@ -0,0 +1,5 @@
+#!/bin/sh
+# Runs once on a fresh primary (docker-entrypoint-initdb.d):
+# allow streaming replication connections for the application user.
+set -e
+echo "host replication ${POSTGRES_USER} all scram-sha-256" >> "$PGDATA/pg_hba.conf"
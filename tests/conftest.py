@@ -1,10 +1,22 @@
 import pytest
+import pytest_asyncio
 import asyncio
+from datetime import date
+from decimal import Decimal
+from types import SimpleNamespace
+from sqlalchemy import event
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
-from sqlalchemy.pool import NullPool
+from sqlalchemy.pool import StaticPool
+from fastapi import Request
 from httpx import AsyncClient, ASGITransport
-from api.main import app
-from api.database import Base, get_db
+from config import settings
+import security
+from main import app
+from database import Base, WRITER_KEY, caller_key, get_db
+from models import User
+from services.auth_service import auth_service
+from services.principal_cache import PrincipalCache
+from query_counter import QueryCounter
 
 # Test database URL (use in-memory SQLite for tests)
 TEST_DATABASE_URL = "sqlite+aiosqlite:///:memory:"
@@ -18,18 +30,25 @@ def event_loop():
     loop.close()
 
 
-@pytest.fixture(scope="function")
-async def test_db():
-    """Create test database"""
-    engine = create_async_engine(TEST_DATABASE_URL, poolclass=NullPool)
+@pytest_asyncio.fixture(scope="function")
+async def test_engine():
+    """In-memory database; StaticPool keeps the single connection (and its data) alive"""
+    engine = create_async_engine(TEST_DATABASE_URL, poolclass=StaticPool)
+    sequences: dict[str, int] = {}
+
+    def nextval(name: str) -> int:
+        sequences[name] = sequences.get(name, 0) + 1
+        return sequences[name]
+
+    @event.listens_for(engine.sync_engine, "connect")
+    def add_sequence_function(dbapi_connection, connection_record):
+        # PostgreSQL sequences (case_number_seq) are created by migrations, not create_all
+        dbapi_connection.create_function("nextval", 1, nextval)
 
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
 
-    async_session = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
-
-    async with async_session() as session:
-        yield session
+    yield engine
 
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.drop_all)
@@ -37,17 +56,108 @@ async def test_db():
     await engine.dispose()
 
 
-@pytest.fixture(scope="function")
-async def client(test_db):
-    """Create test client"""
+@pytest_asyncio.fixture(scope="function")
+async def test_db(test_engine):
+    """Create test database"""
+    async_session = async_sessionmaker(test_engine, class_=AsyncSession, expire_on_commit=False)
+
+    async with async_session() as session:
+        yield session
 
-    async def override_get_db():
+
+@pytest.fixture(scope="function")
+def query_counter(test_engine):
+    """
+    Statements run against the test database.
+
+    Usage:
+        with query_counter.budget(4):
+            response = await client.get(f"/api/cases/{case_id}")
+    """
+    counter = QueryCounter(test_engine)
+    yield counter
+    counter.remove()
+
+
+@pytest_asyncio.fixture(scope="function")
+async def test_user(test_db):
+    """Regular user owning the cases created in API tests"""
+    user = User(email="test@example.com", full_name="Тестовый Пользователь", password_hash="-", role="user")
+    test_db.add(user)
+    await test_db.commit()
+    return user
+
+
+@pytest_asyncio.fixture(scope="function")
+async def client(test_db, test_user, monkeypatch):
+    """Create test client (authenticated as test_user)"""
+    monkeypatch.setattr(settings, "RATE_LIMIT_ENABLED", False)
+    # No Redis in tests; a fresh in-process principal cache per test keeps query counts stable
+    monkeypatch.setattr(security, "principal_cache", PrincipalCache(None, ttl=0, local_ttl=0))
+    token = auth_service.create_access_token(test_user.id, test_user.email, test_user.role)
+
+    async def override_get_db(request: Request):
+        test_db.info[WRITER_KEY] = caller_key(request)
         yield test_db
 
     app.dependency_overrides[get_db] = override_get_db
 
     transport = ASGITransport(app=app)
-    async with AsyncClient(transport=transport, base_url="http://test") as ac:
+    async with AsyncClient(
+        transport=transport, base_url="http://test", headers={"Authorization": f"Bearer {token}"}
+    ) as ac:
         yield ac
 
     app.dependency_overrides.clear()
+
+
+@pytest.fixture
+def document_case():
+    """In-memory case aggregate for document context tests"""
+    return SimpleNamespace(
+        case_number="BP-2026-0001",
+        full_name="Иванов Иван Иванович",
+        court_name=None,
+        court_address=None,
+        birth_date=date(1985, 6, 20),
+        passport_series=None,
+        passport_number=None,
+        passport_issued_by=None,
+        passport_issued_date=None,
+        passport_code=None,
+        registration_address=None,
+        inn=None,
+        snils=None,
+        phone=None,
+        gender="M",
+        total_debt=Decimal("1500.10"),
+        sro_name=None,
+        procedure_type=None,
+        ip_certificate_number=None,
+        ip_certificate_date=None,
+        marital_status="single",
+        spouse_name=None,
+        marriage_certificate_number=None,
+        marriage_certificate_date=None,
+        divorce_certificate_number=None,
+        divorce_certificate_date=None,
+        is_employed=False,
+        is_self_employed=False,
+        has_real_estate=False,
+        has_movable_property=False,
+        insolvency_grounds=None,
+        restructuring_duration=None,
+        creditors=[],
+        debts=[],
+        children=[],
+        income_records=[],
+        properties=[],
+        transactions=[
+            SimpleNamespace(
+                transaction_type="vehicles",
+                description="Продажа автомобиля",
+                transaction_date=date(2024, 8, 26),
+                amount=Decimal("10000"),
+            )
+        ],
+    )
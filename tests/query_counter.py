@@ -0,0 +1,58 @@
+"""
+SQL statement counting for tests: query budgets and N+1 detection.
+
+    with query_counter.budget(3):
+        response = await client.get(f"/api/cases/{case_id}")
+
+fails if the block runs more than 3 statements or runs the same statement
+with the same parameters twice (a redundant reload or an N+1 loop), and
+lists the statements in the failure message.
+"""
+from collections import Counter
+from contextlib import contextmanager
+
+from sqlalchemy import event
+
+
+class QueryCounter:
+    """Records statements executed on an engine while attached."""
+
+    def __init__(self, engine):
+        self.engine = getattr(engine, "sync_engine", engine)
+        self.statements: list[tuple[str, str]] = []
+        event.listen(self.engine, "before_cursor_execute", self._record)
+
+    def _record(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append((" ".join(statement.split()), repr(parameters)))
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+    def reset(self) -> None:
+        self.statements.clear()
+
+    def duplicates(self) -> dict[tuple[str, str], int]:
+        """Identical (statement, parameters) pairs executed more than once"""
+        return {key: n for key, n in Counter(self.statements).items() if n > 1}
+
+    def report(self) -> str:
+        lines = [f"{self.count} statements:"]
+        lines += [f"  {i}. {sql}  {params}" for i, (sql, params) in enumerate(self.statements, 1)]
+        duplicates = self.duplicates()
+        if duplicates:
+            lines.append("Repeated:")
+            lines += [f"  {n}x {sql}  {params}" for (sql, params), n in duplicates.items()]
+        return "\n".join(lines)
+
+    @contextmanager
+    def budget(self, max_queries: int, allow_duplicates: bool = False):
+        """Assert the block stays within max_queries statements (and repeats none)"""
+        self.reset()
+        yield self
+        assert self.count <= max_queries, f"Query budget {max_queries} exceeded\n{self.report()}"
+        if not allow_duplicates:
+            assert not self.duplicates(), f"Duplicate statements\n{self.report()}"
+
+    def remove(self) -> None:
+        event.remove(self.engine, "before_cursor_execute", self._record)
@@ -0,0 +1,76 @@
+import asyncio
+
+import pytest
+
+from services.ai_cache import AIAnswerCache, normalize_question
+
+
+class SlowProvider:
+    def __init__(self, answer="Ответ", fail=False):
+        self.answer = answer
+        self.fail = fail
+        self.calls = 0
+
+    async def __call__(self, question):
+        self.calls += 1
+        await asyncio.sleep(0.01)
+        if self.fail:
+            raise RuntimeError("provider down")
+        return f"{self.answer}: {question}"
+
+
+def test_normalize_question():
+    assert normalize_question("  Что такое  реструктуризация долгов?! ") == "что такое реструктуризация долгов"
+    assert normalize_question("Ещё вопрос") == normalize_question("еще ВОПРОС")
+
+
+@pytest.mark.asyncio
+async def test_normalized_question_served_from_cache():
+    cache = AIAnswerCache(max_entries=10, ttl=60)
+    provider = SlowProvider()
+
+    first = await cache.get_or_ask("Кто такой финансовый управляющий?", provider)
+    second = await cache.get_or_ask("кто такой финансовый управляющий", provider)
+
+    assert first == second
+    assert provider.calls == 1
+    assert cache.stats()["hits"] == 1
+
+
+@pytest.mark.asyncio
+async def test_identical_in_flight_questions_coalesced():
+    cache = AIAnswerCache(max_entries=10, ttl=60)
+    provider = SlowProvider()
+
+    answers = await asyncio.gather(*(cache.get_or_ask("Вопрос", provider) for _ in range(5)))
+
+    assert len(set(answers)) == 1
+    assert provider.calls == 1
+    assert cache.stats()["coalesced"] == 4
+
+
+@pytest.mark.asyncio
+async def test_failures_not_cached_and_lru_eviction():
+    cache = AIAnswerCache(max_entries=2, ttl=60)
+    with pytest.raises(RuntimeError):
+        await cache.get_or_ask("Вопрос", SlowProvider(fail=True))
+
+    provider = SlowProvider()
+    for question in ("Вопрос", "Другой", "Третий"):
+        await cache.get_or_ask(question, provider)
+    await cache.get_or_ask("Вопрос", provider)
+
+    assert provider.calls == 4  # "Вопрос" was evicted by "Третий"
+
+
+@pytest.mark.asyncio
+async def test_similarity_lookup_is_optional():
+    provider = SlowProvider()
+    strict = AIAnswerCache(max_entries=10, ttl=60)
+    similar = AIAnswerCache(max_entries=10, ttl=60, similarity_threshold=0.8)
+    for cache in (strict, similar):
+        await cache.get_or_ask("Какие документы нужны для банкротства", provider)
+        await cache.get_or_ask("Какие документы нужны для банкротства физлица", provider)
+
+    assert provider.calls == 3
+    assert similar.stats()["similar_hits"] == 1
@@ -0,0 +1,76 @@
+from datetime import datetime
+
+import pytest
+import pytest_asyncio
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from database import Base
+from models import Case, Creditor
+from scripts.create_test_case import CASE_FIELDS, build_test_case
+from services.ai_case_context import (
+    build_case_summary,
+    case_context_cache,
+    estimate_tokens,
+    get_case_context,
+)
+from services.principal_cache import Principal
+
+
+def test_summary_is_compact_and_free_of_pii():
+    case = build_test_case("BP-AI-0001", creditors=50, children=3, transactions=20)
+    summary = build_case_summary(case, max_tokens=600)
+
+    assert "Общий долг" in summary and "кредиторов: 50" in summary
+    for field in ("full_name", "passport_number", "registration_address", "phone", "email", "inn", "snils"):
+        assert str(CASE_FIELDS[field]) not in summary
+    for creditor in case.creditors:
+        assert creditor.contract_number not in summary
+    assert estimate_tokens(summary) <= 600
+
+
+def test_summary_lists_missing_fields_and_respects_budget():
+    case = build_test_case("BP-AI-0002")
+    case.snils = None
+    case.court_name = None
+    missing_line = next(line for line in build_case_summary(case).splitlines() if line.startswith("Не заполнено"))
+    assert "СНИЛС" in missing_line and "наименование суда" in missing_line
+
+    short = build_case_summary(case, max_tokens=60)
+    assert estimate_tokens(short) <= 60
+    assert short.startswith("Процедура:") and short.endswith("(сведения сокращены)")
+
+
+@pytest_asyncio.fixture
+async def db():
+    engine = create_async_engine("sqlite+aiosqlite://")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    async with async_sessionmaker(engine, expire_on_commit=False)() as session:
+        yield session
+    await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_context_cached_until_case_or_child_rows_change(db):
+    case_context_cache.clear()
+    case = build_test_case("BP-AI-0003", creditors=2, children=0, transactions=0)
+    case.owner_id = None
+    case.updated_at = datetime(2024, 1, 1)
+    db.add(case)
+    await db.commit()
+    admin = Principal(1, "admin", True)
+
+    first = await get_case_context(db, case.id, admin)
+    assert await get_case_context(db, case.id, admin) == first
+    assert case_context_cache.stats()["hits"] == 1
+
+    # Adding a creditor bumps Case.updated_at, so the summary is rebuilt
+    db.add(Creditor(case_id=case.id, name="ООО Новый", creditor_type="bank", debt_amount=1000))
+    await db.commit()
+    updated = await get_case_context(db, case.id, admin)
+    assert "кредиторов: 3" in updated
+    assert case.updated_at > datetime(2024, 1, 1)
+
+    with pytest.raises(Exception) as error:
+        await get_case_context(db, case.id, Principal(2, "user", True))
+    assert error.value.status_code == 403
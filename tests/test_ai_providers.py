@@ -0,0 +1,103 @@
+import asyncio
+import json
+import time
+
+import httpx
+import pytest
+
+from services.ai_service import AIProviderError, AIProviderRouter, TimewebProvider, YandexGPTProvider
+
+
+class FakeProviderServer:
+    """In-process fake of a vendor API: configurable delay, failures and streaming"""
+
+    def __init__(self, answer, delay=0.0, status=200):
+        self.answer = answer
+        self.delay = delay
+        self.status = status
+        self.requests = 0
+
+    async def __call__(self, request: httpx.Request) -> httpx.Response:
+        self.requests += 1
+        await asyncio.sleep(self.delay)
+        if self.status != 200:
+            return httpx.Response(self.status, json={"error": "unavailable"})
+        return self.respond(json.loads(request.content))
+
+    def transport(self):
+        return httpx.MockTransport(self)
+
+
+class FakeTimeweb(FakeProviderServer):
+    def respond(self, payload):
+        if payload["stream"]:
+            lines = [f"data: {json.dumps({'choices': [{'delta': {'content': word}}]})}\n\n"
+                     for word in self.answer.split(" ")]
+            return httpx.Response(200, text="".join(lines) + "data: [DONE]\n\n")
+        return httpx.Response(200, json={"choices": [{"message": {"content": self.answer}}]})
+
+
+class FakeYandex(FakeProviderServer):
+    def respond(self, payload):
+        if payload["completionOptions"]["stream"]:
+            words = self.answer.split(" ")
+            lines = [json.dumps({"result": {"alternatives": [{"message": {"text": " ".join(words[:i + 1])}}]}})
+                     for i in range(len(words))]
+            return httpx.Response(200, text="\n".join(lines))
+        return httpx.Response(200, json={"result": {"alternatives": [{"message": {"text": self.answer}}]}})
+
+
+def make_router(timeweb, yandex, **options):
+    providers = [
+        TimewebProvider(api_key="k", api_url="http://timeweb.test/v1", transport=timeweb.transport()),
+        YandexGPTProvider(api_key="k", folder_id="f", api_url="http://yandex.test/", transport=yandex.transport()),
+    ]
+    options.setdefault("timeout", 1.0)
+    options.setdefault("first_token_timeout", 1.0)
+    return AIProviderRouter(providers, **options)
+
+
+@pytest.mark.asyncio
+async def test_providers_parse_answers_and_streams():
+    router = make_router(FakeTimeweb("ответ один"), FakeYandex("ответ два три"))
+    timeweb, yandex = router.providers
+
+    assert await timeweb.ask("?") == "ответ один"
+    assert [c async for c in timeweb.stream("?")] == ["ответ", "один"]
+    assert await yandex.ask("?") == "ответ два три"
+    assert "".join([c async for c in yandex.stream("?")]) == "ответ два три"
+    await router.aclose()
+
+
+@pytest.mark.asyncio
+async def test_fails_over_on_error_and_timeout():
+    broken = make_router(FakeTimeweb("", status=500), FakeYandex("из Яндекса"))
+    assert await broken.ask("?") == "из Яндекса"
+    assert broken.stats()["providers"]["timeweb"]["failures"] == 1
+
+    slow = make_router(FakeTimeweb("поздно", delay=1.0), FakeYandex("вовремя"), timeout=0.05)
+    assert await slow.ask("?") == "вовремя"
+    assert slow.failovers == 1
+
+    down = make_router(FakeTimeweb("", status=500), FakeYandex("", status=503))
+    with pytest.raises(AIProviderError):
+        await down.ask("?")
+
+
+@pytest.mark.asyncio
+async def test_hedged_request_cuts_tail_latency():
+    timeweb = FakeTimeweb("медленно", delay=0.5)
+    router = make_router(timeweb, FakeYandex("быстро"), hedge=True, hedge_min_delay=0.05)
+
+    started = time.perf_counter()
+    assert await router.ask("?") == "быстро"
+    assert time.perf_counter() - started < 0.3
+    assert router.hedged == 1 and timeweb.requests == 1
+
+
+@pytest.mark.asyncio
+async def test_stream_fails_over_before_first_chunk():
+    router = make_router(FakeTimeweb("", delay=0.5), FakeYandex("потоковый ответ"), first_token_timeout=0.05)
+
+    assert "".join([c async for c in router.stream("?")]) == "потоковый ответ"
+    assert router.failovers == 1
@@ -0,0 +1,67 @@
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+import routers.ai as ai_router
+from security import get_user_or_api_token
+from services.ai_cache import ai_answer_cache
+from services.ai_service import AIProvider
+
+
+class ChunkedProvider(AIProvider):
+    def __init__(self, chunks, fail=False):
+        self.chunks = chunks
+        self.fail = fail
+        self.calls = 0
+
+    async def ask(self, question):
+        return "".join(self.chunks)
+
+    async def stream(self, question):
+        self.calls += 1
+        for chunk in self.chunks:
+            yield chunk
+        if self.fail:
+            raise RuntimeError("provider down")
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(main.settings, "RATE_LIMIT_ENABLED", False)
+    main.app.dependency_overrides[get_user_or_api_token] = lambda: None
+    ai_answer_cache.clear()
+    yield TestClient(main.app)
+    main.app.dependency_overrides.clear()
+    ai_answer_cache.clear()
+
+
+def stream_events(client, question):
+    response = client.post("/api/ai/ask/stream", json={"question": question})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    return response.text.split("\n\n")
+
+
+def test_stream_sends_deltas_then_caches_answer(client, monkeypatch):
+    provider = ChunkedProvider(["Реструк", "туризация ", "долгов"])
+    monkeypatch.setattr(ai_router, "get_ai_provider", lambda: provider)
+
+    events = stream_events(client, "Что такое реструктуризация?")
+    assert events[:3] == [
+        'data: {"delta": "Реструк"}',
+        'data: {"delta": "туризация "}',
+        'data: {"delta": "долгов"}',
+    ]
+    assert events[3] == 'event: done\ndata: {"cached": false}'
+
+    events = stream_events(client, "что такое реструктуризация")
+    assert events[0] == 'data: {"delta": "Реструктуризация долгов"}'
+    assert provider.calls == 1
+
+
+def test_stream_reports_provider_error(client, monkeypatch):
+    monkeypatch.setattr(ai_router, "get_ai_provider", lambda: ChunkedProvider(["Начало"], fail=True))
+
+    events = stream_events(client, "Вопрос")
+    assert events[1].startswith("event: error")
+    assert ai_answer_cache.get("Вопрос") is None
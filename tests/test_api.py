@@ -1,5 +1,8 @@
 import pytest
 from httpx import AsyncClient
+from sqlalchemy import select
+from models import Creditor
+from services.statement_import import classify
 
 
 @pytest.mark.asyncio
@@ -22,7 +25,7 @@ async def test_health(client: AsyncClient):
 
 
 @pytest.mark.asyncio
-async def test_create_case(client: AsyncClient):
+async def test_create_case(client: AsyncClient, query_counter):
     """Test case creation"""
     case_data = {
         "full_name": "Иванов Иван Иванович",
@@ -30,7 +33,9 @@ async def test_create_case(client: AsyncClient):
         "telegram_user_id": 12345678,
     }
 
-    response = await client.post("/api/cases", json=case_data)
+    # create() refreshes and then reloads the case: duplicate SELECT of the row
+    with query_counter.budget(11, allow_duplicates=True):
+        response = await client.post("/api/cases", json=case_data)
     assert response.status_code == 201
 
     data = response.json()
@@ -41,26 +46,28 @@ async def test_create_case(client: AsyncClient):
 
 
 @pytest.mark.asyncio
-async def test_get_cases(client: AsyncClient):
+async def test_get_cases(client: AsyncClient, query_counter):
     """Test getting list of cases"""
-    # Create test case first
-    case_data = {
-        "full_name": "Петров Петр Петрович",
-        "total_debt": 300000.00,
-    }
-    await client.post("/api/cases", json=case_data)
-
-    # Get all cases
-    response = await client.get("/api/cases")
+    # Create test cases first
+    for i in range(5):
+        case_data = {
+            "full_name": f"Петров Петр Петрович {i}",
+            "total_debt": 300000.00,
+        }
+        await client.post("/api/cases", json=case_data)
+
+    # Get all cases: user, cases, creditors, debts - independent of the number of cases
+    with query_counter.budget(4):
+        response = await client.get("/api/cases")
     assert response.status_code == 200
 
     data = response.json()
     assert isinstance(data, list)
-    assert len(data) > 0
+    assert len(data) == 5
 
 
 @pytest.mark.asyncio
-async def test_get_case_by_id(client: AsyncClient):
+async def test_get_case_by_id(client: AsyncClient, query_counter):
     """Test getting case by ID"""
     # Create test case
     case_data = {
@@ -70,8 +77,9 @@ async def test_get_case_by_id(client: AsyncClient):
     create_response = await client.post("/api/cases", json=case_data)
     case_id = create_response.json()["id"]
 
-    # Get case by ID
-    response = await client.get(f"/api/cases/{case_id}")
+    # Get case by ID: user, case and one query per relationship
+    with query_counter.budget(8):
+        response = await client.get(f"/api/cases/{case_id}")
     assert response.status_code == 200
 
     data = response.json()
@@ -80,7 +88,7 @@ async def test_get_case_by_id(client: AsyncClient):
 
 
 @pytest.mark.asyncio
-async def test_get_case_public(client: AsyncClient):
+async def test_get_case_public(client: AsyncClient, query_counter):
     """Test getting public case data"""
     # Create test case with confidential data
     case_data = {"full_name": "Федоров Федор Федорович", "total_debt": 400000.00}
@@ -96,7 +104,8 @@ async def test_get_case_public(client: AsyncClient):
     await client.put(f"/api/cases/{case_id}", json=update_data)
 
     # Get public data (should not include passport, INN)
-    response = await client.get(f"/api/cases/{case_id}/public")
+    with query_counter.budget(8):
+        response = await client.get(f"/api/cases/{case_id}/public")
     assert response.status_code == 200
 
     data = response.json()
@@ -107,7 +116,7 @@ async def test_get_case_public(client: AsyncClient):
 
 
 @pytest.mark.asyncio
-async def test_update_case(client: AsyncClient):
+async def test_update_case(client: AsyncClient, query_counter):
     """Test updating case"""
     # Create test case
     case_data = {"full_name": "Александров Александр Александрович", "total_debt": 600000.00}
@@ -120,7 +129,9 @@ async def test_update_case(client: AsyncClient):
         "phone": "+79001234567",
         "email": "test@example.com",
     }
-    response = await client.put(f"/api/cases/{case_id}", json=update_data)
+    # user, UPDATE ... RETURNING, creditors, debts
+    with query_counter.budget(4):
+        response = await client.put(f"/api/cases/{case_id}", json=update_data)
     assert response.status_code == 200
 
     data = response.json()
@@ -130,15 +141,50 @@ async def test_update_case(client: AsyncClient):
 
 
 @pytest.mark.asyncio
-async def test_delete_case(client: AsyncClient):
+async def test_patch_updates_only_sent_fields(client: AsyncClient, query_counter):
+    """PATCH is a single UPDATE of the sent columns"""
+    create_response = await client.post("/api/cases", json={"full_name": "Егоров Егор", "total_debt": 1})
+    case_id = create_response.json()["id"]
+    await client.patch(f"/api/cases/{case_id}/client-data", json={"inn": "123456789012"})
+
+    with query_counter.budget(4):
+        response = await client.patch(f"/api/cases/{case_id}/family-data", json={"marital_status": "married"})
+    assert response.status_code == 200
+    assert response.json()["marital_status"] == "married"
+    assert response.json()["inn"] == "123456789012"
+    update = next(sql for sql, _ in query_counter.statements if sql.startswith("UPDATE"))
+    assert update.startswith(
+        "UPDATE cases SET updated_at=?, marital_status=? WHERE cases.id = ? AND cases.owner_id = ? RETURNING"
+    )
+
+
+@pytest.mark.asyncio
+async def test_patch_other_users_case(client: AsyncClient, test_db):
+    """Ownership is enforced by the UPDATE itself"""
+    from models import Case
+
+    test_db.add(Case(case_number="BP-2026-9999", full_name="Чужое дело", owner_id=None))
+    await test_db.commit()
+    case_id = (await test_db.execute(select(Case.id).where(Case.case_number == "BP-2026-9999"))).scalar_one()
+
+    response = await client.patch(f"/api/cases/{case_id}/court-data", json={"court_name": "АС г. Москвы"})
+    assert response.status_code == 403
+    assert (await client.patch("/api/cases/999999/court-data", json={"court_name": "x"})).status_code == 404
+    test_db.expire_all()
+    assert (await test_db.get(Case, case_id)).court_name is None
+
+
+@pytest.mark.asyncio
+async def test_delete_case(client: AsyncClient, query_counter):
     """Test deleting case"""
     # Create test case
     case_data = {"full_name": "Николаев Николай Николаевич", "total_debt": 200000.00}
     create_response = await client.post("/api/cases", json=case_data)
     case_id = create_response.json()["id"]
 
-    # Delete case
-    response = await client.delete(f"/api/cases/{case_id}")
+    # Delete case: the access check and CaseService.delete() both load the aggregate
+    with query_counter.budget(18, allow_duplicates=True):
+        response = await client.delete(f"/api/cases/{case_id}")
     assert response.status_code == 204
 
     # Verify deletion
@@ -147,7 +193,7 @@ async def test_delete_case(client: AsyncClient):
 
 
 @pytest.mark.asyncio
-async def test_add_creditor(client: AsyncClient):
+async def test_add_creditor(client: AsyncClient, query_counter):
     """Test adding creditor to case"""
     # Create test case
     case_data = {"full_name": "Михайлов Михаил Михайлович", "total_debt": 450000.00}
@@ -161,12 +207,15 @@ async def test_add_creditor(client: AsyncClient):
         "debt_amount": 300000.00,
         "debt_type": "credit",
     }
-    response = await client.post(f"/api/creditors/{case_id}", json=creditor_data)
+    # Access check, counter UPDATE ... RETURNING, INSERT, refresh
+    with query_counter.budget(6):
+        response = await client.post(f"/api/creditors/{case_id}", json=creditor_data)
     assert response.status_code == 201
 
     data = response.json()
     assert data["name"] == creditor_data["name"]
     assert data["creditor_type"] == "bank"
+    assert data["number"] == 1
 
 
 @pytest.mark.asyncio
@@ -189,3 +238,336 @@ async def test_filter_cases_by_telegram_user(client: AsyncClient):
     data = response.json()
     assert len(data) > 0
     # Note: Public endpoint doesn't return telegram_user_id, but filters correctly
+
+
+@pytest.mark.asyncio
+async def test_query_budget_reports_overrun(client: AsyncClient, query_counter):
+    """Exceeding a budget fails with the list of statements"""
+    create_response = await client.post("/api/cases", json={"full_name": "Тест", "total_debt": 1})
+    case_id = create_response.json()["id"]
+
+    with pytest.raises(AssertionError, match="Query budget 2 exceeded") as excinfo:
+        with query_counter.budget(2):
+            await client.get(f"/api/cases/{case_id}")
+    assert "SELECT creditors" in str(excinfo.value)
+
+
+@pytest.mark.asyncio
+async def test_toggle_flags_atomically(client: AsyncClient, query_counter):
+    """Toggles are a single UPDATE ... SET flag = NOT flag"""
+    case_id = (await client.post("/api/cases", json={"full_name": "Тест", "total_debt": 1})).json()["id"]
+
+    with query_counter.budget(4):
+        response = await client.patch(f"/api/cases/{case_id}/toggle-real-estate")
+    assert response.json()["has_real_estate"] is True
+    # The flip happens in SQL (SQLite renders NOT x as x = 0)
+    assert "has_real_estate=coalesce(cases.has_real_estate, ?) = 0" in query_counter.statements[1][0]
+
+    response = await client.patch(f"/api/cases/{case_id}/toggle/is_self_employed")
+    assert response.json()["is_self_employed"] is True
+    response = await client.patch(f"/api/cases/{case_id}/toggle/is_self_employed")
+    assert response.json()["is_self_employed"] is False
+    assert (await client.patch(f"/api/cases/{case_id}/toggle/status")).status_code == 422
+
+
+@pytest.mark.asyncio
+async def test_increment_field(client: AsyncClient):
+    """Increments are applied server-side"""
+    case_id = (await client.post("/api/cases", json={"full_name": "Тест", "total_debt": 1000})).json()["id"]
+
+    await client.patch(f"/api/cases/{case_id}/increment", json={"field": "total_debt", "amount": "250.50"})
+    response = await client.patch(f"/api/cases/{case_id}/increment", json={"field": "total_debt", "amount": "-50"})
+    assert response.status_code == 200
+    assert float(response.json()["total_debt"]) == 1200.50
+
+    response = await client.patch(f"/api/cases/{case_id}/increment", json={"field": "monthly_income", "amount": "30000"})
+    assert float(response.json()["monthly_income"]) == 30000
+    response = await client.patch(f"/api/cases/{case_id}/increment", json={"field": "full_name", "amount": "1"})
+    assert response.status_code == 422
+
+
+@pytest.mark.asyncio
+async def test_numbering_stays_gapless(client: AsyncClient, query_counter):
+    """Debts and creditors are numbered 1..n per case, also after deletions"""
+    case_id = (await client.post("/api/cases", json={"full_name": "Тест", "total_debt": 1})).json()["id"]
+    other_id = (await client.post("/api/cases", json={"full_name": "Тест 2", "total_debt": 1})).json()["id"]
+
+    debt_ids = []
+    for name in ("А", "Б", "В", "Г"):
+        response = await client.post(f"/api/debts/{case_id}", json={"creditor_name": name, "amount_rubles": 100})
+        debt_ids.append(response.json()["id"])
+    other = await client.post(f"/api/debts/{other_id}", json={"creditor_name": "Д", "amount_rubles": 1})
+    assert other.json()["number"] == 1
+
+    # One UPDATE renumbers the remaining debts (the route and delete_debt() both look up the debt)
+    with query_counter.budget(9, allow_duplicates=True):
+        assert (await client.delete(f"/api/debts/{debt_ids[1]}")).status_code == 204
+    debts = (await client.get(f"/api/debts/{case_id}")).json()
+    assert [(d["creditor_name"], d["number"]) for d in debts] == [("А", 1), ("В", 2), ("Г", 3)]
+
+    response = await client.post(f"/api/debts/{case_id}", json={"creditor_name": "Е", "amount_rubles": 100})
+    assert response.json()["number"] == 4
+
+    first = (await client.post(f"/api/creditors/{case_id}", json={"name": "Банк 1"})).json()
+    second = (await client.post(f"/api/creditors/{case_id}", json={"name": "Банк 2"})).json()
+    assert (first["number"], second["number"]) == (1, 2)
+    await client.delete(f"/api/creditors/{first['id']}")
+    creditors = (await client.get(f"/api/creditors/{case_id}")).json()
+    assert [(c["name"], c["number"]) for c in creditors] == [("Банк 2", 1)]
+
+
+@pytest.mark.asyncio
+async def test_search_cases(client: AsyncClient):
+    """Search matches debtor names, case numbers and creditor names"""
+    ivanov = (await client.post("/api/cases", json={"full_name": "Иванов Пётр Сергеевич", "total_debt": 1})).json()
+    sidorov = (await client.post("/api/cases", json={"full_name": "Сидоров Олег Ильич", "total_debt": 1})).json()
+    await client.post(f"/api/creditors/{sidorov['id']}", json={"name": "ПАО Сбербанк"})
+
+    response = await client.get("/api/cases/search", params={"q": "иванов"})
+    assert response.status_code == 200
+    assert [r["id"] for r in response.json()] == [ivanov["id"]]
+
+    results = (await client.get("/api/cases/search", params={"q": "сбербанк"})).json()
+    assert [(r["id"], r["creditors_count"]) for r in results] == [(sidorov["id"], 1)]
+
+    results = (await client.get("/api/cases/search", params={"q": sidorov["case_number"]})).json()
+    assert [r["id"] for r in results] == [sidorov["id"]]
+
+    assert (await client.get("/api/cases/search", params={"q": "иванов олег"})).json() == []
+    assert (await client.get("/api/cases/search", params={"q": "и"})).status_code == 422
+
+
+@pytest.mark.asyncio
+async def test_creditor_directory(client: AsyncClient, test_db):
+    """Admins curate the shared directory; case creditors link to it and autocomplete from it"""
+    from config import settings
+    from models.user import User
+    from services.auth_service import auth_service
+
+    admin = User(email="admin@example.com", full_name="Админ", password_hash="-", role="admin")
+    test_db.add(admin)
+    await test_db.commit()
+    as_admin = {"Authorization": f"Bearer {auth_service.create_access_token(admin.id, admin.email, admin.role)}"}
+    bot = {"Authorization": "", "X-API-Token": settings.API_TOKEN}
+
+    first_case = (await client.post("/api/cases", json={"full_name": "Тест", "total_debt": 1})).json()["id"]
+    second_case = (await client.post("/api/cases", json={"full_name": "Тест 2", "total_debt": 1})).json()["id"]
+    sberbank = {
+        "name": "ПАО Сбербанк",
+        "ogrn": "1027700132195",
+        "inn": "7707083893",
+        "address": "117312, г. Москва, ул. Вавилова, д. 19",
+        "creditor_type": "bank",
+    }
+
+    # What users type stays in their case
+    typed = {**sberbank, "address": "Москва, Вавилова 19", "debt_amount": 1000}
+    creditor = (await client.post(f"/api/creditors/{first_case}", json=typed)).json()
+    assert creditor["directory_id"] is None
+    assert (await client.get("/api/creditor-directory", params={"q": "сбер"})).json() == []
+    assert (await client.post("/api/creditor-directory", json=sberbank)).status_code == 403
+
+    response = await client.post("/api/creditor-directory", json=sberbank, headers=as_admin)
+    assert response.status_code == 201
+    entry_id = response.json()["id"]
+    assert (await client.post("/api/creditor-directory", json=sberbank, headers=as_admin)).status_code == 409
+
+    # Later creditors with the same OGRN are linked; their own address is kept
+    creditor = (await client.post(f"/api/creditors/{first_case}", json=typed)).json()
+    assert creditor["directory_id"] == entry_id
+    assert creditor["address"] == typed["address"]
+    await client.post(f"/api/creditors/{first_case}", json={"name": "Петров П.П.", "creditor_type": "individual"})
+
+    response = await client.get("/api/creditor-directory", params={"q": "сбер"})
+    assert response.status_code == 200
+    assert [(e["name"], e["address"], e["usage_count"]) for e in response.json()] == [
+        ("ПАО Сбербанк", sberbank["address"], 1)
+    ]
+    assert [e["id"] for e in (await client.get("/api/creditor-directory", params={"q": "77070"})).json()] == [entry_id]
+    assert (await client.get("/api/creditor-directory", params={"q": "петров"})).json() == []
+    # The bot autocompletes with its API token
+    response = await client.get("/api/creditor-directory", params={"q": "сбер"}, headers=bot)
+    assert response.status_code == 200 and len(response.json()) == 1
+    assert (await client.get(f"/api/creditor-directory/{entry_id}", headers=bot)).json()["ogrn"] == sberbank["ogrn"]
+
+    # Picking the entry fills in the rest
+    response = await client.post(f"/api/creditors/{second_case}", json={"directory_id": entry_id, "debt_amount": 500})
+    assert response.status_code == 201
+    data = response.json()
+    assert (data["name"], data["inn"], data["address"]) == (sberbank["name"], sberbank["inn"], sberbank["address"])
+    # The case rows keep no (encrypted) copies of the directory's public data
+    stored = (await test_db.execute(select(Creditor.own_inn, Creditor.own_address).where(Creditor.id == data["id"]))).one()
+    assert tuple(stored) == (None, None)
+
+    # Admin corrections reach the linked creditors
+    new_address = "117997, г. Москва, ул. Вавилова, д. 19"
+    assert (await client.patch(f"/api/creditor-directory/{entry_id}", json={"address": new_address})).status_code == 403
+    response = await client.patch(f"/api/creditor-directory/{entry_id}", json={"address": new_address}, headers=as_admin)
+    assert response.status_code == 200
+    test_db.expire_all()
+    assert (await client.get(f"/api/creditors/single/{data['id']}")).json()["address"] == new_address
+
+    response = await client.post(f"/api/creditors/{second_case}", json={"directory_id": 999999})
+    assert response.status_code == 404
+    assert (await client.post(f"/api/creditors/{second_case}", json={"debt_amount": 1})).status_code == 422
+
+
+@pytest.mark.asyncio
+async def test_import_debts(client: AsyncClient, query_counter):
+    """Credit-report lines are matched to creditors, diffed against the debts and inserted in bulk"""
+    case_id = (await client.post("/api/cases", json={"full_name": "Тест", "total_debt": 1})).json()["id"]
+    await client.post(f"/api/creditors/{case_id}", json={"name": "ПАО «Сбербанк»", "debt_amount": 1000})
+    await client.post(f"/api/debts/{case_id}", json={"creditor_name": "Сбербанк", "amount_rubles": 5, "source": "ОКБ"})
+
+    rows = ["Кредитор;ИНН;Сумма задолженности", "Сбербанк ПАО;;5,00", "МФК Быстроденьги;7325081622;0", "ООО МКК Займер;;нет"]
+    # Non-finite amounts and amounts beyond the amount_rubles column are line errors, not 500s
+    rows += ["Банк NaN;;NaN", "Банк Infinity;;Infinity", "Банк 1e30;;1e30"]
+    rows += [f"Банк {i};;{i} 000,50" for i in range(1, 301)]
+    report = "\n".join(rows).encode("cp1251")
+
+    response = await client.post(f"/api/debts/{case_id}/import", files={"file": ("report.csv", report)})
+    assert response.status_code == 200
+    data = response.json()
+    assert (data["format"], data["dry_run"], data["created"]) == ("csv", True, 0)
+    assert data["lines"][0]["status"] == "duplicate" and data["lines"][0]["creditor_id"] is not None
+    assert [error["line"] for error in data["errors"]] == [4, 5, 6, 7]
+    assert len(data["lines"]) == 301
+    assert (data["lines"][-1]["amount_rubles"], data["lines"][-1]["amount_kopecks"]) == (300000, 50)
+
+    # One request, a constant number of statements for 300 lines
+    with query_counter.budget(8):
+        response = await client.post(
+            f"/api/debts/{case_id}/import", files={"file": ("report.csv", report)}, data={"dry_run": "false"}
+        )
+    assert response.json()["created"] == 300
+    debts = (await client.get(f"/api/debts/{case_id}")).json()
+    assert [debt["number"] for debt in debts] == list(range(1, 302))
+
+    xml_report = (
+        '<?xml version="1.0" encoding="utf-8"?><report><accounts>'
+        '<account><creditor>Банк 1</creditor><balance>1000.50</balance></account>'
+        '<account creditor="Банк 301"><balance>42</balance></account>'
+        "</accounts></report>"
+    ).encode()
+    data = (await client.post(f"/api/debts/{case_id}/import", files={"file": ("report.xml", xml_report)})).json()
+    assert [line["status"] for line in data["lines"]] == ["duplicate", "new"]
+
+    response = await client.post(
+        f"/api/debts/{case_id}/import", files={"file": ("report.xml", xml_report)}, data={"source": "Б" * 51}
+    )
+    assert response.status_code == 422
+
+    json_report = b'{"accounts": [{"creditor_name": "Bank", "amount": 10.5}, {"creditor_name": "Bank", "amount": 10.5}]}'
+    data = (await client.post(f"/api/debts/{case_id}/import", files={"file": ("report", json_report)})).json()
+    assert data["format"] == "json"
+    assert [line["status"] for line in data["lines"]] == ["new", "duplicate"]
+
+
+@pytest.mark.asyncio
+async def test_import_statement(client: AsyncClient, query_counter):
+    """Bank statements are classified into transaction types and inserted batch by batch"""
+    case_id = (await client.post("/api/cases", json={"full_name": "Тест", "total_debt": 1})).json()["id"]
+
+    document = (
+        "СекцияДокумент=Платежное поручение\r\nДата=15.03.2023\r\nСумма=4500000.00\r\n"
+        "Плательщик1=Иванов И.И.\r\nПолучатель1=Петров П.П.\r\n"
+        "НазначениеПлатежа=Оплата по договору купли-продажи квартиры, кадастровый № 77:01:0001\r\nКонецДокумента\r\n"
+    )
+    other = "СекцияДокумент=Платежное поручение\r\nДата=16.03.2023\r\nСумма=500.00\r\nНазначениеПлатежа=Продукты\r\nКонецДокумента\r\n"
+    statement = ("1CClientBankExchange\r\nВерсияФормата=1.03\r\n" + document + other * 2500 + "КонецФайла\r\n").encode("cp1251")
+
+    # 2501 lines in three batches: user, case check, existing transactions, one INSERT for the only
+    # reportable batch, updated_at bump
+    with query_counter.budget(5):
+        response = await client.post(f"/api/transactions/{case_id}/import", files={"file": ("statement.txt", statement)})
+    assert response.status_code == 200
+    data = response.json()
+    assert (data["imported"], data["by_type"], data["skipped"], data["errors"]) == (1, {"real_estate": 1}, 2500, [])
+
+    rows = [
+        "Дата операции;Описание операции;Контрагент;Расход;Приход",
+        "01.06.2022;Оплата по договору купли-продажи автомобиля VIN XTA210990Y2766389;Автосалон;1 200 000,00;",
+        "02.06.2022;Покупка облигаций через брокера;;50 000,00;",
+        "03.06.2022;Зарплата;ООО Ромашка;;80 000,00",
+        "xx;Продажа доли в уставном капитале ООО Ромашка;;;1 000,00",
+        # Proceeds in the credit column while the debit one holds 0,00
+        "04.06.2022;Продажа легкового автомобиля Lada;;0,00;1 500 000,00",
+        "05.06.2022;Покупка акций ПАО Сбербанк;;Infinity;",
+    ]
+    response = await client.post(
+        f"/api/transactions/{case_id}/import", files={"file": ("statement.csv", "\n".join(rows).encode())}
+    )
+    data = response.json()
+    assert (data["imported"], data["by_type"], data["skipped"]) == (3, {"vehicles": 2, "securities": 1}, 1)
+    assert data["errors"] == [
+        {"line": 5, "message": "Некорректная дата: xx"}, {"line": 7, "message": "Некорректная сумма: Infinity"}
+    ]
+
+    transactions = (await client.get(f"/api/transactions/{case_id}")).json()
+    assert sorted((t["transaction_type"], t["amount"]) for t in transactions) == [
+        ("real_estate", "4500000.00"), ("securities", "50000.00"), ("vehicles", "1200000.00"),
+        ("vehicles", "1500000.00"),
+    ]
+
+    # Uploading the same statement again, with one line repeated inside the file, adds nothing
+    statement = "\n".join(rows + rows[1:2]).encode()
+    data = (await client.post(f"/api/transactions/{case_id}/import", files={"file": ("statement.csv", statement)})).json()
+    assert (data["imported"], data["duplicates"]) == (0, 4)
+    assert len((await client.get(f"/api/transactions/{case_id}")).json()) == 4
+
+    response = await client.post(f"/api/transactions/{case_id}/import", files={"file": ("statement.json", b"[]")})
+    assert response.status_code == 400
+
+
+@pytest.mark.parametrize("purpose, transaction_type", [
+    ("Оплата по договору купли-продажи квартиры, кадастровый № 77:01:0001", "real_estate"),
+    ("Договор дарения жилого дома", "real_estate"),
+    ("Оплата по ДКП автомобиля", "vehicles"),
+    ("Продажа 1/2 доли ООО Вектор", "llc_shares"),
+    ("Покупка акций ПАО Сбербанк", "securities"),
+    # Routine payments about the same objects are not deals
+    ("Оплата штрафа ГИБДД", None),
+    ("Оплата ОСАГО на ТС", None),
+    ("Ежемесячный платеж по ипотеке", None),
+    ("Госпошлина Росреестр", None),
+    ("Покупка запчастей для автомобиля", None),
+    ("Продукты по акции", None),
+])
+def test_statement_classification(purpose, transaction_type):
+    assert classify(purpose) == transaction_type
+
+
+@pytest.mark.asyncio
+async def test_import_statement_checks_case_access(client: AsyncClient, test_db):
+    """Users import only into their own cases; the bot (API token) into any"""
+    from config import settings
+    from models import Case
+
+    test_db.add(Case(case_number="BP-2026-9998", full_name="Чужое дело", owner_id=None))
+    await test_db.commit()
+    case_id = (await test_db.execute(select(Case.id).where(Case.case_number == "BP-2026-9998"))).scalar_one()
+    statement = "Дата;Назначение платежа;Сумма\n01.06.2022;Продажа легкового автомобиля;900 000\n".encode()
+
+    response = await client.post(f"/api/transactions/{case_id}/import", files={"file": ("s.csv", statement)})
+    assert response.status_code == 403
+
+    response = await client.post(
+        f"/api/transactions/{case_id}/import",
+        files={"file": ("s.csv", statement)},
+        headers={"Authorization": "", "X-API-Token": settings.API_TOKEN},
+    )
+    assert response.status_code == 200
+    assert response.json()["by_type"] == {"vehicles": 1}
+
+
+@pytest.mark.asyncio
+async def test_generate_creditor_notifications_without_creditors(client: AsyncClient):
+    """A mail merge with nothing to merge is rejected instead of returning the raw template"""
+    case_id = (await client.post("/api/cases", json={"full_name": "Тест", "total_debt": 1})).json()["id"]
+    for output_format in ("docx", "zip"):
+        response = await client.post(
+            f"/api/documents/cases/{case_id}/generate",
+            json={"document_type": "creditor_notification", "output_format": output_format},
+        )
+        assert response.status_code == 422
+        assert "нет кредиторов" in response.json()["detail"]
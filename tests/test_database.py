@@ -0,0 +1,47 @@
+import asyncio
+
+import pytest
+from sqlalchemy import exc, text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from database import InstrumentedPool, engine_options, pool_stats
+
+
+def test_asyncpg_options_from_settings(monkeypatch):
+    from config import settings
+    monkeypatch.setattr(settings, "DB_POOL_SIZE", 7)
+    monkeypatch.setattr(settings, "DB_STATEMENT_TIMEOUT_MS", 5000)
+
+    options = engine_options("postgresql+asyncpg://u:p@db/bankrot")
+
+    assert options["poolclass"] is InstrumentedPool
+    assert options["pool_size"] == 7
+    assert options["pool_pre_ping"] is True
+    assert options["connect_args"]["server_settings"]["statement_timeout"] == "5000"
+    assert options["connect_args"]["prepared_statement_cache_size"] == settings.DB_PREPARED_STATEMENT_CACHE_SIZE
+    assert engine_options("sqlite+aiosqlite://") == {}
+    assert "connect_args" not in engine_options("sqlite+aiosqlite:////tmp/x.db")
+
+
+@pytest.mark.asyncio
+async def test_pool_records_waits_and_timeouts(tmp_path):
+    url = f"sqlite+aiosqlite:///{tmp_path / 'pool.db'}"
+    engine = create_async_engine(url, **engine_options(url, pool_size=1, max_overflow=0, pool_timeout=0.2))
+    waits = []
+    engine.sync_engine.pool.wait_observer = waits.append
+
+    async def hold(seconds):
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+            await asyncio.sleep(seconds)
+
+    await asyncio.gather(hold(0.05), hold(0))
+    stats = pool_stats(engine)
+    assert stats["checkouts_total"] == 2 and len(waits) == 2
+    assert stats["max_wait_seconds"] >= 0.04
+    assert stats["checked_out"] == 0 and stats["utilization"] == 0.0
+
+    results = await asyncio.gather(hold(0.5), hold(0), return_exceptions=True)
+    assert isinstance(results[1], exc.TimeoutError)
+    assert pool_stats(engine)["timeouts_total"] == 1
+    await engine.dispose()
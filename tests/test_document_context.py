@@ -0,0 +1,68 @@
+from decimal import Decimal
+from types import SimpleNamespace
+
+from services.document_context import (
+    build_petition_context,
+    format_amount_in_words,
+    format_amount_with_words,
+    format_money,
+    kopecks_declension,
+    number_to_words,
+    partition_by,
+    rubles_declension,
+)
+
+
+def test_declensions():
+    """Test rubles/kopecks declension"""
+    assert rubles_declension(1) == "рубль"
+    assert rubles_declension(3) == "рубля"
+    assert rubles_declension(11) == "рублей"
+    assert rubles_declension(21) == "рубль"
+    assert rubles_declension(112) == "рублей"
+    assert kopecks_declension(2) == "копейки"
+    assert kopecks_declension(0) == "копеек"
+
+
+def test_number_to_words():
+    """Test spelling out numbers in Russian"""
+    assert number_to_words(0) == "ноль"
+    assert number_to_words(15) == "пятнадцать"
+    assert number_to_words(1001) == "одна тысяча один"
+    assert number_to_words(2_342_000) == "два миллиона триста сорок две тысячи"
+    assert number_to_words(1_250_000) == "один миллион двести пятьдесят тысяч"
+    assert number_to_words(2, feminine=True) == "две"
+
+
+def test_format_amount_in_words():
+    """Test sum in words ("сумма прописью")"""
+    assert format_amount_in_words(1_250_000, 50) == (
+        "1 250 000 (один миллион двести пятьдесят тысяч) рублей 50 копеек"
+    )
+    assert format_amount_in_words(21, 1) == "21 (двадцать один) рубль 01 копейка"
+
+
+def test_format_money_and_cached_dicts_are_independent():
+    """Memoized helpers must not share mutable results"""
+    assert format_money(Decimal("1250000.50")) == (1250000, 50)
+    first = format_amount_with_words(100, 5)
+    first["amount_rubles"] = "changed"
+    assert format_amount_with_words(100, 5)["amount_rubles"] == "100"
+
+
+def test_partition_by_single_pass():
+    """Test grouping rows by key"""
+    rows = [SimpleNamespace(kind=k) for k in ("a", "b", "a")]
+    groups = partition_by(rows, lambda r: r.kind)
+    assert [len(groups["a"]), len(groups["b"])] == [2, 1]
+    assert "c" not in groups
+
+
+def test_build_petition_context_transactions(document_case):
+    """Transactions are rendered as lists of items with description"""
+    context = build_petition_context(document_case)
+
+    assert context["debtor_initials"] == "И.И."
+    assert context["transactions_vehicles"][0]["description"] == "Продажа автомобиля"
+    assert context["transactions_real_estate"] == []
+    assert context["total_debt_in_words"].startswith("1 500 (одна тысяча пятьсот) рублей")
@@ -0,0 +1,64 @@
+import pytest
+
+from services.document_registry import DocumentRegistry, DocumentType, document_registry
+
+
+def test_only_types_with_templates_are_available():
+    """Types without a template file on disk are not offered"""
+    keys = [doc_type.key for doc_type in document_registry.available()]
+    assert "bankruptcy_petition" in keys
+    assert "bankruptcy_application" not in keys
+    assert document_registry.get("bankruptcy_application") is None
+
+
+def test_template_is_loaded_lazily(tmp_path):
+    """Template file is read on first use, not on registration"""
+    registry = DocumentRegistry(templates_dir=tmp_path)
+    doc_type = registry.register(DocumentType(
+        key="letter",
+        label="Письмо",
+        description="",
+        template_name="letter.docx",
+        context_builder=dict,
+        relationships=("creditors",),
+        templates_dir=tmp_path,
+    ))
+    assert registry.get("letter") is None
+    assert not doc_type.is_loaded
+    with pytest.raises(FileNotFoundError):
+        doc_type.load_template()
+
+
+def test_unknown_relationship_is_rejected():
+    """Relationships must be Case collections"""
+    with pytest.raises(ValueError):
+        DocumentType(
+            key="bad",
+            label="",
+            description="",
+            template_name="bad.docx",
+            context_builder=dict,
+            relationships=("owner",),
+        )
+
+
+def test_petition_context_covers_template_fields(document_case):
+    """Every variable the petition template uses is produced by its builder"""
+    doc_type = document_registry.get("bankruptcy_petition")
+    context = doc_type.build_context(document_case)
+    assert doc_type.fields <= set(context)
+
+
+def test_every_available_type_renders_generated_cases():
+    """Synthetic benchmark cases render with every registered template"""
+    from scripts.create_test_case import CASE_SIZES, build_test_case
+
+    extreme = build_test_case(**CASE_SIZES["extreme"])
+    assert [len(extreme.creditors), len(extreme.children), len(extreme.transactions)] == [200, 20, 300]
+    assert len(extreme.debts) == len(extreme.creditors)
+    assert extreme.total_debt == sum(c.debt_amount for c in extreme.creditors)
+
+    case = build_test_case(**CASE_SIZES["median"])
+    for doc_type in document_registry.available():
+        for output_format in doc_type.output_formats:
+            assert doc_type.render(case, output_format).getbuffer().nbytes > 0
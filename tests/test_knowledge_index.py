@@ -0,0 +1,75 @@
+import time
+
+import pytest
+
+import services.knowledge_index as knowledge_index_module
+from routers.ai import AIQuestion, build_prompt
+from services.knowledge_index import (
+    KnowledgeIndex,
+    build_index,
+    format_passages,
+    iter_law_passages,
+    iter_markdown_passages,
+    tokenize,
+)
+
+LAW_TEXT = """Федеральный закон "О несостоятельности (банкротстве)"
+Статья 213.3. Право на обращение в арбитражный суд
+Правом на обращение в арбитражный суд с заявлением о признании гражданина банкротом обладают гражданин, конкурсный кредитор, уполномоченный орган.
+Статья 213.6. Порядок рассмотрения обоснованности заявления
+По результатам рассмотрения обоснованности заявления арбитражный суд выносит определение о признании заявления обоснованным и введении реструктуризации долгов гражданина.
+Статья 213.25. Конкурсная масса
+Все имущество гражданина, имеющееся на дату принятия решения о признании гражданина банкротом, составляет конкурсную массу.
+"""
+
+
+@pytest.fixture
+def index(tmp_path):
+    law = tmp_path / "127-fz.txt"
+    law.write_text(LAW_TEXT, encoding="utf-8")
+    doc = tmp_path / "faq.md"
+    doc.write_text("# Документы\nДля заявления нужны паспорт, СНИЛС и ИНН.\n", encoding="utf-8")
+    path = tmp_path / "index.bin"
+    path.write_bytes(build_index([*iter_law_passages(law), *iter_markdown_passages(doc)]))
+    index = KnowledgeIndex(path)
+    yield index
+    index.close()
+
+
+def test_tokenize_folds_case_and_stems():
+    assert tokenize("Реструктуризации ДОЛГОВ и 213") == ["рестру", "долгов", "213"]
+
+
+def test_law_split_into_articles_and_searchable(index):
+    assert [title for _, title in index.passages][:3] == [
+        "Статья 213.3. Право на обращение в арбитражный суд",
+        "Статья 213.6. Порядок рассмотрения обоснованности заявления",
+        "Статья 213.25. Конкурсная масса",
+    ]
+    assert index.search("Какое имущество входит в конкурсную массу?", k=1)[0].title.startswith("Статья 213.25")
+    assert index.search("паспорт снилс", k=1)[0].source == "faq.md"
+    assert index.search("криптовалюта") == []
+
+
+def test_reopening_index_is_fast(index):
+    started = time.perf_counter()
+    KnowledgeIndex(index.path).close()
+    assert time.perf_counter() - started < 0.05
+
+
+def test_excerpts_fit_budget(index):
+    passages = index.search("арбитражный суд заявление гражданина", k=3)
+    text = format_passages(passages, max_tokens=40)
+    assert text.startswith("[1] 127-ФЗ, Статья")
+    assert len(text) <= 40 * 3 + 1
+
+
+@pytest.mark.asyncio
+async def test_prompt_gets_excerpts_but_cache_key_does_not(index, monkeypatch):
+    monkeypatch.setattr(knowledge_index_module, "knowledge_index", index)
+
+    key, prompt = await build_prompt(AIQuestion(question="Что входит в конкурсную массу?"), None, None)
+
+    assert key == "Что входит в конкурсную массу?"
+    assert prompt.startswith("Выдержки из 127-ФЗ")
+    assert "Статья 213.25" in prompt and prompt.endswith(key)
@@ -0,0 +1,56 @@
+import zipfile
+from datetime import date
+from decimal import Decimal
+from types import SimpleNamespace
+
+import pytest
+from docx import Document
+
+from services.document_registry import EmptyDocumentError, document_registry
+
+
+def make_creditor(number, name):
+    return SimpleNamespace(
+        number=number,
+        name=name,
+        ogrn="1027700132195",
+        inn="7707083893",
+        address="г. Москва",
+        debt_type="кредит",
+        contract_number=f"К-{number}",
+        contract_date=date(2021, 3, 1),
+        debt_amount=Decimal("1500.50"),
+    )
+
+
+def test_creditor_notifications_merged_and_zipped(document_case):
+    """One letter per creditor, as a merged DOCX or a ZIP of DOCX files"""
+    document_case.creditors = [
+        make_creditor(1, "ПАО Сбербанк"),
+        make_creditor(2, "АО Альфа-Банк"),
+        make_creditor(3, "ООО МФК Займер"),
+    ]
+    doc_type = document_registry.get("creditor_notification")
+
+    merged = Document(doc_type.render(document_case, "docx"))
+    text = "\n".join(p.text for p in merged.paragraphs)
+    for creditor in document_case.creditors:
+        assert creditor.name in text
+    assert text.count("УВЕДОМЛЕНИЕ") == 3
+    assert "{{" not in text
+
+    with zipfile.ZipFile(doc_type.render(document_case, "zip")) as archive:
+        names = archive.namelist()
+        letter = Document(archive.open(names[1]))
+    assert len(names) == 3
+    assert names[0].startswith("001_")
+    assert "АО Альфа-Банк" in "\n".join(p.text for p in letter.paragraphs)
+
+
+def test_creditor_notifications_need_creditors(document_case):
+    """Without creditors there is nothing to merge; the bare template is not returned"""
+    document_case.creditors = []
+    doc_type = document_registry.get("creditor_notification")
+    for output_format in doc_type.output_formats:
+        with pytest.raises(EmptyDocumentError, match="нет кредиторов"):
+            doc_type.render(document_case, output_format)
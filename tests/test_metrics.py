@@ -0,0 +1,61 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from services.metrics import MetricsRegistry, PerformanceMiddleware, instrument_engine
+from utils.encryption import decrypt_value, encrypt_value
+
+
+@pytest.fixture
+def app():
+    engine = create_async_engine("sqlite+aiosqlite://")
+    instrument_engine(engine)
+    registry = MetricsRegistry()
+    app = FastAPI()
+    secret = encrypt_value("4510 123456")
+
+    @app.get("/items/{item_id}")
+    async def get_item(item_id: int):
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+            await conn.execute(text("SELECT 2"))
+        return {"id": item_id, "passport": decrypt_value(secret)}
+
+    app.add_middleware(PerformanceMiddleware, registry=registry, debug_header=True)
+    app.state.registry = registry
+    return app
+
+
+def test_debug_header_has_per_request_breakdown(app):
+    response = TestClient(app).get("/items/1")
+
+    timing = response.headers["server-timing"]
+    assert timing.startswith("app;dur=")
+    assert 'desc="2 queries"' in timing
+    assert 'desc="1 values"' in timing
+
+
+def test_metrics_are_labelled_by_route_template(app):
+    client = TestClient(app)
+    client.get("/items/1")
+    client.get("/items/2")
+    client.get("/missing")
+
+    output = app.state.registry.render(gauges={"password_hash_queue_depth": 0})
+
+    assert 'http_requests_total{method="GET",route="/items/{item_id}",status="200"} 2' in output
+    assert 'http_requests_total{method="GET",route="unmatched",status="404"} 1' in output
+    assert 'http_request_sql_queries_bucket{method="GET",route="/items/{item_id}",le="2"} 2' in output
+    assert 'http_request_sql_queries_bucket{method="GET",route="/items/{item_id}",le="1"} 0' in output
+    assert 'http_request_decrypts_total{method="GET",route="/items/{item_id}"} 2' in output
+    assert 'http_request_duration_seconds_count{method="GET",route="/items/{item_id}"} 2' in output
+    assert "# TYPE password_hash_queue_depth gauge" in output
+
+
+def test_no_header_unless_enabled(app):
+    app.user_middleware.clear()
+    app.add_middleware(PerformanceMiddleware, registry=MetricsRegistry(), debug_header=False)
+
+    assert "server-timing" not in TestClient(app).get("/items/1").headers
@@ -0,0 +1,60 @@
+import asyncio
+import time
+
+import pytest
+from passlib.context import CryptContext
+
+from services.password_hasher import PasswordHasher, PasswordHasherBusy
+
+
+def make_hasher(max_workers=1, max_queue=1):
+    context = CryptContext(schemes=["bcrypt"], bcrypt__rounds=4)
+    return PasswordHasher(context, max_workers=max_workers, max_queue=max_queue)
+
+
+@pytest.mark.asyncio
+async def test_hash_and_verify_roundtrip():
+    hasher = make_hasher()
+    hashed = await hasher.hash("secret123")
+    assert await hasher.verify("secret123", hashed)
+    assert not await hasher.verify("wrong", hashed)
+    assert hasher.stats()["completed_total"] == 3
+
+
+@pytest.mark.asyncio
+async def test_full_queue_is_rejected_without_blocking_the_loop():
+    """Work beyond workers + queue limit fails fast; the event loop keeps running"""
+    hasher = make_hasher(max_workers=1, max_queue=1)
+    accepted = [asyncio.create_task(hasher._submit(time.sleep, 0.2)) for _ in range(2)]
+    await asyncio.sleep(0.01)
+
+    assert hasher.queue_depth == 1
+    with pytest.raises(PasswordHasherBusy):
+        await hasher._submit(time.sleep, 0.2)
+
+    ticks = 0
+    while not all(task.done() for task in accepted):
+        await asyncio.sleep(0.01)
+        ticks += 1
+    assert ticks > 10
+    assert hasher.stats()["rejected_total"] == 1
+    assert hasher.in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_cancelled_queued_call_releases_its_slot():
+    """A request cancelled while its job is queued does not keep the slot"""
+    hasher = make_hasher(max_workers=1, max_queue=1)
+    running = asyncio.create_task(hasher._submit(time.sleep, 0.1))
+    queued = asyncio.create_task(hasher._submit(time.sleep, 0.1))
+    await asyncio.sleep(0.01)
+    assert hasher.in_flight == 2
+
+    queued.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await queued
+    await running
+
+    assert hasher.in_flight == 0
+    assert hasher.stats()["completed_total"] == 1
+    assert await hasher.verify("x", await hasher.hash("x"))
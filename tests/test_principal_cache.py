@@ -0,0 +1,77 @@
+import pytest
+
+from services.principal_cache import Principal, PrincipalCache
+
+
+class FakeRedis:
+    def __init__(self):
+        self.data = {}
+
+    async def get(self, key):
+        return self.data.get(key)
+
+    async def set(self, key, value, ex=None):
+        self.data[key] = value
+
+    async def delete(self, key):
+        self.data.pop(key, None)
+
+
+class CountingLoader:
+    def __init__(self, principal):
+        self.principal = principal
+        self.calls = 0
+
+    async def __call__(self, user_id):
+        self.calls += 1
+        return self.principal
+
+
+def make_cache(local_ttl=60.0):
+    cache = PrincipalCache(redis_url=None, ttl=300, local_ttl=local_ttl)
+    cache._redis = FakeRedis()
+    return cache
+
+
+@pytest.mark.asyncio
+async def test_principal_loaded_once_then_served_from_cache():
+    cache = make_cache()
+    loader = CountingLoader(Principal(7, "user", True))
+
+    for _ in range(100):
+        principal = await cache.get(7, loader)
+
+    assert loader.calls == 1
+    assert (principal.id, principal.role, principal.is_active) == (7, "user", True)
+
+
+@pytest.mark.asyncio
+async def test_shared_cache_used_after_local_expiry():
+    """Another replica (empty local cache) reads the principal from Redis"""
+    cache = make_cache(local_ttl=0)
+    loader = CountingLoader(Principal(7, "admin", True))
+
+    await cache.get(7, loader)
+    other_replica = make_cache()
+    other_replica._redis = cache._redis
+    principal = await other_replica.get(7, loader)
+
+    assert loader.calls == 1
+    assert principal.role == "admin"
+
+
+@pytest.mark.asyncio
+async def test_invalidate_forces_reload_and_missing_users_are_not_cached():
+    cache = make_cache()
+    loader = CountingLoader(Principal(7, "user", True))
+    await cache.get(7, loader)
+
+    loader.principal = Principal(7, "user", False)
+    await cache.invalidate(7)
+    assert (await cache.get(7, loader)).is_active is False
+    assert loader.calls == 2
+
+    missing = CountingLoader(None)
+    assert await cache.get(8, missing) is None
+    assert await cache.get(8, missing) is None
+    assert missing.calls == 2
@@ -0,0 +1,142 @@
+import pytest
+from fastapi import FastAPI, Depends
+from fastapi.testclient import TestClient
+
+import services.rate_limiter as rate_limiter_module
+from services.rate_limiter import RateLimiter, enforce_rate_limit, parse_limit, rate_limit
+
+
+class FakePipeline:
+    def __init__(self, redis):
+        self.redis = redis
+        self.calls = []
+
+    def __getattr__(self, name):
+        def queue(*args, **kwargs):
+            self.calls.append((name, args, kwargs))
+        return queue
+
+    async def execute(self):
+        self.redis.round_trips += 1
+        return [getattr(self.redis, name)(*args, **kwargs) for name, args, kwargs in self.calls]
+
+
+class FakeRedis:
+    """Sorted sets only, enough for the limiter"""
+
+    def __init__(self):
+        self.sets = {}
+        self.round_trips = 0
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+    def zremrangebyscore(self, key, low, high):
+        entries = self.sets.setdefault(key, {})
+        for member in [m for m, score in entries.items() if low <= score <= high]:
+            del entries[member]
+
+    def zadd(self, key, mapping):
+        self.sets.setdefault(key, {}).update(mapping)
+
+    def zcard(self, key):
+        return len(self.sets.get(key, {}))
+
+    def zrange(self, key, start, end, withscores=False):
+        ordered = sorted(self.sets.get(key, {}).items(), key=lambda item: item[1])
+        return ordered[start:end + 1]
+
+    def expire(self, key, seconds):
+        pass
+
+    def zrem(self, key, member):
+        self.sets.get(key, {}).pop(member, None)
+
+
+def make_limiter(**budgets):
+    limiter = RateLimiter(redis_url=None, budgets={"default": "100/minute", **budgets})
+    limiter._redis = FakeRedis()
+    return limiter
+
+
+def test_parse_limit():
+    assert parse_limit("20/minute") == (20, 60)
+    assert parse_limit("5 / hours") == (5, 3600)
+    with pytest.raises(ValueError):
+        parse_limit("many/minute")
+
+
+@pytest.mark.asyncio
+async def test_budget_rejects_after_limit_in_one_round_trip():
+    limiter = make_limiter(ai="2/minute")
+
+    results = [await limiter.hit("user:1", ["default", "ai"]) for _ in range(3)]
+
+    assert [r.allowed for r in results] == [True, True, False]
+    assert results[2].budget == "ai" and 1 <= results[2].retry_after <= 60
+    # Two allowed requests took one round trip each; the rejection one more to undo
+    assert limiter._redis.round_trips == 4
+    # Rejected request was not counted
+    assert limiter._redis.zcard("ratelimit:default:user:1") == 2
+
+
+@pytest.mark.asyncio
+async def test_budgets_are_per_identity():
+    limiter = make_limiter(ai="1/minute")
+
+    assert (await limiter.hit("user:1", ["default", "ai"])).allowed
+    assert (await limiter.hit("tg:42", ["default", "ai"])).allowed
+    assert not (await limiter.hit("user:1", ["default", "ai"])).allowed
+
+
+def test_marked_endpoint_gets_its_budget(monkeypatch):
+    limiter = make_limiter(ai="1/minute")
+    monkeypatch.setattr(rate_limiter_module, "rate_limiter", limiter)
+    monkeypatch.setattr(rate_limiter_module.settings, "API_TOKEN", "bot-token")
+
+    app = FastAPI(dependencies=[Depends(enforce_rate_limit)])
+
+    @app.post("/ask")
+    @rate_limit("ai")
+    async def ask():
+        return {}
+
+    @app.get("/cases")
+    async def cases():
+        return {}
+
+    client = TestClient(app)
+    bot = {"X-API-Token": "bot-token"}
+    assert client.post("/ask", headers={**bot, "X-Telegram-User-Id": "1"}).status_code == 200
+    assert client.post("/ask", headers={**bot, "X-Telegram-User-Id": "2"}).status_code == 200
+    rejected = client.post("/ask", headers={**bot, "X-Telegram-User-Id": "1"})
+    assert rejected.status_code == 429
+    assert rejected.headers["X-RateLimit-Budget"] == "ai"
+    assert int(rejected.headers["Retry-After"]) >= 1
+    assert client.get("/cases", headers={**bot, "X-Telegram-User-Id": "1"}).status_code == 200
+
+
+def test_bot_users_have_separate_default_budgets(monkeypatch):
+    limiter = make_limiter(default="2/minute")
+    monkeypatch.setattr(rate_limiter_module, "rate_limiter", limiter)
+    monkeypatch.setattr(rate_limiter_module.settings, "API_TOKEN", "bot-token")
+
+    app = FastAPI(dependencies=[Depends(enforce_rate_limit)])
+
+    @app.get("/cases/{case_id}")
+    async def get_case(case_id: int):
+        return {}
+
+    @app.put("/cases/{case_id}")
+    async def update_case(case_id: int):
+        return {}
+
+    client = TestClient(app)
+    bot = {"X-API-Token": "bot-token"}
+    for telegram_user_id in ("1", "2"):
+        headers = {**bot, "X-Telegram-User-Id": telegram_user_id}
+        assert client.get(f"/cases/{telegram_user_id}", headers=headers).status_code == 200
+        assert client.put(f"/cases/{telegram_user_id}", headers=headers).status_code == 200
+    # Each user exhausted only their own budget
+    assert client.get("/cases/1", headers={**bot, "X-Telegram-User-Id": "1"}).status_code == 429
+    assert client.get("/cases/3", headers={**bot, "X-Telegram-User-Id": "3"}).status_code == 200
@@ -0,0 +1,45 @@
+import pytest
+import pytest_asyncio
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import StaticPool
+
+import database
+from database import Base, ReadRouter
+
+
+@pytest_asyncio.fixture
+async def replica_maker():
+    """A replica that has not received any rows yet (maximal lag)"""
+    engine = create_async_engine("sqlite+aiosqlite://", poolclass=StaticPool)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    yield async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    await engine.dispose()
+
+
+def test_router_round_robin_and_stickiness():
+    router = ReadRouter(["replica-1", "replica-2"], stickiness_seconds=60)
+
+    assert [router.replica_for("a") for _ in range(3)] == ["replica-1", "replica-2", "replica-1"]
+    router.mark_written("a")
+    assert router.replica_for("a") is None
+    assert router.replica_for("b") == "replica-2"
+    assert ReadRouter([], stickiness_seconds=60).replica_for("a") is None
+
+
+@pytest.mark.asyncio
+async def test_reads_follow_own_writes_then_go_to_replica(client: AsyncClient, replica_maker, monkeypatch):
+    router = ReadRouter([replica_maker], stickiness_seconds=60)
+    monkeypatch.setattr(database, "read_router", router)
+
+    case_id = (await client.post("/api/cases", json={"full_name": "Тест", "total_debt": 1})).json()["id"]
+
+    # Written just now: served by the primary
+    assert (await client.get(f"/api/cases/{case_id}")).status_code == 200
+    assert router.stats()["primary_reads"] == 1
+
+    # Stickiness expired: served by the (lagging) replica
+    router._sticky_until.clear()
+    assert (await client.get(f"/api/cases/{case_id}")).status_code == 404
+    assert router.stats()["replica_reads"] == 1
@@ -0,0 +1,84 @@
+from datetime import datetime, timedelta
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+import models  # noqa: F401 - registers all mappers
+from database import Base
+from models.user import RefreshToken, User
+from services.auth_service import auth_service
+
+
+@pytest_asyncio.fixture
+async def db():
+    engine = create_async_engine("sqlite+aiosqlite://")
+    async with engine.begin() as conn:
+        await conn.run_sync(
+            Base.metadata.create_all,
+            tables=[User.__table__, RefreshToken.__table__],
+        )
+    async with async_sessionmaker(engine, expire_on_commit=False)() as session:
+        yield session
+    await engine.dispose()
+
+
+@pytest_asyncio.fixture
+async def user(db):
+    user = User(email="user@example.com", email_hash="h", password_hash="x", full_name="Test User")
+    db.add(user)
+    await db.commit()
+    return user
+
+
+async def count_tokens(db, **filters):
+    query = select(func.count()).select_from(RefreshToken).filter_by(**filters)
+    return await db.scalar(query)
+
+
+@pytest.mark.asyncio
+async def test_refresh_rotates_within_family(db, user):
+    first = await auth_service.create_tokens(db, user)
+    _, second = await auth_service.refresh_tokens(db, first.refresh_token)
+
+    families = (await db.scalars(select(RefreshToken.family_id))).all()
+    assert len(families) == 2 and len(set(families)) == 1
+    assert await count_tokens(db, revoked=False) == 1
+    assert second.refresh_token != first.refresh_token
+
+
+@pytest.mark.asyncio
+async def test_reused_refresh_token_revokes_family(db, user):
+    first = await auth_service.create_tokens(db, user)
+    other_session = await auth_service.create_tokens(db, user)
+    await auth_service.refresh_tokens(db, first.refresh_token)
+
+    assert await auth_service.refresh_tokens(db, first.refresh_token) is None
+
+    live = (await db.scalars(select(RefreshToken.token_hash).filter_by(revoked=False))).all()
+    assert live == [auth_service.hash_refresh_token(other_session.refresh_token)]
+
+
+@pytest.mark.asyncio
+async def test_purge_deletes_expired_and_old_revoked_in_batches(db, user):
+    now = datetime.utcnow()
+    for i in range(5):
+        db.add(RefreshToken(user_id=user.id, token_hash=f"expired{i}", expires_at=now - timedelta(days=1)))
+    for i in range(3):
+        db.add(RefreshToken(
+            user_id=user.id, token_hash=f"old{i}", expires_at=now + timedelta(days=1),
+            revoked=True, revoked_at=now - timedelta(days=30),
+        ))
+    db.add(RefreshToken(
+        user_id=user.id, token_hash="recent", expires_at=now + timedelta(days=1),
+        revoked=True, revoked_at=now,
+    ))
+    db.add(RefreshToken(user_id=user.id, token_hash="live", expires_at=now + timedelta(days=1)))
+    await db.commit()
+
+    deleted = await auth_service.purge_refresh_tokens(db, batch_size=2, revoked_retention=timedelta(days=7))
+
+    assert deleted == 8
+    remaining = (await db.scalars(select(RefreshToken.token_hash).order_by(RefreshToken.token_hash))).all()
+    assert remaining == ["live", "recent"]
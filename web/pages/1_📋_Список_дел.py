@@ -37,6 +37,25 @@ def get_cases():
         return []
 
 
+@st.cache_data(ttl=30)
+def search_cases(query: str, status: str | None):
+    """Server-side search by debtor, case number, creditor or court (typos allowed)"""
+    params = {"q": query}
+    if status:
+        params["status"] = status
+    try:
+        response = httpx.get(f"{API_URL}/api/cases/search", params=params, headers=get_headers())
+        response.raise_for_status()
+        return response.json()
+    except Exception as e:
+        st.error(f"Ошибка поиска: {str(e)}")
+        return []
+
+
+search_query = st.text_input(
+    "🔍 Поиск", placeholder="ФИО должника, номер дела, кредитор или суд"
+).strip()
+
 # Status filter
 status_options = {
     "all": "Все",
@@ -56,12 +75,16 @@ if st.button("🔄 Обновить"):
     st.rerun()
 
 # Get cases
-cases = get_cases()
-
-if selected_status != "all":
-    cases = [c for c in cases if c["status"] == selected_status]
+if len(search_query) >= 2:
+    cases = search_cases(search_query, None if selected_status == "all" else selected_status)
+else:
+    cases = get_cases()
+    if selected_status != "all":
+        cases = [c for c in cases if c["status"] == selected_status]
 
-if not cases:
+if not cases and search_query:
+    st.info("Ничего не найдено")
+elif not cases:
     st.info("Нет дел. Создайте первое в разделе '➕ Новое дело'")
 else:
     st.write(f"**Найдено дел:** {len(cases)}")
@@ -61,6 +61,23 @@ def get_creditors(case_id: int):
         return []
 
 
+@st.cache_data(ttl=300)
+def search_directory(query: str):
+    """Creditors from the shared directory matching a name, OGRN or INN"""
+    try:
+        response = httpx.get(
+            f"{API_URL}/api/creditor-directory",
+            params={"q": query},
+            headers=get_headers(),
+            timeout=10.0
+        )
+        response.raise_for_status()
+        return response.json()
+    except Exception as e:
+        st.error(f"Ошибка поиска в справочнике: {str(e)}")
+        return []
+
+
 def add_creditor(case_id: int, creditor_data: dict):
     """Add a new creditor to the case"""
     try:
@@ -246,19 +263,40 @@ else:
 st.divider()
 st.subheader("➕ Добавить кредитора")
 
+# Banks and MFOs are taken from the shared directory: OGRN, INN and address are filled in
+directory_query = st.text_input(
+    "🔍 Найти в справочнике кредиторов", placeholder="Сбербанк, ОГРН или ИНН"
+).strip()
+directory_entry = None
+if len(directory_query) >= 2:
+    matches = search_directory(directory_query)
+    if matches:
+        directory_entry = st.selectbox(
+            "Кредитор из справочника",
+            options=[None, *matches],
+            format_func=lambda e: "— ввести вручную —" if e is None else f"{e['name']} (ОГРН {e['ogrn'] or '—'})",
+        )
+    else:
+        st.caption("В справочнике не найдено — заполните данные вручную")
+
+creditor_types = ["bank", "mfo", "individual", "tax", "other"]
+
 with st.form("add_creditor_form", clear_on_submit=True):
     col1, col2 = st.columns(2)
 
     with col1:
         name = st.text_input(
             "Наименование кредитора *",
+            value=directory_entry["name"] if directory_entry else "",
             placeholder="ПАО Сбербанк",
             help="Полное наименование кредитора"
         )
 
         creditor_type = st.selectbox(
             "Тип кредитора",
-            options=["bank", "mfo", "individual", "tax", "other"],
+            options=creditor_types,
+            index=creditor_types.index(directory_entry["creditor_type"])
+            if directory_entry and directory_entry.get("creditor_type") in creditor_types else 0,
             format_func=lambda x: {
                 "bank": "Банк",
                 "mfo": "МФО",
@@ -321,6 +359,8 @@ with st.form("add_creditor_form", clear_on_submit=True):
                 "contract_number": contract_number or None,
                 "contract_date": contract_date.isoformat() if contract_date else None
             }
+            if directory_entry:
+                creditor_data["directory_id"] = directory_entry["id"]
 
             new_creditor, error = add_creditor(selected_case_id, creditor_data)
 
@@ -0,0 +1,87 @@
+import streamlit as st
+st.set_page_config(page_title="AI-ассистент", page_icon="🤖", layout="centered")
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.auth import require_auth, get_auth_headers, show_user_sidebar
+
+# Require authentication
+require_auth()
+
+import json
+import httpx
+
+API_URL = os.getenv("API_BASE_URL", "http://localhost:8000")
+
+
+class AIStreamError(Exception):
+    pass
+
+
+def stream_answer(question: str):
+    """
+    Yield answer chunks from /api/ai/ask/stream (Server-Sent Events).
+
+    Raises:
+        AIStreamError: with a user-facing message
+    """
+    try:
+        with httpx.stream(
+            "POST",
+            f"{API_URL}/api/ai/ask/stream",
+            headers=get_auth_headers(),
+            json={"question": question},
+            timeout=60.0,
+        ) as response:
+            if response.status_code == 429:
+                raise AIStreamError("Слишком много вопросов, попробуйте через минуту")
+            if response.status_code != 200:
+                response.read()
+                raise AIStreamError(response.json().get("detail", f"Ошибка сервера: {response.status_code}"))
+
+            event = None
+            for line in response.iter_lines():
+                if line.startswith("event:"):
+                    event = line[6:].strip()
+                elif line.startswith("data:"):
+                    data = json.loads(line[5:])
+                    if event == "error":
+                        raise AIStreamError(data.get("detail", "AI сервис временно недоступен"))
+                    if event == "done":
+                        return
+                    if data.get("delta"):
+                        yield data["delta"]
+                elif not line:
+                    event = None
+    except httpx.ConnectError:
+        raise AIStreamError("Не удалось подключиться к серверу")
+    except httpx.TimeoutException:
+        raise AIStreamError("Превышено время ожидания ответа")
+
+
+show_user_sidebar()
+
+st.title("🤖 AI-ассистент по 127-ФЗ")
+st.caption("Ответы носят справочный характер и не заменяют консультацию юриста.")
+
+if "ai_history" not in st.session_state:
+    st.session_state.ai_history = []
+
+for item in st.session_state.ai_history:
+    with st.chat_message(item["role"]):
+        st.markdown(item["content"])
+
+question = st.chat_input("Задайте вопрос по банкротству физических лиц")
+if question:
+    st.session_state.ai_history.append({"role": "user", "content": question})
+    with st.chat_message("user"):
+        st.markdown(question)
+
+    with st.chat_message("assistant"):
+        try:
+            answer = st.write_stream(stream_answer(question))
+            st.session_state.ai_history.append({"role": "assistant", "content": answer})
+        except AIStreamError as e:
+            st.error(f"❌ {e}")